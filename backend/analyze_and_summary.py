@@ -1,43 +1,163 @@
 import os
-from pypdf import PdfReader
-from openai import OpenAI
+import queue
+import contextvars
+import hashlib
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
 from dotenv import load_dotenv
 
+from cache import TieredCache
+from llm_gateway import gateway
+import metrics
+import pdf_extract
+from pdf_extract import PdfExtractionError
+from ranking import bm25_scores, estimate_tokens, top_k_indices
+import resume_store
+
 # Load environment variables
 load_dotenv()
 
-openrouter_api_key = os.environ.get("OPENROUTER_API_KEY")
+# --- SCORING ENGINE CONFIG ---
+# Model, timeout and retries (SCORING_MAX_RETRIES) come from the gateway's "scoring" route
+SCORING_MODEL = gateway.routes["scoring"].model
+SCORING_TEMPERATURE = 0.0
+# Bump whenever build_scoring_prompt/parse_candidate change meaning; old memoized results are then dropped
+SCORING_PROMPT_VERSION = 1
+SCORING_CONCURRENCY = int(os.environ.get("SCORING_CONCURRENCY", "8"))
+SCORING_RPM = int(os.environ.get("SCORING_RPM", "0"))  # 0 = unlimited
+SCORING_TPM = int(os.environ.get("SCORING_TPM", "0"))  # 0 = unlimited
+SCORING_OUTPUT_TOKENS = 300  # reserved per call when budgeting TPM
+
+# "single": one resume per call (|| format). "batched": several resumes per call, JSON output
+SCORING_MODE = os.environ.get("SCORING_MODE", "single")
+SCORING_BATCH_TOKEN_BUDGET = int(os.environ.get("SCORING_BATCH_TOKEN_BUDGET", "12000"))  # prompt + reply
+SCORING_BATCH_MAX_RESUMES = int(os.environ.get("SCORING_BATCH_MAX_RESUMES", "8"))
+SCORING_BATCH_OUTPUT_TOKENS = 200  # reply tokens reserved per resume in a batch
+
+# --- PRE-RANKING ---
+# Only the top-K resumes by local BM25 relevance are sent to the LLM; 0 sends everything
+PRERANK_TOP_K = int(os.environ.get("PRERANK_TOP_K", "50"))
+
+# --- RESUME CORPUS ---
+# Analyzed resumes are kept (with an inverted index) so new job descriptions can match them without re-upload
+RESUME_STORE_ENABLED = os.environ.get("RESUME_STORE_ENABLED", "true").lower() == "true"
+CORPUS_MATCH_LIMIT = int(os.environ.get("CORPUS_MATCH_LIMIT", "200"))
+CORPUS_STORE_CHUNK = 100  # streamed resumes per corpus commit
+
+# --- EXTRACTED TEXT CACHE (keyed by SHA-256 of the PDF bytes) ---
+TEXT_CACHE_MEMORY_MB = int(os.environ.get("TEXT_CACHE_MEMORY_MB", "64"))
+TEXT_CACHE_DB_MB = int(os.environ.get("TEXT_CACHE_DB_MB", "512"))  # 0 disables the DB tier
 
-client = OpenAI(
-    api_key=openrouter_api_key,
-    base_url="https://openrouter.ai/api/v1",
+# The page and length caps shape the text, so texts cached under other caps are dropped
+resume_text_cache = TieredCache(
+    f"resume_text_p{pdf_extract.PDF_MAX_PAGES}_c{pdf_extract.PDF_MAX_CHARS}",
+    memory_max_bytes=TEXT_CACHE_MEMORY_MB * 1024 * 1024,
+    persistent_max_bytes=TEXT_CACHE_DB_MB * 1024 * 1024,
 )
+if resume_text_cache.persistent is not None:
+    resume_text_cache.persistent.purge_namespaces("resume_text")
+
+# --- SCORING RESULT CACHE (temperature-0 calls are deterministic enough to memoize) ---
+RESULT_CACHE_BACKEND = os.environ.get("RESULT_CACHE_BACKEND", "database")  # "database" | "memory" | "off"
+RESULT_CACHE_TTL_HOURS = float(os.environ.get("RESULT_CACHE_TTL_HOURS", "168"))
+RESULT_CACHE_MEMORY_MB = int(os.environ.get("RESULT_CACHE_MEMORY_MB", "16"))
+RESULT_CACHE_DB_MB = int(os.environ.get("RESULT_CACHE_DB_MB", "256"))
+
+scoring_result_cache = None
+if RESULT_CACHE_BACKEND != "off":
+    scoring_result_cache = TieredCache(
+        f"scoring_results_v{SCORING_PROMPT_VERSION}",
+        memory_max_bytes=RESULT_CACHE_MEMORY_MB * 1024 * 1024,
+        persistent_max_bytes=RESULT_CACHE_DB_MB * 1024 * 1024 if RESULT_CACHE_BACKEND == "database" else 0,
+        ttl_seconds=RESULT_CACHE_TTL_HOURS * 3600 or None,
+    )
+    if scoring_result_cache.persistent is not None:
+        scoring_result_cache.persistent.purge_namespaces("scoring_results_v")
 
-def extract_text_from_pdf(uploaded_file):
-    try:
-        pdf_reader = PdfReader(uploaded_file)
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text()
-        return text
-    except Exception as e:
-        return str(e)
 
-def analyze_resumes(job_requirements, uploaded_resumes):
+def extract_resume(uploaded_file):
     """
-    Returns: [{"name": str, "email": str, "score": str, "summary": str}, ...]
+    Returns (content_hash, text, error). On failure text is "", content_hash is None and error is
+    {"code", "message"} (see pdf_extract.PdfExtractionError); failed resumes are reported, never scored.
     """
-    results = []
+    try:
+        if hasattr(uploaded_file, "seek"):
+            uploaded_file.seek(0)
+        pdf_bytes = uploaded_file.read()
+    except Exception as e:
+        return None, "", {"code": "unreadable", "message": str(e)}
 
-    # If no resumes are uploaded but text is provided, handle gracefully or return empty
-    if not uploaded_resumes:
-        return []
+    # Same bytes -> same text, so repeat uploads skip PDF parsing entirely
+    content_hash = hashlib.sha256(pdf_bytes).hexdigest()
+    cached_text = resume_text_cache.get(content_hash)
+    if cached_text is not None:
+        return content_hash, cached_text, None
 
-    for resume_file in uploaded_resumes:
-        resume_text = extract_text_from_pdf(resume_file)
-        
-        # Updated Prompt: Explicitly instruct AI to look for email in job_requirements (user input) too
-        prompt = f"""
+    try:
+        with metrics.timed("pdf.extract"):
+            text = pdf_extract.extractor.extract(pdf_bytes)["text"]
+    except PdfExtractionError as e:
+        print(f"PDF extraction failed ({e.code}): {e.message}")
+        return None, "", e.as_dict()
+
+    resume_text_cache.set(content_hash, text)
+    return content_hash, text, None
+
+
+def extract_text_from_pdf(uploaded_file):
+    return extract_resume(uploaded_file)[1]
+
+
+class RateLimiter:
+    """Blocking requests-per-minute / tokens-per-minute limiter (continuously refilled buckets)."""
+
+    def __init__(self, rpm=0, tpm=0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=0):
+        if not self.rpm and not self.tpm:
+            return
+        if self.tpm:
+            tokens = min(tokens, self.tpm)
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._last
+                self._last = now
+                if self.rpm:
+                    self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60.0)
+                if self.tpm:
+                    self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60.0)
+
+                missing_requests = (1 - self._requests) if self.rpm else 0
+                missing_tokens = (tokens - self._tokens) if self.tpm else 0
+                if missing_requests <= 0 and missing_tokens <= 0:
+                    if self.rpm:
+                        self._requests -= 1
+                    if self.tpm:
+                        self._tokens -= tokens
+                    return
+
+                delay = max(
+                    missing_requests * 60.0 / self.rpm if self.rpm else 0,
+                    missing_tokens * 60.0 / self.tpm if self.tpm else 0,
+                )
+            time.sleep(delay)
+
+
+def build_scoring_prompt(job_requirements, resume_text):
+    # Updated Prompt: Explicitly instruct AI to look for email in job_requirements (user input) too
+    return f"""
         You are an expert HR AI Agent. 
         
         USER INPUT / JOB REQUIREMENTS:
@@ -59,46 +179,584 @@ def analyze_resumes(job_requirements, uploaded_resumes):
         Example: "John Doe || john@example.com || 85 || John has strong Python skills..."
         """
 
-        try:
-            response = client.chat.completions.create(
-                model="openai/gpt-4o-mini", 
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0.0,
-                extra_headers={
-                    "HTTP-Referer": "https://localhost:8501", 
-                    "X-Title": "Resume Matcher Agent",
-                }
-            )
-            
-            content = response.choices[0].message.content.strip()
-            
-            # Default structure
+
+def parse_candidate(content):
+    # Default structure
+    candidate_data = {
+        "name": "Unknown", 
+        "email": "No Email", 
+        "score": "0", 
+        "summary": "Could not generate summary."
+    }
+
+    # Use double pipe || to avoid conflict with text in summary
+    if "||" in content:
+        parts = content.split("||")
+        if len(parts) >= 4:
             candidate_data = {
-                "name": "Unknown", 
-                "email": "No Email", 
-                "score": "0", 
-                "summary": "Could not generate summary."
+                "name": parts[0].strip(),
+                "email": parts[1].strip(),
+                "score": parts[2].strip(),
+                "summary": parts[3].strip()
             }
+        else:
+            candidate_data["name"] = parts[0].strip()
 
-            # Use double pipe || to avoid conflict with text in summary
-            if "||" in content:
-                parts = content.split("||")
-                if len(parts) >= 4:
-                    candidate_data = {
-                        "name": parts[0].strip(),
-                        "email": parts[1].strip(),
-                        "score": parts[2].strip(),
-                        "summary": parts[3].strip()
-                    }
-                else:
-                    candidate_data["name"] = parts[0].strip()
-            
-            results.append(candidate_data)
-                
+    return candidate_data
+
+
+def build_batch_scoring_prompt(job_requirements, resumes):
+    """resumes: [(resume_id, resume_text), ...]. The job and instructions are sent once for the whole batch."""
+    resume_blocks = "\n".join(f'<resume id="{resume_id}">\n{text}\n</resume>' for resume_id, text in resumes)
+    return f"""
+        You are an expert HR AI Agent. 
+        
+        USER INPUT / JOB REQUIREMENTS:
+        "{job_requirements}"
+        
+        CANDIDATE RESUMES:
+        {resume_blocks}
+        
+        Task, for EVERY resume above:
+        1. Extract the candidate's full name from the Resume.
+        2. Extract the candidate's email. 
+           - First, look for the email in that CANDIDATE RESUME.
+           - If NOT found in the resume, check the 'USER INPUT' above to see if the user provided an email address there.
+           - If found in neither, write "No Email".
+        3. Give a match score (0-100) based on how well the resume matches the requirements in USER INPUT.
+        4. Write a concise summary (3-4 lines) justifying the score.
+        5. Return ONLY a JSON object with one entry per resume id:
+           {{"candidates": [{{"id": "R1", "name": "John Doe", "email": "john@example.com", "score": 85, "summary": "John has strong Python skills..."}}]}}
+        """
+
+
+def parse_batch_candidates(content, resume_ids):
+    """Returns {resume_id: record} when every id got a well-formed record, otherwise None."""
+    try:
+        data = json.loads(content)
+    except ValueError:
+        # Tolerate a reply wrapped in a markdown code fence
+        match = re.search(r"\{.*\}|\[.*\]", content, re.DOTALL)
+        if not match:
+            return None
+        try:
+            data = json.loads(match.group(0))
+        except ValueError:
+            return None
+
+    entries = data.get("candidates") if isinstance(data, dict) else data
+    if not isinstance(entries, list):
+        return None
+
+    records = {}
+    for entry in entries:
+        if not isinstance(entry, dict) or entry.get("id") not in resume_ids:
+            continue
+        score = str(entry.get("score", "0")).strip()
+        records[entry["id"]] = {
+            "name": str(entry.get("name") or "Unknown").strip(),
+            "email": str(entry.get("email") or "No Email").strip(),
+            "score": score.split(".")[0] if score.replace(".", "", 1).isdigit() else "0",
+            "summary": str(entry.get("summary") or "Could not generate summary.").strip(),
+        }
+
+    if set(records) != set(resume_ids):
+        return None
+    return records
+
+
+def scoring_cache_key(prompt):
+    # Whitespace-only differences (re-pasted job descriptions, PDF line wrapping) must not miss the cache
+    normalized_prompt = re.sub(r"\s+", " ", prompt).strip()
+    key_material = {
+        "model": SCORING_MODEL,
+        "prompt_version": SCORING_PROMPT_VERSION,
+        "temperature": SCORING_TEMPERATURE,
+        "prompt_sha256": hashlib.sha256(normalized_prompt.encode("utf-8")).hexdigest(),
+    }
+    return hashlib.sha256(json.dumps(key_material, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def score_sort_key(candidate):
+    score = candidate.get('score')
+    return int(score) if score and score.isdigit() else 0
+
+
+def local_score_sort_key(candidate):
+    """Remainder order: LLM score where there is one, then local relevance for resumes the LLM never saw."""
+    return score_sort_key(candidate), candidate.get('local_score') or 0
+
+
+class ScoringEngine:
+    """
+    Scores resumes in parallel with a bounded worker pool.
+    Every LLM call (each retry and hedge included) passes through a shared rate limiter; retries, timeouts
+    and the circuit breaker are the gateway's "scoring" route.
+    In "batched" mode several resumes share one prompt (under a token budget) and the reply is JSON.
+    """
+
+    def __init__(self, concurrency=SCORING_CONCURRENCY, rpm=SCORING_RPM, tpm=SCORING_TPM,
+                 max_retries=None, mode=SCORING_MODE,
+                 batch_token_budget=SCORING_BATCH_TOKEN_BUDGET, batch_max_resumes=SCORING_BATCH_MAX_RESUMES):
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries  # None = the route's
+        self.mode = mode
+        self.batch_token_budget = batch_token_budget
+        self.batch_max_resumes = max(1, batch_max_resumes)
+        self.rate_limiter = RateLimiter(rpm=rpm, tpm=tpm)
+        self.usage = {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._usage_lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="scoring")
+
+    def _create(self, prompt, reserved_output_tokens, **params):
+        """One chat completion with rate limiting and retries. Returns the raw response."""
+        estimated_tokens = estimate_tokens(prompt) + reserved_output_tokens
+        response = gateway.complete(
+            "scoring",
+            [{"role": "user", "content": prompt}],
+            before_attempt=lambda: self.rate_limiter.acquire(estimated_tokens),
+            max_retries=self.max_retries,
+            temperature=SCORING_TEMPERATURE,
+            **params
+        )
+        self._record_usage(response)
+        return response
+
+    def _record_usage(self, response):
+        usage = getattr(response, "usage", None)
+        with self._usage_lock:
+            self.usage["calls"] += 1
+            if usage is not None:
+                self.usage["prompt_tokens"] += usage.prompt_tokens or 0
+                self.usage["completion_tokens"] += usage.completion_tokens or 0
+
+    def complete(self, prompt):
+        response = self._create(prompt, SCORING_OUTPUT_TOKENS)
+        return response.choices[0].message.content.strip()
+
+    def score_resume(self, job_requirements, resume_text, filename):
+        try:
+            prompt = build_scoring_prompt(job_requirements, resume_text)
+
+            cache_key = scoring_cache_key(prompt) if scoring_result_cache is not None else None
+            if cache_key:
+                cached = scoring_result_cache.get(cache_key)
+                if cached is not None:
+                    return dict(cached)
+
+            content = self.complete(prompt)
+            candidate_data = parse_candidate(content)
+
+            # Only memoize well-formed replies; a malformed one deserves a fresh attempt next time
+            if cache_key and "||" in content and len(content.split("||")) >= 4:
+                scoring_result_cache.set(cache_key, candidate_data)
+            return candidate_data
+        except Exception as e:
+            return {"name": f"Error {filename}", "email": "-", "score": "0", "summary": str(e)}
+
+    def plan_batches(self, job_requirements, resumes):
+        """
+        resumes: iterable of (position, resume_text)
+        Greedily packs resumes, in order, into batches that fit the token budget. Yields lists of positions,
+        each as soon as it is full, so a lazy stream of resumes is batched as it arrives.
+        """
+        overhead = estimate_tokens(build_batch_scoring_prompt(job_requirements, []))
+        current, current_tokens = [], overhead
+        for position, text in resumes:
+            cost = estimate_tokens(f'<resume id="R00">\n{text}\n</resume>\n') + SCORING_BATCH_OUTPUT_TOKENS
+            if current and (current_tokens + cost > self.batch_token_budget or len(current) >= self.batch_max_resumes):
+                yield current
+                current, current_tokens = [], overhead
+            current.append(position)
+            current_tokens += cost
+        if current:
+            yield current
+
+    def score_batch(self, job_requirements, batch):
+        """
+        batch: [(position, filename, resume_text), ...]
+        Returns ({position: record}, retry) where retry is None on success, "split" if the reply was cut off
+        (halve the batch and try again) or "single" if the reply was unusable (fall back to one call per resume).
+        """
+        resume_ids = [f"R{i + 1}" for i in range(len(batch))]
+        prompt = build_batch_scoring_prompt(job_requirements, [(rid, text) for rid, (_, _, text) in zip(resume_ids, batch)])
+        try:
+            response = self._create(
+                prompt,
+                SCORING_BATCH_OUTPUT_TOKENS * len(batch),
+                response_format={"type": "json_object"},
+            )
         except Exception as e:
-            results.append({"name": f"Error {resume_file.name}", "email": "-", "score": "0", "summary": str(e)})
+            print(f"Batch scoring failed ({e}); falling back to per-resume calls")
+            return {}, "single"
+
+        choice = response.choices[0]
+        records = parse_batch_candidates(choice.message.content or "", resume_ids)
+        if records is None:
+            if choice.finish_reason == "length" and len(batch) > 1:
+                return {}, "split"
+            print(f"Malformed batch reply for {len(batch)} resumes; falling back to per-resume calls")
+            return {}, "single"
+
+        results = {}
+        for rid, (position, _, text) in zip(resume_ids, batch):
+            results[position] = records[rid]
+            if scoring_result_cache is not None:
+                scoring_result_cache.set(scoring_cache_key(build_scoring_prompt(job_requirements, text)), records[rid])
+        return results, None
+
+    def _submit(self, fn, *args):
+        # Carries the caller's trace id (and any other contextvars) into the worker thread
+        return self._pool.submit(contextvars.copy_context().run, fn, *args)
+
+    def map(self, fn, items):
+        """Runs fn over items on the worker pool, preserving order."""
+        futures = [self._submit(fn, item) for item in items]
+        return [future.result() for future in futures]
+
+    def score_all(self, job_requirements, resumes):
+        """resumes: [(filename, resume_text), ...]. Returns one record per resume, in the same order."""
+        records = [None] * len(resumes)
+        for position, record in self.iter_scores(job_requirements, resumes):
+            records[position] = record
+        return records
+
+    def iter_scores(self, job_requirements, resumes):
+        """
+        resumes: iterable of (filename, resume_text); may be a lazy stream (bulk ingest), in which case
+        scoring starts with the first resume and runs alongside whatever produces the rest.
+        Yields (position, record) pairs in completion order.
+        """
+        if self.mode != "batched":
+            finished = queue.SimpleQueue()
+            futures = {}
+            for position, (filename, text) in enumerate(resumes):
+                future = self._submit(self.score_resume, job_requirements, text, filename)
+                futures[future] = position
+                future.add_done_callback(finished.put)
+                while not finished.empty():
+                    future = finished.get()
+                    yield futures.pop(future), future.result()
+            while futures:
+                future = finished.get()
+                yield futures.pop(future), future.result()
+            return
+
+        pending = {}
+        texts = {}  # position -> (filename, text) until its record is out
+        cached_hits = []
+
+        def submit(positions):
+            if len(positions) == 1:
+                filename, text = texts[positions[0]]
+                future = self._submit(self.score_resume, job_requirements, text, filename)
+            else:
+                batch = [(p, texts[p][0], texts[p][1]) for p in positions]
+                future = self._submit(self.score_batch, job_requirements, batch)
+            pending[future] = positions
+
+        def handle(done):
+            for future in done:
+                positions = pending.pop(future)
+                if len(positions) == 1:
+                    texts.pop(positions[0], None)
+                    yield positions[0], future.result()
+                    continue
+
+                records, retry = future.result()
+                for position, record in records.items():
+                    texts.pop(position, None)
+                    yield position, record
+                if retry == "split":
+                    half = len(positions) // 2
+                    submit(positions[:half])
+                    submit(positions[half:])
+                elif retry == "single":
+                    for position in positions:
+                        submit([position])
+
+        # Memoized resumes never enter a batch
+        def uncached():
+            for position, (filename, text) in enumerate(resumes):
+                cached = None
+                if scoring_result_cache is not None:
+                    cached = scoring_result_cache.get(scoring_cache_key(build_scoring_prompt(job_requirements, text)))
+                if cached is not None:
+                    cached_hits.append((position, dict(cached)))
+                else:
+                    texts[position] = (filename, text)
+                    yield position, text
+
+        for positions in self.plan_batches(job_requirements, uncached()):
+            yield from cached_hits
+            cached_hits.clear()
+            submit(positions)
+            done, _ = wait(pending, timeout=0)
+            yield from handle(done)
+        yield from cached_hits
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from handle(done)
+
+
+scoring_engine = ScoringEngine()
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+
+
+def failed_candidate_record(filename, error):
+    """Stand-in record for a resume whose PDF could not be read; it keeps the reason and is never scored."""
+    return {
+        "name": filename or "Unknown",
+        "email": "No Email",
+        "score": "0",
+        "summary": f"Could not read this PDF: {error['message']}",
+        "stage": "failed",
+        "error": error,
+    }
+
+
+def local_candidate_record(resume_text, local_score):
+    """
+    Cheap stand-in record for resumes that did not make the LLM shortlist. `score` stays None: `local_score`
+    is BM25 relative to the best resume in the batch, not comparable with LLM scores.
+    """
+    lines = [line.strip() for line in (resume_text or "").splitlines() if line.strip()]
+    email = EMAIL_PATTERN.search(resume_text or "")
+    return {
+        "name": lines[0][:60] if lines else "Unknown",
+        "email": email.group(0) if email else "No Email",
+        "score": None,
+        "local_score": local_score,
+        "summary": "Not shortlisted for AI review; local_score is the keyword relevance to the requirements.",
+        "stage": "prerank",
+    }
+
+
+def prerank_resumes(job_requirements, resume_texts, top_k):
+    """
+    BM25-ranks the whole batch against the requirements in one matrix pass.
+    Returns (shortlisted indices best-first, local 0-100 scores for every resume).
+    """
+    scores = bm25_scores(job_requirements, resume_texts)
+    best = float(scores.max()) if len(scores) else 0.0
+    local_scores = [int(round(100 * s / best)) if best > 0 else 0 for s in scores.tolist()]
+    if not top_k or top_k >= len(resume_texts):
+        return list(range(len(resume_texts))), local_scores
+    return top_k_indices(scores, top_k), local_scores
+
+
+def _iter_rank_and_score(job_requirements, filenames, resume_texts, top_k, resume_ids=None, completed=None,
+                         failures=None):
+    """
+    Shared tail of the analyze entry points. Yields events as work completes:
+      {"event": "started", "total": n, "shortlisted": k}
+      {"event": "candidate", "index": i, "candidate": record}   (LLM records as their calls finish, then the rest)
+      {"event": "results", "results": [...]}                   (final, sorted like analyze_resumes)
+    `completed` ({index: record}) holds records from an interrupted earlier run; they are reused, not re-scored.
+    `failures` ({index: error}) are resumes whose text could not be extracted; they get a failure record instead.
+    """
+    completed = completed or {}
+    failures = failures or {}
+    # Failed resumes have no text, so they rank last; asking for that many more keeps the shortlist full
+    shortlist, local_scores = prerank_resumes(job_requirements, resume_texts, top_k + len(failures) if top_k else top_k)
+    shortlist = sorted([i for i in shortlist if i not in failures][:top_k or None])
+    shortlisted = set(shortlist)
+    records = [completed.get(i) for i in range(len(resume_texts))]
+
+    yield {"event": "started", "total": len(resume_texts), "shortlisted": len(shortlist)}
+
+    pending = [i for i in shortlist if i not in completed]
+    to_score = [(filenames[i], resume_texts[i]) for i in pending]
+    for position, record in scoring_engine.iter_scores(job_requirements, to_score):
+        index = pending[position]
+        records[index] = record
+        yield {"event": "candidate", "index": index, "candidate": record}
+
+    for index in range(len(resume_texts)):
+        if index not in shortlisted and index not in completed:
+            if index in failures:
+                records[index] = failed_candidate_record(filenames[index], failures[index])
+            else:
+                records[index] = local_candidate_record(resume_texts[index], local_scores[index])
+            yield {"event": "candidate", "index": index, "candidate": records[index]}
+
+    if resume_ids is not None:
+        _remember_contacts(resume_ids, records, shortlist)
+
+    yield {"event": "results", "results": _sorted_results(records, shortlist)}
+
+
+def _sorted_results(records, shortlist):
+    shortlisted = set(shortlist)
+    scored = [records[i] for i in shortlist]
+    remainder = [record for i, record in enumerate(records) if i not in shortlisted]
 
     # Sort results by score
-    results.sort(key=lambda x: int(x['score']) if x['score'].isdigit() else 0, reverse=True)
-    
-    return results
\ No newline at end of file
+    scored.sort(key=score_sort_key, reverse=True)
+    remainder.sort(key=local_score_sort_key, reverse=True)
+    return scored + remainder
+
+
+def _remember_contacts(resume_ids, records, shortlist):
+    contacts = {resume_ids[i]: records[i] for i in shortlist if resume_ids[i] is not None}
+    resume_store.update_contacts(contacts)
+
+
+def final_results(events):
+    """Drains an iter_analyze_* generator and returns its sorted results."""
+    results = []
+    for event in events:
+        if event["event"] == "results":
+            results = event["results"]
+    return results
+
+
+def iter_analyze_resumes(job_requirements, uploaded_resumes, top_k=None):
+    """Streaming form of analyze_resumes; see _iter_rank_and_score for the events."""
+    # If no resumes are uploaded but text is provided, handle gracefully or return empty
+    if not uploaded_resumes:
+        yield {"event": "results", "results": []}
+        return
+
+    top_k = PRERANK_TOP_K if top_k is None else top_k
+    filenames = [f.name for f in uploaded_resumes]
+    extracted = scoring_engine.map(extract_resume, uploaded_resumes)
+    resume_texts = [text for _, text, _ in extracted]
+    failures = {i: error for i, (_, _, error) in enumerate(extracted) if error}
+    resume_ids = store_extracted(filenames, [(content_hash, text) for content_hash, text, _ in extracted])
+
+    yield from _iter_rank_and_score(job_requirements, filenames, resume_texts, top_k, resume_ids, failures=failures)
+
+
+def store_extracted(filenames, extracted):
+    """Adds extracted (content_hash, text) pairs to the resume corpus; returns their resume ids (None if disabled)."""
+    if not RESUME_STORE_ENABLED:
+        return None
+    items = [(content_hash, filenames[i], text) for i, (content_hash, text) in enumerate(extracted)]
+    stored = {}
+    for start in range(0, len(items), CORPUS_STORE_CHUNK):
+        stored.update(resume_store.add_resumes(items[start:start + CORPUS_STORE_CHUNK]))
+    return [stored.get(content_hash) for content_hash, _ in extracted]
+
+
+def iter_analyze_extracted(job_requirements, filenames, resume_texts, top_k=None, resume_ids=None, completed=None,
+                           failures=None):
+    """
+    Streaming analysis of already-extracted texts, e.g. by the background job runner.
+    Records in `completed` ({index: record}) are kept as they are, which lets an interrupted job resume.
+    """
+    if not resume_texts:
+        yield {"event": "results", "results": []}
+        return
+    top_k = PRERANK_TOP_K if top_k is None else top_k
+    yield from _iter_rank_and_score(job_requirements, filenames, resume_texts, top_k, resume_ids, completed, failures)
+
+
+def iter_analyze_stream(job_requirements, total, extracted, top_k=None, progress_every=100):
+    """
+    Streaming analysis of a bulk upload. `extracted` yields (index, filename, content_hash, text, error) for
+    indices 0..total-1 in any order, e.g. ingest.iter_extracted. Resumes go to the corpus in chunks as they arrive.
+    When everything is shortlisted anyway (top_k 0 or >= total) each resume is scored as soon as its text is
+    ready; otherwise pre-ranking needs the whole batch, so texts are collected first (with `extracted`
+    progress events) and then ranked and scored as usual.
+    """
+    if not total:
+        yield {"event": "results", "results": []}
+        return
+    top_k = PRERANK_TOP_K if top_k is None else top_k
+    filenames, resume_texts, resume_ids = [None] * total, [None] * total, [None] * total
+    failures = {}
+    unstored = []
+
+    def store(force=False):
+        if RESUME_STORE_ENABLED and unstored and (force or len(unstored) >= CORPUS_STORE_CHUNK):
+            stored = resume_store.add_resumes([(content_hash, filenames[i], text) for i, content_hash, text in unstored])
+            for i, content_hash, _ in unstored:
+                resume_ids[i] = stored.get(content_hash)
+            unstored.clear()
+
+    def arrive(index, filename, content_hash, text, error):
+        filenames[index] = filename
+        if error:
+            failures[index] = error
+            return False
+        unstored.append((index, content_hash, text))
+        store()
+        return True
+
+    if top_k and top_k < total:
+        for done, (index, filename, content_hash, text, error) in enumerate(extracted, start=1):
+            arrive(index, filename, content_hash, text, error)
+            resume_texts[index] = text
+            if done % progress_every == 0 or done == total:
+                yield {"event": "extracted", "done": done, "total": total}
+        store(force=True)
+        yield from _iter_rank_and_score(job_requirements, filenames, resume_texts, top_k,
+                                        resume_ids if RESUME_STORE_ENABLED else None, failures=failures)
+        return
+
+    yield {"event": "started", "total": total, "shortlisted": total}
+    order = []  # scoring position -> index
+    unreadable = []  # failed indices not yet reported
+
+    def to_score():
+        for index, filename, content_hash, text, error in extracted:
+            if arrive(index, filename, content_hash, text, error):
+                order.append(index)
+                yield filename, text
+            else:
+                unreadable.append(index)
+        store(force=True)
+
+    records = [None] * total
+
+    def report_failures():
+        while unreadable:
+            index = unreadable.pop()
+            records[index] = failed_candidate_record(filenames[index], failures[index])
+            yield {"event": "candidate", "index": index, "candidate": records[index]}
+
+    for position, record in scoring_engine.iter_scores(job_requirements, to_score()):
+        yield from report_failures()
+        records[order[position]] = record
+        yield {"event": "candidate", "index": order[position], "candidate": record}
+    yield from report_failures()
+
+    shortlist = [index for index in range(total) if index not in failures]
+    if RESUME_STORE_ENABLED:
+        _remember_contacts(resume_ids, records, shortlist)
+    yield {"event": "results", "results": _sorted_results(records, shortlist)}
+
+
+def analyze_resumes(job_requirements, uploaded_resumes, top_k=None):
+    """
+    Returns: [{"name": str, "email": str, "score": str, "summary": str}, ...]
+    LLM-scored candidates come first (by score), followed by the pre-ranked remainder (by local_score, score None).
+    """
+    return final_results(iter_analyze_resumes(job_requirements, uploaded_resumes, top_k))
+
+
+def iter_analyze_corpus(job_requirements, top_k=None, limit=CORPUS_MATCH_LIMIT):
+    """Streaming form of analyze_corpus."""
+    hits = resume_store.search(job_requirements, limit=limit)
+    if not hits:
+        yield {"event": "results", "results": []}
+        return
+
+    resumes = resume_store.get_resumes([resume_id for resume_id, _ in hits])
+    resume_ids = [resume_id for resume_id, _ in hits if resume_id in resumes]
+    filenames = [resumes[resume_id].filename for resume_id in resume_ids]
+    resume_texts = [resumes[resume_id].text for resume_id in resume_ids]
+
+    top_k = PRERANK_TOP_K if top_k is None else top_k
+    yield from _iter_rank_and_score(job_requirements, filenames, resume_texts, top_k, resume_ids)
+
+
+def analyze_corpus(job_requirements, top_k=None, limit=CORPUS_MATCH_LIMIT):
+    """
+    Matches the job against every stored resume without re-upload.
+    The inverted index narrows the corpus to the best `limit` BM25 hits; the top-K of those go to the LLM.
+    """
+    return final_results(iter_analyze_corpus(job_requirements, top_k, limit))
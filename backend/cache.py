@@ -0,0 +1,354 @@
+import datetime
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import func
+
+from database import SessionLocal, CacheEntry
+
+# Every TieredCache registers itself here so /api/cache/stats can report on all of them
+_registry = {}
+
+
+def _sizeof(value):
+    return len(json.dumps(value).encode("utf-8"))
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU bounded by the total serialized size of its values, with optional TTL."""
+
+    def __init__(self, max_bytes, ttl_seconds=None):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.current_bytes = 0
+        self._items = OrderedDict()  # key -> (value, size, stored_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if self.ttl_seconds and time.monotonic() - item[2] > self.ttl_seconds:
+                del self._items[key]
+                self.current_bytes -= item[1]
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def set(self, key, value, size=None):
+        size = _sizeof(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._items[key] = (value, size, time.monotonic())
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.current_bytes -= evicted[1]
+
+    def delete(self, key):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+
+    def __len__(self):
+        return len(self._items)
+
+
+class SQLCache:
+    """
+    Persistent tier stored in the cache_entries table, evicting least recently used rows by size.
+    Pass a different session_factory to back it with another engine (SQLite, Postgres, ...).
+    """
+
+    def __init__(self, namespace, max_bytes, ttl_seconds=None, session_factory=SessionLocal):
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.session_factory = session_factory
+
+    def get(self, key):
+        db = self.session_factory()
+        try:
+            entry = db.query(CacheEntry).filter(
+                CacheEntry.namespace == self.namespace, CacheEntry.key == key
+            ).first()
+            if entry is None:
+                return None
+            now = datetime.datetime.utcnow()
+            if self.ttl_seconds and (now - entry.created_at).total_seconds() > self.ttl_seconds:
+                db.delete(entry)
+                db.commit()
+                return None
+            entry.last_accessed = now
+            db.commit()
+            return entry.value
+        finally:
+            db.close()
+
+    def set(self, key, value, size=None):
+        size = _sizeof(value) if size is None else size
+        if size > self.max_bytes:
+            return
+        db = self.session_factory()
+        try:
+            now = datetime.datetime.utcnow()
+            db.merge(CacheEntry(namespace=self.namespace, key=key, value=value, size=size,
+                                created_at=now, last_accessed=now))
+            db.commit()
+            self._evict(db)
+        except Exception as e:
+            db.rollback()
+            print(f"Cache Error ({self.namespace}): {e}")
+        finally:
+            db.close()
+
+    def delete(self, key):
+        db = self.session_factory()
+        try:
+            db.query(CacheEntry).filter(
+                CacheEntry.namespace == self.namespace, CacheEntry.key == key
+            ).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    def purge_namespaces(self, prefix):
+        """Drops rows of sibling namespaces (e.g. an older prompt version) sharing `prefix`."""
+        db = self.session_factory()
+        try:
+            db.query(CacheEntry).filter(
+                CacheEntry.namespace.like(f"{prefix}%"), CacheEntry.namespace != self.namespace
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"Cache Error ({self.namespace}): {e}")
+        finally:
+            db.close()
+
+    def _evict(self, db):
+        total = db.query(func.coalesce(func.sum(CacheEntry.size), 0)).filter(
+            CacheEntry.namespace == self.namespace
+        ).scalar()
+        if total <= self.max_bytes:
+            return
+
+        oldest = db.query(CacheEntry.key, CacheEntry.size).filter(
+            CacheEntry.namespace == self.namespace
+        ).order_by(CacheEntry.last_accessed).yield_per(500)
+
+        doomed = []
+        for key, size in oldest:
+            doomed.append(key)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+        db.query(CacheEntry).filter(
+            CacheEntry.namespace == self.namespace, CacheEntry.key.in_(doomed)
+        ).delete(synchronize_session=False)
+        db.commit()
+
+
+class TieredCache:
+    """
+    Memory LRU in front of a persistent tier (an SQLCache unless another get/set/delete backend is given).
+    Persistent hits are promoted into memory; hit/miss counters are kept per tier.
+    """
+
+    def __init__(self, namespace, memory_max_bytes, persistent_max_bytes=0, ttl_seconds=None, persistent=None):
+        self.namespace = namespace
+        self.memory = LRUCache(memory_max_bytes, ttl_seconds)
+        if persistent is None and persistent_max_bytes > 0:
+            persistent = SQLCache(namespace, persistent_max_bytes, ttl_seconds)
+        self.persistent = persistent
+        self.stats = {"memory_hits": 0, "persistent_hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+        _registry[namespace] = self
+
+    def _count(self, field):
+        with self._stats_lock:
+            self.stats[field] += 1
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is not None:
+            self._count("memory_hits")
+            return value
+
+        if self.persistent is not None:
+            try:
+                value = self.persistent.get(key)
+            except Exception as e:
+                print(f"Cache Error ({self.namespace}): {e}")
+                value = None
+            if value is not None:
+                self._count("persistent_hits")
+                self.memory.set(key, value)
+                return value
+
+        self._count("misses")
+        return None
+
+    def set(self, key, value):
+        size = _sizeof(value)
+        self.memory.set(key, value, size)
+        if self.persistent is not None:
+            self.persistent.set(key, value, size)
+
+    def delete(self, key):
+        self.memory.delete(key)
+        if self.persistent is not None:
+            self.persistent.delete(key)
+
+    def snapshot(self):
+        with self._stats_lock:
+            stats = dict(self.stats)
+        lookups = stats["memory_hits"] + stats["persistent_hits"] + stats["misses"]
+        stats["hit_rate"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        stats["memory_bytes"] = self.memory.current_bytes
+        return stats
+
+
+class FileCache:
+    """
+    Content-addressed blobs on disk (one file per key), evicting least recently used files by total size.
+    Meant for binary payloads such as synthesized audio; recency survives restarts through file mtimes.
+    Processes can share a directory: a key this process never wrote is still found on disk.
+    With ttl_seconds, files older than that (since written) are misses and get deleted.
+    """
+
+    def __init__(self, namespace, directory, max_bytes, extension="", ttl_seconds=None):
+        self.namespace = namespace
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.extension = extension
+        self.ttl_seconds = ttl_seconds
+        self.current_bytes = 0
+        self._items = OrderedDict()  # key -> size, least recently used first
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        os.makedirs(directory, exist_ok=True)
+        self._load_index()
+        _registry[namespace] = self
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.extension)
+
+    def _load_index(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.extension) or name.startswith("."):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            key = name[:-len(self.extension)] if self.extension else name
+            entries.append((stat.st_mtime, key, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._items[key] = size
+            self.current_bytes += size
+        with self._lock:
+            self._evict()
+
+    def get(self, key):
+        path = self._path(key)
+        with self._lock:
+            known = key in self._items
+            if known:
+                self._items.move_to_end(key)
+        try:
+            if self.ttl_seconds and time.time() - os.stat(path).st_mtime > self.ttl_seconds:
+                self.delete(key)
+                with self._lock:
+                    self.stats["misses"] += 1
+                return None
+            with open(path, "rb") as f:
+                data = f.read()
+            if not self.ttl_seconds:
+                os.utime(path)  # with a TTL the mtime stays the write time
+        except OSError:
+            # Never written, or deleted behind our back: forget it and report a miss
+            with self._lock:
+                size = self._items.pop(key, None)
+                if size is not None:
+                    self.current_bytes -= size
+                self.stats["misses"] += 1
+            return None
+        with self._lock:
+            if not known and key not in self._items:
+                # Written by another process sharing the directory; count it against this one's budget too
+                self._items[key] = len(data)
+                self.current_bytes += len(data)
+                self._evict()
+            self.stats["hits"] += 1
+        return data
+
+    def set(self, key, data):
+        size = len(data)
+        if size > self.max_bytes:
+            return
+        try:
+            # Write-then-rename so readers never see a half-written file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Cache Error ({self.namespace}): {e}")
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old
+            self._items[key] = size
+            self.current_bytes += size
+            self._evict()
+
+    def delete(self, key):
+        with self._lock:
+            size = self._items.pop(key, None)
+            if size is not None:
+                self.current_bytes -= size
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        while self.current_bytes > self.max_bytes and self._items:
+            key, size = self._items.popitem(last=False)
+            self.current_bytes -= size
+            self.stats["evictions"] += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def __len__(self):
+        return len(self._items)
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self._items)
+            stats["bytes"] = self.current_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = round(stats["hits"] / lookups, 4) if lookups else 0.0
+        return stats
+
+
+def cache_stats():
+    return {namespace: cache.snapshot() for namespace, cache in _registry.items()}
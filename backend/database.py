@@ -0,0 +1,228 @@
+import os
+import datetime
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine, event, Column, Integer, String, JSON, DateTime, Text, ForeignKey, LargeBinary, Index
+from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import sessionmaker, relationship
+
+import metrics
+
+load_dotenv()
+
+# --- DATABASE SETUP ---
+DATABASE_URL = os.environ.get("POSTGRES_DB_URL")
+
+if not DATABASE_URL:
+    print("Warning: POSTGRES_DB_URL not found. Using SQLite fallback.")
+    DATABASE_URL = "sqlite:///./app.db"
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# Pool sized for the I/O executor's threads plus job workers; pre-ping drops connections the server closed
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "30"))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", "1800"))  # seconds; below typical server/proxy idle cutoffs
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# SQLite fallback: WAL lets readers run during a write; NORMAL sync only fsyncs at checkpoints (still crash-safe in WAL)
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.environ.get("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+if IS_SQLITE:
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False},
+                           pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_timeout=DB_POOL_TIMEOUT)
+
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+else:
+    engine = create_engine(DATABASE_URL, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+                           pool_timeout=DB_POOL_TIMEOUT, pool_recycle=DB_POOL_RECYCLE, pool_pre_ping=DB_POOL_PRE_PING)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+if metrics.METRICS_ENABLED:
+    # Commit time includes the flush of pending rows, which is where most of a commit's work is
+    @event.listens_for(SessionLocal, "before_commit")
+    def _commit_started(session):
+        session.info["commit_started"] = time.perf_counter()
+
+    @event.listens_for(SessionLocal, "after_commit")
+    def _commit_finished(session):
+        started = session.info.pop("commit_started", None)
+        if started is not None:
+            metrics.record("db.commit", time.perf_counter() - started)
+
+    @event.listens_for(SessionLocal, "after_rollback")
+    def _commit_failed(session):
+        started = session.info.pop("commit_started", None)
+        if started is not None:
+            metrics.record("db.commit", time.perf_counter() - started, failed=True)
+Base = declarative_base()
+
+# --- DATABASE MODELS ---
+
+class ChatSession(Base):
+    __tablename__ = "chat_sessions"
+    # Sidebar order and its keyset cursor: newest first, id breaks ties
+    __table_args__ = (Index("ix_chat_sessions_created_id", "created_at", "id"),)
+    
+    id = Column(String, primary_key=True, index=True) # UUID
+    title = Column(String)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    
+    # Cascade delete messages when session is deleted
+    messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
+    interview_context = relationship("InterviewContext", uselist=False, cascade="all, delete-orphan")
+
+class ChatMessage(Base):
+    __tablename__ = "chat_history"
+    # History pages: one session's messages in (timestamp, id) order without a sort
+    __table_args__ = (Index("ix_chat_history_session_timestamp", "session_id", "timestamp", "id"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String, ForeignKey("chat_sessions.id"))
+    role = Column(String)  
+    type = Column(String)  
+    content = Column(JSON) 
+    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
+    
+    session = relationship("ChatSession", back_populates="messages")
+
+class CacheEntry(Base):
+    """Persistent tier of cache.TieredCache; one row per (namespace, key)."""
+    __tablename__ = "cache_entries"
+
+    namespace = Column(String, primary_key=True)
+    key = Column(String, primary_key=True)
+    value = Column(JSON)
+    size = Column(Integer, default=0)  # serialized bytes, used for size-based eviction
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    last_accessed = Column(DateTime, default=datetime.datetime.utcnow, index=True)
+
+class Resume(Base):
+    """A resume kept for matching against future job descriptions (deduplicated by content hash)."""
+    __tablename__ = "resumes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    content_hash = Column(String, unique=True, index=True)  # SHA-256 of the PDF bytes
+    filename = Column(String)
+    text = Column(Text)
+    name = Column(String, nullable=True)
+    email = Column(String, nullable=True)
+    doc_length = Column(Integer, default=0)  # token count, needed by BM25 length normalization
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    terms = relationship("ResumeTerm", back_populates="resume", cascade="all, delete-orphan")
+
+class ResumeTerm(Base):
+    """Inverted index posting: (term, resume) -> term frequency. The PK leads with term for lookups."""
+    __tablename__ = "resume_terms"
+
+    term = Column(String, primary_key=True)
+    resume_id = Column(Integer, ForeignKey("resumes.id", ondelete="CASCADE"), primary_key=True, index=True)
+    tf = Column(Integer)
+
+    resume = relationship("Resume", back_populates="terms")
+
+class InterviewContext(Base):
+    """Per-session interview state kept server-side: the resume/JD once, plus a rolling summary of older turns."""
+    __tablename__ = "interview_contexts"
+
+    session_id = Column(String, ForeignKey("chat_sessions.id", ondelete="CASCADE"), primary_key=True)
+    resume_text = Column(Text, default="")
+    job_desc = Column(Text, default="")
+    summary = Column(Text, default="")
+    summarized_until = Column(Integer, default=0)  # chat_history.id of the newest message folded into `summary`
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class Job(Base):
+    """Background job (analysis or scheduling batch). Claimed by a worker under a heartbeat lease."""
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True)  # UUID
+    kind = Column(String)  # analyze | schedule
+    status = Column(String, default="queued", index=True)  # queued | running | completed | failed
+    session_id = Column(String, nullable=True)
+    params = Column(JSON)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    total_items = Column(Integer, default=0)
+    done_items = Column(Integer, default=0)
+    failed_items = Column(Integer, default=0)
+    worker_id = Column(String, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)  # a running job whose heartbeat goes stale is re-claimed
+    attempts = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    items = relationship("JobItem", back_populates="job", cascade="all, delete-orphan", order_by="JobItem.position")
+
+class JobItem(Base):
+    """One unit of a job (a resume, an invitation); `done` items are never redone when a job resumes."""
+    __tablename__ = "job_items"
+    __table_args__ = (Index("ix_job_items_job_position", "job_id", "position", unique=True),)
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(String, ForeignKey("jobs.id", ondelete="CASCADE"))
+    position = Column(Integer)
+    status = Column(String, default="pending")  # pending | done | failed
+    payload = Column(JSON)
+    data = Column(LargeBinary, nullable=True)  # raw upload, dropped once extracted
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    job = relationship("Job", back_populates="items")
+
+class InterviewBooking(Base):
+    """A booked interview slot; slot_allocator treats these as busy time so later batches never double-book."""
+    __tablename__ = "interview_bookings"
+    # One interviewer's bookings by time; unique so concurrent writers can't take the same slot
+    __table_args__ = (Index("ix_interview_bookings_interviewer_start", "interviewer_id", "start_at", unique=True),)
+
+    id = Column(Integer, primary_key=True)
+    interviewer_id = Column(String)
+    interviewer_name = Column(String, nullable=True)
+    candidate_name = Column(String, nullable=True)
+    candidate_email = Column(String, nullable=True)
+    start_at = Column(DateTime)
+    end_at = Column(DateTime)
+    job_id = Column(String, nullable=True)  # the scheduling job that made it, if any
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+class InterviewerLock(Base):
+    """One row per interviewer; slot_allocator locks it while allocating, so bookings never overlap across processes."""
+    __tablename__ = "interviewer_locks"
+
+    interviewer_id = Column(String, primary_key=True)
+    locked_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+def ensure_indexes():
+    """create_all skips tables that already exist, so indexes added later are created here."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                index.create(bind=engine, checkfirst=True)
+            except Exception as e:
+                print(f"Index Error ({index.name}): {e}")
+
+# Create Tables
+Base.metadata.create_all(bind=engine)
+ensure_indexes()
+
+def get_db():
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,55 @@
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+import stt_models
+
+load_dotenv()
+
+# --- Configuration ---
+# Blocking I/O (SQLAlchemy sessions, the OpenAI client, TTS, SMTP) waits on sockets, so many threads are cheap
+IO_WORKERS = int(os.environ.get("IO_WORKERS", "32"))
+# Whisper is CPU-bound and each model instance serves one transcription at a time
+STT_WORKERS = int(os.environ.get("STT_WORKERS", str(stt_models.WHISPER_POOL_SIZE)))
+
+io_executor = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix="io")
+stt_executor = ThreadPoolExecutor(max_workers=STT_WORKERS, thread_name_prefix="stt")
+
+
+async def _run(executor, fn, *args, **kwargs):
+    # Copy the caller's context so request-scoped contextvars are visible in the worker thread
+    context = contextvars.copy_context()
+    call = functools.partial(context.run, fn, *args, **kwargs)
+    return await asyncio.get_running_loop().run_in_executor(executor, call)
+
+
+async def run_io(fn, *args, **kwargs):
+    """Runs blocking I/O-bound work (DB, LLM, TTS) off the event loop."""
+    return await _run(io_executor, fn, *args, **kwargs)
+
+
+async def run_stt(fn, *args, **kwargs):
+    """Runs CPU-bound speech-to-text off the event loop, in its own pool so it can't starve I/O work."""
+    return await _run(stt_executor, fn, *args, **kwargs)
+
+
+_EXHAUSTED = object()
+
+
+async def iterate_io(iterator):
+    """Async view of a blocking iterator (e.g. a streaming LLM pipeline): each next() runs on the I/O pool."""
+    iterator = iter(iterator)
+    while True:
+        item = await run_io(next, iterator, _EXHAUSTED)
+        if item is _EXHAUSTED:
+            break
+        yield item
+
+
+def shutdown():
+    io_executor.shutdown(wait=False, cancel_futures=True)
+    stt_executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,116 @@
+"""Bulk resume ingest: ZIP archives and large upload batches, read one entry at a time."""
+import contextvars
+import io
+import os
+import posixpath
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from dotenv import load_dotenv
+
+import analyze_and_summary as analyzer
+
+load_dotenv()
+
+# --- Configuration ---
+INGEST_IN_FLIGHT = int(os.environ.get("INGEST_IN_FLIGHT", "8"))  # PDFs read but not yet extracted
+INGEST_MAX_FILES = int(os.environ.get("INGEST_MAX_FILES", "10000"))
+INGEST_MAX_FILE_MB = int(os.environ.get("INGEST_MAX_FILE_MB", "20"))
+INGEST_MAX_TOTAL_MB = int(os.environ.get("INGEST_MAX_TOTAL_MB", "4096"))  # uncompressed; guards against zip bombs
+
+_pool = ThreadPoolExecutor(max_workers=max(1, INGEST_IN_FLIGHT), thread_name_prefix="ingest")
+
+
+class IngestError(ValueError):
+    """The upload can't be ingested (not a ZIP, too many files, too large)."""
+
+
+def _read_capped(fileobj, name):
+    limit = INGEST_MAX_FILE_MB * 1024 * 1024
+    data = fileobj.read(limit + 1)
+    if len(data) > limit:
+        raise IngestError(f"{name} is larger than {INGEST_MAX_FILE_MB} MB")
+    return data
+
+
+def _is_resume(name):
+    base = posixpath.basename(name)
+    return base.lower().endswith(".pdf") and not base.startswith("._") and not name.startswith("__MACOSX/")
+
+
+def zip_entries(fileobj):
+    """
+    Opens a ZIP without reading its members. Returns (count, entries) where entries yields
+    (filename, read) per PDF in archive order; read() returns that member's bytes.
+    Folders, macOS metadata and non-PDF files are skipped.
+    """
+    try:
+        archive = zipfile.ZipFile(fileobj)
+    except zipfile.BadZipFile:
+        raise IngestError("Not a valid ZIP archive")
+
+    members = [info for info in archive.infolist() if not info.is_dir() and _is_resume(info.filename)]
+    if len(members) > INGEST_MAX_FILES:
+        raise IngestError(f"Archive has {len(members)} PDFs; the limit is {INGEST_MAX_FILES}")
+    if sum(info.file_size for info in members) > INGEST_MAX_TOTAL_MB * 1024 * 1024:
+        raise IngestError(f"Archive expands to more than {INGEST_MAX_TOTAL_MB} MB")
+
+    def reader(info):
+        def read():
+            with archive.open(info) as member:
+                return _read_capped(member, info.filename)
+        return read
+
+    return len(members), ((posixpath.basename(info.filename), reader(info)) for info in members)
+
+
+def upload_entries(uploads):
+    """Same shape as zip_entries for uploaded files (FastAPI UploadFile); each is read only when its turn comes."""
+    if len(uploads) > INGEST_MAX_FILES:
+        raise IngestError(f"{len(uploads)} files uploaded; the limit is {INGEST_MAX_FILES}")
+
+    def reader(upload):
+        def read():
+            upload.file.seek(0)
+            return _read_capped(upload.file, upload.filename)
+        return read
+
+    return len(uploads), ((upload.filename, reader(upload)) for upload in uploads)
+
+
+def _extract(filename, read):
+    try:
+        data = read()
+    except IngestError as e:
+        return None, "", {"code": "too_large", "message": str(e)}
+    except Exception as e:
+        return None, "", {"code": "unreadable", "message": str(e)}
+    return analyzer.extract_resume(io.BytesIO(data))
+
+
+def iter_extracted(entries, in_flight=None):
+    """
+    entries: iterable of (filename, read). Yields (index, filename, content_hash, text, error) as extractions
+    finish, with index the entry's position and error as in analyzer.extract_resume (None on success).
+    The next entry is only read once fewer than `in_flight` are in progress.
+    """
+    in_flight = max(1, in_flight or INGEST_IN_FLIGHT)
+    pending = {}
+
+    def finished(futures):
+        for future in futures:
+            index, filename = pending.pop(future)
+            content_hash, text, error = future.result()
+            yield index, filename, content_hash, text, error
+
+    for index, (filename, read) in enumerate(entries):
+        while len(pending) >= in_flight:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            yield from finished(done)
+        # Reading happens in the worker too, so the bytes exist only inside the window
+        future = _pool.submit(contextvars.copy_context().run, _extract, filename, read)
+        pending[future] = (index, filename)
+
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        yield from finished(done)
@@ -0,0 +1,166 @@
+import datetime
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from database import SessionLocal, ChatMessage, InterviewContext
+from ranking import estimate_tokens
+import interview_manager as interviewer
+
+load_dotenv()
+
+# --- Configuration ---
+INTERVIEW_PROMPT_TOKENS = int(os.environ.get("INTERVIEW_PROMPT_TOKENS", "3000"))    # whole prompt per turn
+INTERVIEW_PROFILE_TOKENS = int(os.environ.get("INTERVIEW_PROFILE_TOKENS", "1200"))  # resume + job description
+INTERVIEW_RECENT_TOKENS = int(os.environ.get("INTERVIEW_RECENT_TOKENS", "1000"))    # turns kept verbatim
+INTERVIEW_SUMMARY_TOKENS = int(os.environ.get("INTERVIEW_SUMMARY_TOKENS", "300"))   # rolling summary cap
+SUMMARY_MIN_MESSAGES = 4  # fold older turns in chunks, not one LLM call per message
+MESSAGE_OVERHEAD_TOKENS = 4  # role/formatting tokens the API adds per message
+# Summaries are off the request path; several workers so one slow LLM call can't stall every other session
+INTERVIEW_SUMMARY_WORKERS = int(os.environ.get("INTERVIEW_SUMMARY_WORKERS", "4"))
+
+# _pending keeps any one session from being folded twice at once
+_summary_pool = ThreadPoolExecutor(max_workers=max(1, INTERVIEW_SUMMARY_WORKERS), thread_name_prefix="interview-summary")
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def truncate_to_tokens(text, max_tokens):
+    text = text or ""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[:max_tokens * 4]
+    space = cut.rfind(" ")
+    if space > len(cut) // 2:
+        cut = cut[:space]
+    return cut + " [...]"
+
+
+def remember_profile(db, session_id, resume_text, job_desc):
+    """
+    Stores the resume/JD the first time a session sends them (or when they change); later turns may omit them.
+    Leaves committing to the caller so it lands in the same transaction as the turn's message.
+    """
+    context = db.get(InterviewContext, session_id)
+    if context is None:
+        context = InterviewContext(session_id=session_id, resume_text="", job_desc="", summary="", summarized_until=0)
+        db.add(context)
+    if resume_text and resume_text != context.resume_text:
+        context.resume_text = resume_text
+    if job_desc and job_desc != context.job_desc:
+        context.job_desc = job_desc
+    context.updated_at = datetime.datetime.utcnow()
+    return context
+
+
+def _profile(resume_text, job_desc):
+    """Resume and JD cut to INTERVIEW_PROFILE_TOKENS; the JD gets at most half, a short JD leaves more for the resume."""
+    job_desc = truncate_to_tokens(job_desc, INTERVIEW_PROFILE_TOKENS // 2)
+    resume_budget = INTERVIEW_PROFILE_TOKENS - estimate_tokens(job_desc)
+    return truncate_to_tokens(resume_text, resume_budget), job_desc
+
+
+def _as_turn(role, content):
+    return {"role": "assistant" if role in ("bot", "assistant") else "user", "content": str(content)}
+
+
+def _unsummarized_turns(db, session_id, summarized_until):
+    rows = db.query(ChatMessage.id, ChatMessage.role, ChatMessage.content).filter(
+        ChatMessage.session_id == session_id,
+        ChatMessage.type == 'text',
+        ChatMessage.id > (summarized_until or 0),
+    ).order_by(ChatMessage.id).all()
+    return [(row.id, _as_turn(row.role, row.content)) for row in rows]
+
+
+def _turn_tokens(turn):
+    return estimate_tokens(turn["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _newest_within(turns, budget):
+    """How many of the newest turns fit in `budget` tokens (always at least one)."""
+    kept = 0
+    for _, turn in reversed(turns):
+        cost = _turn_tokens(turn)
+        if kept and cost > budget:
+            break
+        budget -= cost
+        kept += 1
+    return kept
+
+
+def assemble_prompt(db, session_id, pending=None):
+    """
+    Builds the interviewer messages within INTERVIEW_PROMPT_TOKENS: instructions + profile + rolling summary,
+    then as many of the newest not-yet-summarized turns as fit. Returns (messages, token report).
+    `pending` is the current, not yet committed message_log.Turn: its profile and messages count as if stored.
+    """
+    context = db.get(InterviewContext, session_id) if session_id else None
+    resume_text, job_desc = (context.resume_text, context.job_desc) if context else ("", "")
+    summary = context.summary if context else ""
+    if pending:
+        resume_text = pending.resume_text or resume_text
+        job_desc = pending.job_desc or job_desc
+    resume_text, job_desc = _profile(resume_text, job_desc)
+    base = interviewer.build_interview_messages([], resume_text, job_desc, summary=summary or None)
+    base_tokens = estimate_tokens(base[0]["content"]) + MESSAGE_OVERHEAD_TOKENS
+
+    turns = _unsummarized_turns(db, session_id, context.summarized_until if context else 0) if session_id else []
+    if pending:
+        turns += [(None, _as_turn(m["role"], m["content"])) for m in pending.messages if m["type"] == "text"]
+    kept = _newest_within(turns, INTERVIEW_PROMPT_TOKENS - base_tokens) if turns else 0
+    history = [turn for _, turn in turns[len(turns) - kept:]]
+    history_tokens = sum(_turn_tokens(turn) for turn in history)
+
+    report = {
+        "prompt_tokens": base_tokens + history_tokens,
+        "budget": INTERVIEW_PROMPT_TOKENS,
+        "profile_tokens": estimate_tokens(resume_text) + estimate_tokens(job_desc),
+        "summary_tokens": estimate_tokens(summary),
+        "history_tokens": history_tokens,
+        "turns_in_prompt": len(history),
+        "turns_dropped": len(turns) - len(history),  # only while a summary update is still pending
+    }
+    return base + history, report
+
+
+def _fold_older_turns(session_id, min_messages):
+    db = SessionLocal()
+    try:
+        context = db.get(InterviewContext, session_id)
+        if context is None:
+            return
+        turns = _unsummarized_turns(db, session_id, context.summarized_until)
+        older = turns[:len(turns) - _newest_within(turns, INTERVIEW_RECENT_TOKENS)] if turns else []
+        if not older or len(older) < min_messages:
+            return
+
+        summary = interviewer.summarize_interview(context.summary, [turn for _, turn in older], INTERVIEW_SUMMARY_TOKENS)
+        context.summary = truncate_to_tokens(summary, INTERVIEW_SUMMARY_TOKENS)
+        context.summarized_until = older[-1][0]
+        context.updated_at = datetime.datetime.utcnow()
+        db.commit()
+    except Exception as e:
+        # The turns stay unsummarized and are retried after the next turn
+        db.rollback()
+        print(f"Interview Summary Error ({session_id}): {e}")
+    finally:
+        db.close()
+        with _pending_lock:
+            _pending.discard(session_id)
+
+
+def schedule_summary(session_id, report=None):
+    """
+    After a turn: folds turns that slid out of the verbatim window into the summary, in the background.
+    Waits for SUMMARY_MIN_MESSAGES of them, unless the last prompt (`report`) dropped turns or was near the budget.
+    """
+    pressed = report and (report["turns_dropped"] or report["prompt_tokens"] > 0.9 * report["budget"])
+    min_messages = 1 if pressed else SUMMARY_MIN_MESSAGES
+    with _pending_lock:
+        if session_id in _pending:
+            return
+        _pending.add(session_id)
+    _summary_pool.submit(_fold_older_turns, session_id, min_messages)
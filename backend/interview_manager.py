@@ -1,31 +1,47 @@
+import contextvars
 import os
+import re
 import tempfile
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
-from openai import OpenAI
-from gtts import gTTS
-from faster_whisper import WhisperModel
+
+from llm_gateway import gateway
+from stt_models import whisper_pool, decode_audio_bytes
+from tts import synthesizer
+import metrics
 
 load_dotenv()
 
-client_llm = OpenAI(
-    api_key=os.environ.get("OPENROUTER_API_KEY"),
-    base_url="https://openrouter.ai/api/v1",
-)
+# Model, timeout, retries and hedging come from the gateway's "interview" and "summary" routes.
+# The fallback is only used once the gateway has given up (retries exhausted or circuit open).
+FALLBACK_QUESTION = "Let's move to the next topic. Can you tell me about your strengths?"
 
-MODEL_SIZE = "base.en" 
+# Sentences of a streamed reply are synthesized in parallel while later ones are still being generated
+TTS_CONCURRENCY = int(os.environ.get("TTS_CONCURRENCY", "2"))
+tts_pool = ThreadPoolExecutor(max_workers=TTS_CONCURRENCY, thread_name_prefix="tts")
 
-print("Loading Whisper Model..")
-stt_model = WhisperModel(MODEL_SIZE, device="cpu", compute_type="int8")
-print("Whisper Model Loaded!")
+SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+")
+MIN_SENTENCE_CHARS = 20  # shorter fragments ("Great.") are merged into the next sentence
 
 
 def text_to_speech(text):
-    """Converts AI text to an Audio file using Google TTS (Free)"""
+    """Converts AI text to an audio file (mp3 for gTTS, wav for the offline backends)"""
+    audio = synthesize_speech(text)
+    if not audio:
+        return None
+    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=synthesizer.extension)
+    with temp_file:
+        temp_file.write(audio)
+    return temp_file.name
+
+
+def synthesize_speech(text):
+    """Audio bytes for `text` from the configured TTS backend; repeated phrases come from the audio cache."""
     try:
-        tts = gTTS(text=text, lang='en')
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-        tts.save(temp_file.name)
-        return temp_file.name
+        with metrics.timed("tts.speech"):
+            return synthesizer.synthesize(text)
     except Exception as e:
         print(f"TTS Error: {e}")
         return None
@@ -34,24 +50,21 @@ def text_to_speech(text):
 def transcribe_audio(audio_bytes):
     """Converts User Audio to Text using Faster-Whisper (Local)"""
     try:
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
-            temp_audio.write(audio_bytes)
-            temp_audio_path = temp_audio.name
-
-        segments, info = stt_model.transcribe(temp_audio_path, beam_size=5)
+        # Decoded in memory: no temp file to write, read back, or leak on errors
+        with metrics.timed("stt.decode"):
+            audio = decode_audio_bytes(audio_bytes)
 
-        full_text = " ".join([segment.text for segment in segments])
-        
-        os.remove(temp_audio_path)
+        # Segments are produced lazily, so they must be consumed while the model is checked out
+        with metrics.timed("stt.transcribe"), whisper_pool.acquire() as stt_model:
+            segments, info = stt_model.transcribe(audio, beam_size=5)
+            full_text = " ".join([segment.text for segment in segments])
         
         return full_text.strip()
     except Exception as e:
         return f"Error transcribing: {str(e)}"
 
 
-def generate_interview_question(history, resume_text, job_desc):
-    """Generates the next question based on conversation history"""
-    
+def build_interview_messages(history, resume_text, job_desc, summary=None):
     system_prompt = f"""
     You are a professional Interviewer conducting a voice interview.
     
@@ -81,16 +94,141 @@ def generate_interview_question(history, resume_text, job_desc):
     - If candidate have questions related to HR/policy/salary/company, politely inform them that those will be discussed by HR later.
     - At the end of the interview, thank the candidate for their time and tell them you will be in touch soon.
     """
+    if summary:
+        system_prompt += f"""
+    SUMMARY OF THE INTERVIEW SO FAR (earlier turns, already covered):
+    {summary}
+    """
 
     messages = [{"role": "system", "content": system_prompt}]
     messages.extend(history)
+    return messages
+
+
+def generate_interview_question(history, resume_text, job_desc):
+    """Generates the next question based on conversation history"""
+    messages = build_interview_messages(history, resume_text, job_desc)
+    return complete_interview(messages)[0]
+
+
+def complete_interview(messages):
+    """Next interviewer reply for prebuilt messages -> (text, prompt tokens reported by the API or None)."""
+    try:
+        response = gateway.complete("interview", messages, temperature=0.7)
+        usage = getattr(response, "usage", None)
+        return response.choices[0].message.content, (usage.prompt_tokens if usage else None)
+    except Exception as e:
+        print(f"LLM Error: {e}")
+        metrics.error("llm.interview")
+        return FALLBACK_QUESTION, None
+
 
+def stream_interview(messages):
+    """Like complete_interview, but yields the reply as text deltas while the LLM produces it."""
+    produced = False
+    started = time.perf_counter()
     try:
-        response = client_llm.chat.completions.create(
-            model="openai/gpt-4o-mini",
-            messages=messages,
-            temperature=0.7
-        )
-        return response.choices[0].message.content
+        for chunk in gateway.stream("interview", messages, temperature=0.7):
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if not produced and metrics.METRICS_ENABLED:
+                    metrics.record("llm.interview_first_token", time.perf_counter() - started)
+                produced = True
+                yield delta
+        if metrics.METRICS_ENABLED:
+            metrics.record("llm.interview_stream", time.perf_counter() - started)
     except Exception as e:
-        return "Let's move to the next topic. Can you tell me about your strengths?"
\ No newline at end of file
+        print(f"LLM Stream Error: {e}")
+        if metrics.METRICS_ENABLED:
+            metrics.record("llm.interview_stream", time.perf_counter() - started, failed=True)
+        if not produced:
+            yield FALLBACK_QUESTION
+
+
+class SentenceSplitter:
+    """Accumulates streamed text and releases complete sentences as soon as their boundary arrives."""
+
+    def __init__(self, min_chars=MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, delta):
+        self._buffer += delta
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            if len(candidate) >= self.min_chars:
+                sentences.append(candidate)
+                start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self):
+        rest = self._buffer.strip()
+        self._buffer = ""
+        return [rest] if rest else []
+
+
+def summarize_interview(previous_summary, turns, max_tokens):
+    """Folds `turns` (role/content dicts) into the running summary. Raises on LLM failure so the caller can retry later."""
+    transcript = "\n".join(
+        f"{'Interviewer' if turn['role'] == 'assistant' else 'Candidate'}: {turn['content']}" for turn in turns
+    )
+    prompt = f"""
+    Update the running summary of a job interview with the new turns below.
+    Keep: topics and questions already covered, key facts the candidate stated, strengths and weak spots observed.
+    Drop greetings and filler. Write at most {max_tokens * 3 // 4} words of plain text.
+
+    CURRENT SUMMARY:
+    {previous_summary or "(none yet)"}
+
+    NEW TURNS:
+    {transcript}
+    """
+    response = gateway.complete("summary", [{"role": "user", "content": prompt}], temperature=0.2,
+                                max_tokens=max_tokens)
+    return response.choices[0].message.content.strip()
+
+
+def iter_interview_turn(messages):
+    """
+    Sentence-pipelined interview turn. Yields events:
+      {"type": "text", "delta": str}                                   as tokens arrive
+      {"type": "audio", "index": i, "text": str, "audio": bytes, "media_type": str}  per sentence, in order
+      {"type": "done", "ai_text": str}                                 full reply, once everything is sent
+    Each sentence goes to TTS the moment it is complete, so the first audio is ready long before the LLM finishes.
+    """
+    splitter = SentenceSplitter()
+    pending = deque()  # (index, sentence, future) in speaking order
+    parts = []
+    next_index = 0
+
+    def submit(sentences):
+        nonlocal next_index
+        for sentence in sentences:
+            future = tts_pool.submit(contextvars.copy_context().run, synthesize_speech, sentence)
+            pending.append((next_index, sentence, future))
+            next_index += 1
+
+    def ready_audio(block):
+        # Only the head of the queue may be sent, so segments always play in order
+        while pending and (block or pending[0][2].done()):
+            index, sentence, future = pending.popleft()
+            audio = future.result()
+            if audio:
+                yield {"type": "audio", "index": index, "text": sentence, "audio": audio,
+                       "media_type": synthesizer.media_type}
+
+    for delta in stream_interview(messages):
+        parts.append(delta)
+        yield {"type": "text", "delta": delta}
+        submit(splitter.feed(delta))
+        yield from ready_audio(block=False)
+
+    submit(splitter.flush())
+    yield from ready_audio(block=True)
+
+    yield {"type": "done", "ai_text": "".join(parts).strip()}
\ No newline at end of file
@@ -0,0 +1,391 @@
+import datetime
+import os
+import socket
+import threading
+import uuid
+
+from dotenv import load_dotenv
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import defer
+
+from database import SessionLocal, ChatMessage, Job, JobItem
+import analyze_and_summary as analyzer
+import ingest
+import metrics
+import scheduler
+import slot_allocator
+
+load_dotenv()
+
+# --- Configuration ---
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))  # worker threads per API process, 0 = run `python jobs.py`
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", "1.0"))
+JOB_LEASE_SECONDS = float(os.environ.get("JOB_LEASE_SECONDS", "30"))  # running jobs with an older heartbeat are re-claimed
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))  # claims before a job that keeps dying is failed
+JOB_INTAKE_CHUNK = 100  # uploaded items per commit while a job is being submitted
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _now():
+    return datetime.datetime.utcnow()
+
+
+# --- Submission ---
+
+def submit_analysis(job_description, entries, top_k=None, session_id=None):
+    """
+    entries: iterable of (filename, read), e.g. from ingest.zip_entries; read() returns the PDF bytes.
+    Stores everything the job needs and returns its id without doing any work. Items are written in
+    chunks, so a large archive never sits in memory; the job stays `receiving` (unclaimable) until all are in.
+    """
+    job_id = str(uuid.uuid4())
+    db = SessionLocal()
+    try:
+        db.add(Job(id=job_id, kind="analyze", status="receiving", session_id=session_id, total_items=0,
+                   params={"job_description": job_description, "top_k": top_k}))
+        db.commit()
+        total = 0
+        for filename, read in entries:
+            db.add(JobItem(job_id=job_id, position=total, payload={"filename": filename}, data=read()))
+            total += 1
+            if total % JOB_INTAKE_CHUNK == 0:
+                db.commit()
+                db.expunge_all()  # drop the written PDFs from the identity map
+        db.query(Job).filter(Job.id == job_id).update({Job.status: "queued", Job.total_items: total},
+                                                      synchronize_session=False)
+        db.commit()
+        return job_id
+    except Exception:
+        db.rollback()
+        db.query(JobItem).filter(JobItem.job_id == job_id).delete(synchronize_session=False)
+        db.query(Job).filter(Job.id == job_id).delete(synchronize_session=False)
+        db.commit()
+        raise
+    finally:
+        db.close()
+
+
+def submit_schedule(candidates, start_datetime_obj, interviewers=None):
+    """Slots are booked here, at submit time, so retries and resumes can never reshuffle them."""
+    job_id = str(uuid.uuid4())
+    assignments = scheduler.assign_slots(candidates, start_datetime_obj, interviewers, job_id=job_id)
+    db = SessionLocal()
+    try:
+        items = []
+        for i, (cand, slot) in enumerate(assignments):
+            payload = {"name": cand['name'], "email": cand['email'], "slot": slot.start.isoformat() if slot else None}
+            if slot is None:
+                items.append(JobItem(job_id=job_id, position=i, payload=payload, status="done",
+                                     result={"log": scheduler.skip_log(cand)}))
+            else:
+                payload.update(interviewer_id=slot.interviewer_id, interviewer_name=slot.interviewer_name,
+                               booking_id=slot.booking_id)
+                items.append(JobItem(job_id=job_id, position=i, payload=payload))
+        skipped = sum(item.status == "done" for item in items)
+        db.add(Job(id=job_id, kind="schedule", total_items=len(items), done_items=skipped,
+                   params={"start_time": start_datetime_obj.isoformat(), "interviewers": interviewers}))
+        db.add_all(items)
+        db.commit()
+        return job_id
+    except Exception:
+        slot_allocator.release([slot.booking_id for _, slot in assignments if slot is not None])
+        raise
+    finally:
+        db.close()
+
+
+def job_status(job_id, include_items=False):
+    db = SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        if job is None:
+            return None
+        finished = job.done_items + job.failed_items
+        status = {
+            "job_id": job.id,
+            "kind": job.kind,
+            "status": job.status,
+            "session_id": job.session_id,
+            "progress": {
+                "total": job.total_items,
+                "done": job.done_items,
+                "failed": job.failed_items,
+                "percent": round(100 * finished / job.total_items, 1) if job.total_items else 100.0,
+            },
+            "attempts": job.attempts,
+            "created_at": job.created_at,
+            "started_at": job.started_at,
+            "finished_at": job.finished_at,
+            "error": job.error,
+            "result": job.result if job.status == "completed" else None,
+        }
+        if include_items:
+            rows = db.query(JobItem.position, JobItem.status, JobItem.error).filter(
+                JobItem.job_id == job_id
+            ).order_by(JobItem.position).all()
+            status["items"] = [{"position": p, "status": s, "error": e} for p, s, e in rows]
+        return status
+    finally:
+        db.close()
+
+
+# --- Execution ---
+
+class JobLost(Exception):
+    """Another worker took over the job (our heartbeat lapsed); stop without touching it further."""
+
+
+class _Lease:
+    """Keeps a claimed job's heartbeat fresh from a side thread while the runner works."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"job-lease-{job_id[:8]}", daemon=True)
+
+    def _beat(self):
+        while not self._stop.wait(JOB_LEASE_SECONDS / 3):
+            db = SessionLocal()
+            try:
+                updated = db.query(Job).filter(Job.id == self.job_id, Job.worker_id == WORKER_ID).update(
+                    {Job.heartbeat_at: _now()}, synchronize_session=False
+                )
+                db.commit()
+                if not updated:
+                    self.lost = True
+                    return
+            except Exception as e:
+                db.rollback()
+                print(f"Job Heartbeat Error ({self.job_id}): {e}")
+            finally:
+                db.close()
+
+    def check(self):
+        if self.lost:
+            raise JobLost(self.job_id)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def claim_next_job():
+    """Atomically takes the oldest queued job, or a running one whose worker stopped heart-beating. Returns its id."""
+    db = SessionLocal()
+    try:
+        stale = _now() - datetime.timedelta(seconds=JOB_LEASE_SECONDS)
+        candidates = db.query(Job.id, Job.status, Job.heartbeat_at).filter(
+            or_(Job.status == "queued", and_(Job.status == "running", Job.heartbeat_at < stale))
+        ).order_by(Job.created_at).limit(10).all()
+
+        for job_id, status, heartbeat_at in candidates:
+            # Compare-and-set on (status, heartbeat): only one worker can win the same job
+            updated = db.query(Job).filter(
+                Job.id == job_id,
+                Job.status == status,
+                Job.heartbeat_at == heartbeat_at if heartbeat_at is not None else Job.heartbeat_at.is_(None),
+            ).update({
+                Job.status: "running",
+                Job.worker_id: WORKER_ID,
+                Job.heartbeat_at: _now(),
+                Job.attempts: Job.attempts + 1,
+            }, synchronize_session=False)
+            db.commit()
+            if updated:
+                return job_id
+        return None
+    finally:
+        db.close()
+
+
+def _record_item(db, job_id, item, status, result=None, error=None):
+    """Marks one item finished and bumps the job's counters in the same commit."""
+    item.status = status
+    item.result = result
+    item.error = error
+    item.updated_at = _now()
+    counter = Job.done_items if status == "done" else Job.failed_items
+    db.query(Job).filter(Job.id == job_id).update({counter: counter + 1}, synchronize_session=False)
+    db.commit()
+
+
+def _item_reader(item_id):
+    def read():
+        reader = SessionLocal()
+        try:
+            return reader.query(JobItem.data).filter(JobItem.id == item_id).scalar() or b""
+        finally:
+            reader.close()
+    return read
+
+
+def _load_items(db, job_id):
+    # The raw PDFs stay in the database; extraction reads them one window at a time
+    return db.query(JobItem).options(defer(JobItem.data)).filter(JobItem.job_id == job_id).order_by(JobItem.position).all()
+
+
+def _run_analysis(db, job, lease):
+    items = _load_items(db, job.id)
+
+    # 1. Extract text once; the raw PDF is dropped as soon as its text is stored
+    to_extract = [item for item in items if "text" not in item.payload]
+    # Read up front: the commits below expire the items, and reloading them one by one costs a query each
+    payloads = [item.payload for item in to_extract]
+    entries = [(payload["filename"], _item_reader(item.id)) for item, payload in zip(to_extract, payloads)]
+    for done, (index, _, content_hash, text, error) in enumerate(ingest.iter_extracted(entries), start=1):
+        item = to_extract[index]
+        item.payload = dict(payloads[index], content_hash=content_hash, text=text, extract_error=error)
+        item.data = None
+        if done % JOB_INTAKE_CHUNK == 0:
+            db.commit()
+            lease.check()
+    db.commit()
+    lease.check()
+    items = _load_items(db, job.id)  # one query instead of a refresh per expired item
+
+    # 2. Rank and score; items finished by an earlier attempt are passed through, not re-scored
+    filenames = [item.payload["filename"] for item in items]
+    resume_texts = [item.payload["text"] for item in items]
+    resume_ids = analyzer.store_extracted(filenames, [(item.payload["content_hash"], item.payload["text"]) for item in items])
+    completed = {item.position: item.result for item in items if item.status in ("done", "failed")}
+    failures = {item.position: item.payload["extract_error"] for item in items if item.payload.get("extract_error")}
+
+    results = []
+    events = analyzer.iter_analyze_extracted(job.params["job_description"], filenames, resume_texts,
+                                             job.params.get("top_k"), resume_ids, completed, failures)
+    for event in events:
+        lease.check()
+        if event["event"] == "candidate":
+            candidate = event["candidate"]
+            if candidate.get("stage") == "failed":  # unreadable PDF: counted as a failed item, keeps its record
+                _record_item(db, job.id, items[event["index"]], "failed", result=candidate,
+                             error=candidate["error"]["message"])
+            else:
+                _record_item(db, job.id, items[event["index"]], "done", result=candidate)
+        elif event["event"] == "results":
+            results = event["results"]
+
+    if job.session_id:
+        db.add(ChatMessage(session_id=job.session_id, role="bot", type="table", content=results))
+    return {"results": results}
+
+
+def _run_schedule(db, job, lease):
+    items = db.query(JobItem).filter(JobItem.job_id == job.id).order_by(JobItem.position).all()
+    pending = [item for item in items if item.status == "pending"]
+    messages = [
+        scheduler.build_confirmation_email(item.payload["name"], item.payload["email"],
+                                           datetime.datetime.fromisoformat(item.payload["slot"]),
+                                           item.payload.get("interviewer_name"))
+        for item in pending
+    ]
+
+    # Each item is committed as soon as its send finishes, so a restart only re-sends invitations in flight
+    for index, success in scheduler.mailer.iter_send(messages):
+        item = pending[index]
+        name = item.payload["name"]
+        if success:
+            slot = datetime.datetime.fromisoformat(item.payload["slot"])
+            log = scheduler.sent_log(name, slot, item.payload.get("interviewer_name"))
+            _record_item(db, job.id, item, "done", result={"log": log})
+        else:
+            _record_item(db, job.id, item, "failed", result={"log": f"Email Failed: {name} (Check Password/Internet)"},
+                         error="delivery failed")
+            slot_allocator.release([item.payload.get("booking_id")])
+        lease.check()
+
+    return {"logs": [item.result["log"] for item in items]}
+
+
+RUNNERS = {"analyze": _run_analysis, "schedule": _run_schedule}
+
+
+def run_job(job_id):
+    # The job id doubles as trace id, so /api/metrics/traces/{job_id} shows where a job's time went
+    token = metrics.trace_id_var.set(job_id)
+    db = SessionLocal()
+    try:
+        job = db.get(Job, job_id)
+        if job.attempts > JOB_MAX_ATTEMPTS:
+            job.status, job.error, job.finished_at = "failed", f"Gave up after {job.attempts - 1} attempts", _now()
+            db.commit()
+            return
+        if job.started_at is None:
+            job.started_at = _now()
+            db.commit()
+
+        with _Lease(job_id) as lease:
+            try:
+                result = RUNNERS[job.kind](db, job, lease)
+                lease.check()
+                db.refresh(job)
+                job.status, job.result, job.finished_at = "completed", result, _now()
+                db.commit()
+            except JobLost:
+                db.rollback()
+                print(f"Job {job_id} was taken over by another worker")
+            except Exception as e:
+                db.rollback()
+                print(f"Job Error ({job_id}): {e}")
+                db.query(Job).filter(Job.id == job_id).update(
+                    {Job.status: "failed", Job.error: str(e), Job.finished_at: _now()}, synchronize_session=False
+                )
+                db.commit()
+    finally:
+        db.close()
+        metrics.trace_id_var.reset(token)
+
+
+class JobWorker(threading.Thread):
+    def __init__(self, stop_event, name):
+        super().__init__(name=name, daemon=True)
+        self.stop_event = stop_event
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                job_id = claim_next_job()
+            except Exception as e:
+                print(f"Job Claim Error: {e}")
+                job_id = None
+            if job_id is None:
+                self.stop_event.wait(JOB_POLL_SECONDS)
+                continue
+            run_job(job_id)
+
+
+_stop_event = threading.Event()
+_workers = []
+
+
+def start_workers(count=JOB_WORKERS):
+    """Starts `count` worker threads. Interrupted jobs from a previous run are picked up once their lease expires."""
+    _stop_event.clear()
+    for i in range(count - len(_workers)):
+        worker = JobWorker(_stop_event, name=f"job-worker-{len(_workers)}")
+        worker.start()
+        _workers.append(worker)
+
+
+def stop_workers(timeout=5.0):
+    _stop_event.set()
+    for worker in _workers:
+        worker.join(timeout)
+    _workers.clear()
+
+
+if __name__ == "__main__":
+    # Standalone worker process (run the API with JOB_WORKERS=0 to keep all job work here)
+    start_workers(max(JOB_WORKERS, 1))
+    print(f"Job worker {WORKER_ID} running {len(_workers)} thread(s); Ctrl+C to stop")
+    try:
+        while True:
+            _stop_event.wait(3600)
+    except KeyboardInterrupt:
+        stop_workers()
@@ -0,0 +1,346 @@
+"""Shared LLM client: per-route models and timeouts, retries, circuit breaking and hedged requests."""
+import contextvars
+import itertools
+import os
+import random
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+import httpx
+import openai
+from openai import OpenAI
+from dotenv import load_dotenv
+
+import metrics
+
+load_dotenv()
+
+# --- Configuration ---
+OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY")
+OPENROUTER_BASE_URL = os.environ.get("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+DEFAULT_MODEL = "openai/gpt-4o-mini"
+
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", "64"))
+LLM_KEEPALIVE_CONNECTIONS = int(os.environ.get("LLM_KEEPALIVE_CONNECTIONS", "32"))
+LLM_KEEPALIVE_SECONDS = float(os.environ.get("LLM_KEEPALIVE_SECONDS", "60"))
+LLM_CONNECT_TIMEOUT = float(os.environ.get("LLM_CONNECT_TIMEOUT", "5"))
+LLM_BACKOFF_BASE = 1.0   # seconds
+LLM_BACKOFF_MAX = 30.0   # seconds
+LLM_BREAKER_FAILURES = int(os.environ.get("LLM_BREAKER_FAILURES", "5"))  # consecutive failures to open, 0 = never
+LLM_BREAKER_RESET_SECONDS = float(os.environ.get("LLM_BREAKER_RESET_SECONDS", "30"))  # then one trial call
+LLM_HEDGE_PERCENTILE = float(os.environ.get("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_SAMPLES = 20   # a route only hedges once it has seen this many calls
+LLM_LATENCY_WINDOW = 200     # recent successful calls per route behind the percentile
+
+Route = namedtuple("Route", "name model timeout max_retries hedge stage")
+
+
+def _route(name, model, timeout, retries, hedge, stage):
+    prefix = f"LLM_{name.upper()}_"
+    return Route(
+        name=name,
+        model=os.environ.get(prefix + "MODEL", model),
+        timeout=float(os.environ.get(prefix + "TIMEOUT", timeout)),
+        max_retries=int(os.environ.get(prefix + "RETRIES", retries)),
+        hedge=os.environ.get(prefix + "HEDGE", hedge).lower() == "true",
+        stage=stage,
+    )
+
+
+# Scoring is batch work: long timeout, patient retries, no hedging (it would double the token bill).
+# Interviews are a person waiting on a reply: short timeout, quick retries; hedging is opt-in, since
+# every hedged call is a second upstream request.
+_interview = _route("interview", DEFAULT_MODEL, "20", "2", "false", "llm.interview")
+ROUTES = {route.name: route for route in (
+    _route("scoring", DEFAULT_MODEL, "60", os.environ.get("SCORING_MAX_RETRIES", "4"), "false", "llm.scoring"),
+    _interview,
+    _route("summary", _interview.model, "30", "2", "false", "llm.summary"),
+)}
+
+
+class LLMUnavailable(Exception):
+    """The model's circuit breaker is open; the call was not sent."""
+
+
+def is_retryable(error):
+    """429s, 5xx and connection problems (timeouts included) are worth another attempt; 4xx client errors are not."""
+    if isinstance(error, openai.APIConnectionError):
+        return True
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code in (408, 409, 429) or error.status_code >= 500
+    return False
+
+
+def retry_delay(error, attempt):
+    response = getattr(error, "response", None)
+    if response is not None:
+        try:
+            return min(float(response.headers.get("retry-after", "")), LLM_BACKOFF_MAX)
+        except ValueError:
+            pass
+    # Exponential backoff with jitter so parallel callers don't retry in lockstep
+    delay = min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt))
+    return delay * (0.5 + random.random() / 2)
+
+
+class CircuitBreaker:
+    """
+    Closed until `failures` retryable failures in a row, then open (calls are refused) for `reset_seconds`.
+    After that one trial call is let through (half-open): success closes it, failure opens it again.
+    """
+
+    def __init__(self, failures=LLM_BREAKER_FAILURES, reset_seconds=LLM_BREAKER_RESET_SECONDS):
+        self.failures = failures
+        self.reset_seconds = reset_seconds
+        self._consecutive = 0
+        self._opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._trial or time.monotonic() - self._opened_at >= self.reset_seconds:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self._opened_at < self.reset_seconds:
+                return False
+            self._trial = True
+            return True
+
+    def success(self):
+        with self._lock:
+            self._consecutive = 0
+            self._opened_at = None
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self._consecutive += 1
+            self._trial = False
+            if self.failures and (self._opened_at is not None or self._consecutive >= self.failures):
+                if self._opened_at is None:
+                    print(f"LLM circuit opened after {self._consecutive} failures")
+                self._opened_at = time.monotonic()
+
+
+class LatencyWindow:
+    """The last `size` latencies of one route; percentile() is None until `min_samples` have been seen."""
+
+    def __init__(self, size=LLM_LATENCY_WINDOW, min_samples=LLM_HEDGE_MIN_SAMPLES):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, p):
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class LLMGateway:
+    """Shared client, per-route policy, per-model breakers. complete() and stream() block the calling thread."""
+
+    def __init__(self, routes=ROUTES, api_key=OPENROUTER_API_KEY, base_url=OPENROUTER_BASE_URL,
+                 max_connections=LLM_MAX_CONNECTIONS, keepalive_connections=LLM_KEEPALIVE_CONNECTIONS,
+                 keepalive_seconds=LLM_KEEPALIVE_SECONDS, breaker_failures=LLM_BREAKER_FAILURES,
+                 breaker_reset_seconds=LLM_BREAKER_RESET_SECONDS, hedge_percentile=LLM_HEDGE_PERCENTILE):
+        self.routes = dict(routes)
+        self.hedge_percentile = hedge_percentile
+        self.http_client = httpx.Client(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=keepalive_connections,
+                                keepalive_expiry=keepalive_seconds),
+            timeout=httpx.Timeout(max(route.timeout for route in self.routes.values()), connect=LLM_CONNECT_TIMEOUT),
+        )
+        # Retries are the gateway's job, so the SDK's own retry loop is off
+        self.client = OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            http_client=self.http_client,
+            default_headers={"HTTP-Referer": "https://localhost:8501", "X-Title": "Resume Matcher Agent"},
+        )
+        self.stats = {"calls": 0, "retries": 0, "hedged": 0, "hedge_wins": 0, "rejected": 0, "failed": 0}
+        self._breaker_args = (breaker_failures, breaker_reset_seconds)
+        self._breakers = {}
+        self._latency = {}
+        self._lock = threading.Lock()
+        # Hedged calls run both attempts here; the caller just waits for the first good answer
+        self._pool = ThreadPoolExecutor(max_workers=max(2, max_connections), thread_name_prefix="llm-hedge")
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _breaker(self, model):
+        with self._lock:
+            breaker = self._breakers.get(model)
+            if breaker is None:
+                breaker = self._breakers[model] = CircuitBreaker(*self._breaker_args)
+            return breaker
+
+    def _window(self, key):
+        with self._lock:
+            window = self._latency.get(key)
+            if window is None:
+                window = self._latency[key] = LatencyWindow()
+            return window
+
+    def _timeout(self, route):
+        return httpx.Timeout(route.timeout, connect=min(LLM_CONNECT_TIMEOUT, route.timeout))
+
+    def _submit(self, fn):
+        return self._pool.submit(contextvars.copy_context().run, fn)
+
+    def _race(self, route, window, attempt, before_attempt, discard=None):
+        """
+        attempt() once; on a hedged route with enough history, a second attempt() starts if the first has not
+        answered within the window's percentile. The first success wins; the loser's result goes to discard().
+        """
+        delay = window.percentile(self.hedge_percentile) if route.hedge else None
+        if delay is None:
+            return attempt()
+
+        primary = self._submit(attempt)
+        if wait([primary], timeout=delay).done:
+            return primary.result()
+
+        def hedge_attempt():
+            if before_attempt:
+                before_attempt()
+            return attempt()
+
+        self._count("hedged")
+        hedge = self._submit(hedge_attempt)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._count("hedge_wins")
+                    if discard:
+                        for loser in pending:
+                            loser.add_done_callback(
+                                lambda f: f.exception() is None and discard(f.result()))
+                    return future.result()
+        return primary.result()  # both failed: surface the first attempt's error
+
+    def _call(self, route_name, call, before_attempt, max_retries):
+        route = self.routes[route_name]
+        breaker = self._breaker(route.model)
+        retries = route.max_retries if max_retries is None else max_retries
+        self._count("calls")
+        for attempt in range(retries + 1):
+            if not breaker.allow():
+                self._count("rejected")
+                raise LLMUnavailable(f"{route.model} is failing; calls paused for up to {breaker.reset_seconds:g}s")
+            if before_attempt:
+                before_attempt()
+            try:
+                result = call(route)
+            except Exception as e:
+                if not is_retryable(e):
+                    breaker.success()  # the provider answered; the request itself was bad
+                    self._count("failed")
+                    raise
+                breaker.failure()
+                if attempt >= retries:
+                    self._count("failed")
+                    raise
+                delay = retry_delay(e, attempt)
+                self._count("retries")
+                print(f"LLM {route.name} call failed ({e}); retry {attempt + 1}/{retries} in {delay:.1f}s")
+                time.sleep(delay)
+                continue
+            breaker.success()
+            return result
+
+    def complete(self, route_name, messages, before_attempt=None, max_retries=None, **params):
+        """
+        One chat completion on a route; returns the SDK response. before_attempt() runs ahead of every attempt
+        (hedges included), e.g. a rate limiter. Raises LLMUnavailable while the breaker is open, else the last error.
+        """
+        def call(route):
+            window = self._window(route.name)
+
+            def attempt():
+                started = time.perf_counter()
+                with metrics.timed(route.stage):
+                    response = self.client.chat.completions.create(
+                        model=route.model, messages=messages, timeout=self._timeout(route), **params)
+                window.observe(time.perf_counter() - started)
+                return response
+
+            return self._race(route, window, attempt, before_attempt)
+
+        return self._call(route_name, call, before_attempt, max_retries)
+
+    def stream(self, route_name, messages, **params):
+        """
+        Streamed chat completion; returns an iterator of chunks. Attempts are retried (and hedged, timed on the
+        first chunk) only until a first chunk arrives; a stream that breaks after that raises to the caller.
+        """
+        def call(route):
+            window = self._window(f"{route.name}.first_chunk")
+
+            def attempt():
+                started = time.perf_counter()
+                stream = self.client.chat.completions.create(
+                    model=route.model, messages=messages, stream=True, timeout=self._timeout(route), **params)
+                try:
+                    first = next(iter(stream), None)
+                except BaseException:
+                    stream.close()
+                    raise
+                window.observe(time.perf_counter() - started)
+                return stream, first
+
+            return self._race(route, window, attempt, None, discard=lambda opened: opened[0].close())
+
+        stream, first = self._call(route_name, call, None, None)
+        return stream if first is None else itertools.chain([first], stream)
+
+    def snapshot(self):
+        """Routes with their recent p50/p95, breaker states and counters, for /api/llm/stats."""
+        with self._lock:
+            stats = dict(self.stats)
+            breakers = dict(self._breakers)
+            windows = dict(self._latency)
+
+        def latency(key):
+            window = windows.get(key)
+            if window is None:
+                return None
+            p50, p95 = window.percentile(50), window.percentile(95)
+            return {"p50": round(p50, 4), "p95": round(p95, 4)} if p95 is not None else None
+
+        routes = {
+            name: {"model": route.model, "timeout": route.timeout, "max_retries": route.max_retries,
+                   "hedge": route.hedge, "latency": latency(name),
+                   "first_chunk_latency": latency(f"{name}.first_chunk")}
+            for name, route in self.routes.items()
+        }
+        return {"routes": routes, "breakers": {model: b.state for model, b in breakers.items()}, "stats": stats}
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self.client.close()
+
+
+gateway = LLMGateway()
@@ -0,0 +1,190 @@
+import contextvars
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+
+from dotenv import load_dotenv
+
+import metrics
+
+load_dotenv()
+
+# --- Configuration ---
+SENDER_EMAIL = os.environ.get("SENDER_EMAIL")
+SENDER_PASSWORD = os.environ.get("SENDER_PASSWORD")
+SMTP_SERVER = os.environ.get("SMTP_SERVER", "smtp.gmail.com")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", "587"))
+SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "true").lower() == "true"
+SMTP_SSL = os.environ.get("SMTP_SSL", "false").lower() == "true"  # implicit TLS, usually port 465
+SMTP_TIMEOUT = float(os.environ.get("SMTP_TIMEOUT", "30"))
+SMTP_POOL_SIZE = int(os.environ.get("SMTP_POOL_SIZE", "4"))  # parallel authenticated connections
+SMTP_MESSAGES_PER_CONNECTION = int(os.environ.get("SMTP_MESSAGES_PER_CONNECTION", "100"))  # providers cap this
+SMTP_IDLE_SECONDS = float(os.environ.get("SMTP_IDLE_SECONDS", "60"))  # NOOP-check connections idle longer
+SMTP_MAX_RETRIES = int(os.environ.get("SMTP_MAX_RETRIES", "3"))
+
+
+def is_transient(error):
+    """4xx replies, dropped connections and socket errors are worth retrying; 5xx (bad address, auth) are not."""
+    if isinstance(error, (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError)):
+        return True
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPException):
+        return False
+    # Socket-level failures (timeouts, refused or reset connections); must come after SMTPException, an OSError subclass
+    return isinstance(error, OSError)
+
+
+class SMTPConnectionPool:
+    """
+    Up to `size` authenticated SMTP connections, reused across messages.
+    A connection is recycled after `max_messages` and health-checked with NOOP after sitting idle.
+    """
+
+    def __init__(self, host=SMTP_SERVER, port=SMTP_PORT, username=SENDER_EMAIL, password=SENDER_PASSWORD,
+                 starttls=SMTP_STARTTLS, use_ssl=SMTP_SSL, timeout=SMTP_TIMEOUT, size=SMTP_POOL_SIZE,
+                 max_messages=SMTP_MESSAGES_PER_CONNECTION, idle_seconds=SMTP_IDLE_SECONDS):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self.size = size
+        self.max_messages = max_messages
+        self.idle_seconds = idle_seconds
+        self._idle = queue.LifoQueue()  # (connection, messages sent, returned at); most recently used first
+        self._slots = threading.BoundedSemaphore(size)
+        self.stats = {"connections_opened": 0, "messages_sent": 0}
+        self._stats_lock = threading.Lock()
+
+    def _connect(self):
+        if self.use_ssl:
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.starttls:
+                server.starttls()
+        if self.username:
+            server.login(self.username, self.password)
+        with self._stats_lock:
+            self.stats["connections_opened"] += 1
+        return server
+
+    @staticmethod
+    def _close(server):
+        try:
+            server.quit()
+        except Exception:
+            try:
+                server.close()
+            except Exception:
+                pass
+
+    def _checkout(self):
+        while True:
+            try:
+                server, sent, returned_at = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect(), 0
+            if time.monotonic() - returned_at < self.idle_seconds:
+                return server, sent
+            try:
+                if server.noop()[0] == 250:
+                    return server, sent
+            except Exception:
+                pass
+            self._close(server)
+
+    @contextmanager
+    def connection(self):
+        """Yields an authenticated connection; one that raised is closed instead of going back to the pool."""
+        self._slots.acquire()
+        server = None
+        try:
+            server, sent = self._checkout()
+            yield server
+            sent += 1
+            with self._stats_lock:
+                self.stats["messages_sent"] += 1
+            if sent >= self.max_messages:
+                self._close(server)
+            else:
+                self._idle.put((server, sent, time.monotonic()))
+        except BaseException:
+            if server is not None:
+                self._close(server)
+            raise
+        finally:
+            self._slots.release()
+
+    def close(self):
+        while True:
+            try:
+                server, _, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(server)
+
+
+class Mailer:
+    """Sends through an SMTPConnectionPool, in parallel, retrying transient failures with jittered backoff."""
+
+    def __init__(self, pool=None, max_retries=SMTP_MAX_RETRIES, backoff_base=0.5, backoff_max=8.0):
+        self.pool = pool or SMTPConnectionPool()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._executor = ThreadPoolExecutor(max_workers=self.pool.size, thread_name_prefix="smtp")
+
+    def send(self, msg):
+        """True once the server accepted `msg`; False after a permanent error or exhausted retries."""
+        with metrics.timed("smtp.send"):
+            sent = self._send(msg)
+        if not sent:
+            metrics.error("smtp.send")
+        return sent
+
+    def _send(self, msg):
+        for attempt in range(self.max_retries + 1):
+            try:
+                with self.pool.connection() as server:
+                    server.send_message(msg)
+                return True
+            except Exception as e:
+                if attempt == self.max_retries or not is_transient(e):
+                    print(f"Mail Error ({msg['To']}): {e}")
+                    return False
+                delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                time.sleep(delay * random.uniform(0.5, 1.0))
+        return False
+
+    def _submit(self, msg):
+        # The caller's trace id follows each send into the pool
+        return self._executor.submit(contextvars.copy_context().run, self.send, msg)
+
+    def send_many(self, messages):
+        """Sends all messages over the pool's connections in parallel; results are in input order."""
+        futures = [self._submit(msg) for msg in messages]
+        return [future.result() for future in futures]
+
+    def iter_send(self, messages):
+        """Like send_many, but yields (index, success) as each message finishes, for per-message progress."""
+        futures = {self._submit(msg): index for index, msg in enumerate(messages)}
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.pool.close()
+
+
+mailer = Mailer()
@@ -1,75 +1,68 @@
 import os
+import asyncio
 import base64
 import datetime
 import json
+import logging
+import threading
 import uuid
+from contextlib import asynccontextmanager
 from typing import List, Optional, Any
 
-from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, Depends, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.staticfiles import StaticFiles 
+from fastapi.encoders import jsonable_encoder
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
-from sqlalchemy import create_engine, Column, Integer, String, JSON, DateTime, Text, ForeignKey
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker, Session, relationship
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
 
+from database import ChatSession, ChatMessage, InterviewContext, SessionLocal, get_db
 import analyze_and_summary as analyzer
+import ingest
+import llm_gateway
+import pdf_extract
 import scheduler
+import slot_allocator
+import jobs
 import interview_manager as interviewer
+import interview_context
+import tts
+from executors import run_io, run_stt, iterate_io
+import executors
+from cache import cache_stats
+import metrics
+from message_log import message_log, Turn
+from pagination import page_size, encode_cursor, decode_cursor, make_etag, etag_matches, not_modified, conditional_json
+import resume_store
+import stt_models
+from streaming_stt import StreamingTranscriber
 
 load_dotenv()
 
-# --- DATABASE SETUP ---
-DATABASE_URL = os.environ.get("POSTGRES_DB_URL")
+logger = logging.getLogger(__name__)
 
-if not DATABASE_URL:
-    print("Warning: POSTGRES_DB_URL not found. Using SQLite fallback.")
-    DATABASE_URL = "sqlite:///./app.db"
+# Old clients read the reply audio from `audio_base64`; new ones fetch `audio_url`
+AUDIO_BASE64_COMPAT = os.environ.get("AUDIO_BASE64_COMPAT", "false").lower() == "true"
 
-connect_args = {"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Whisper loads lazily on the first transcription; optionally pay that cost up front, off the startup path
+    if stt_models.WHISPER_WARMUP:
+        threading.Thread(target=stt_models.whisper_pool.warm_up, name="whisper-warmup", daemon=True).start()
+    # Background jobs; anything interrupted by the last shutdown resumes once its lease expires
+    jobs.start_workers()
+    yield
+    jobs.stop_workers()
+    message_log.close()  # write-behind: commit turns still queued
+    pdf_extract.extractor.shutdown()
+    llm_gateway.gateway.close()
+    executors.shutdown()
 
-engine = create_engine(DATABASE_URL, connect_args=connect_args)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-# --- DATABASE MODELS ---
-
-class ChatSession(Base):
-    __tablename__ = "chat_sessions"
-    
-    id = Column(String, primary_key=True, index=True) # UUID
-    title = Column(String)
-    created_at = Column(DateTime, default=datetime.datetime.utcnow)
-    
-    # Cascade delete messages when session is deleted
-    messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
-
-class ChatMessage(Base):
-    __tablename__ = "chat_history"
-
-    id = Column(Integer, primary_key=True, index=True)
-    session_id = Column(String, ForeignKey("chat_sessions.id"))
-    role = Column(String)  
-    type = Column(String)  
-    content = Column(JSON) 
-    timestamp = Column(DateTime, default=datetime.datetime.utcnow)
-    
-    session = relationship("ChatSession", back_populates="messages")
-
-# Create Tables
-Base.metadata.create_all(bind=engine)
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-app = FastAPI(title="SmartHire API")
+app = FastAPI(title="SmartHire API", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -77,198 +70,693 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Trace-Id"],
 )
 
+# Trace ids and request timings; skipped entirely when METRICS_ENABLED=false
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
 # --- Pydantic Models ---
 class ScheduleRequest(BaseModel):
     candidates: List[dict]
     start_time: Optional[str] = None
+    # [{"id", "name", "windows": [{"start", "end"}], "busy": [{"start", "end"}]}]; working hours when windows are omitted
+    interviewers: Optional[List[dict]] = None
 
 class ChatRequest(BaseModel):
     user_text: str
     session_id: Optional[str] = None
-    job_desc: Optional[str] = ""
+    job_desc: Optional[str] = ""     # only needed on the first turn; kept server-side per session
     resume_text: Optional[str] = ""
+    audio_base64: Optional[bool] = None  # also inline the audio as base64 (defaults to AUDIO_BASE64_COMPAT)
 
 class RenameSessionRequest(BaseModel):
     new_title: str
 
 # --- HELPER: Get or Create Session ---
+def session_title(title_hint: str):
+    return (title_hint[:30] + '..') if len(title_hint) > 30 else title_hint
+
 def get_or_create_session(db: Session, session_id: str = None, title_hint: str = "New Chat"):
     if session_id:
+        message_log.sync(session_id)
         session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
         if session:
             return session
     
     new_id = str(uuid.uuid4())
-    safe_title = (title_hint[:30] + '..') if len(title_hint) > 30 else title_hint
-    session = ChatSession(id=new_id, title=safe_title)
+    session = ChatSession(id=new_id, title=session_title(title_hint))
     db.add(session)
     db.commit()
     db.refresh(session)
     return session
 
+def parse_start_time(start_time: Optional[str]):
+    if start_time:
+        return datetime.datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+    return datetime.datetime.now()
+
+class NamedUpload:
+    """An upload's file object carrying its filename (SpooledTemporaryFile.name is read-only and None)."""
+
+    def __init__(self, upload: UploadFile):
+        self.name = upload.filename
+        self._file = upload.file
+
+    def __getattr__(self, attr):
+        return getattr(self._file, attr)
+
+
+def as_named_files(resumes: List[UploadFile]):
+    """The analyzer reads plain file objects and reports errors by `.name`."""
+    return [NamedUpload(file) for file in resumes]
+
+def bulk_entries(resumes: Optional[List[UploadFile]], archive: Optional[UploadFile]):
+    """(count, entries) for ingest.iter_extracted from a ZIP upload or a list of PDF uploads."""
+    if archive is not None and archive.filename:
+        return ingest.zip_entries(archive.file)
+    if resumes:
+        return ingest.upload_entries(resumes)
+    raise ingest.IngestError("Upload a ZIP `archive` or one or more `resumes`")
+
+def begin_turn(db: Session, session_id: Optional[str], title_hint: str, **profile):
+    """A message_log.Turn for an existing session, or one that creates the session when it is committed."""
+    if session_id:
+        message_log.sync(session_id)
+        if db.query(ChatSession.id).filter(ChatSession.id == session_id).first():
+            return Turn(session_id, **profile)
+    return Turn(title=session_title(title_hint), **profile)
+
+def save_message(session_id: str, role: str, type: str, content):
+    """Persists one ChatMessage with its own DB session (for work that outlives the request's session)."""
+    db = SessionLocal()
+    try:
+        db.add(ChatMessage(session_id=session_id, role=role, type=type, content=content))
+        db.commit()
+    finally:
+        db.close()
+
+async def ndjson_analysis_stream(events, session_id: str):
+    """
+    Serializes analyzer events as NDJSON and persists the final table as a ChatMessage.
+    Runs after the request handler returned, so it uses its own DB session.
+    """
+    yield json.dumps({"event": "session", "session_id": session_id}) + "\n"
+    try:
+        async for event in iterate_io(events):
+            if event["event"] == "results":
+                await run_io(save_message, session_id, "bot", "table", event["results"])
+                event = dict(event, session_id=session_id)
+            yield json.dumps(event) + "\n"
+    except Exception as e:
+        print(f"Error: {e}")
+        yield json.dumps({"event": "error", "error": str(e)}) + "\n"
+
+def audio_fields(audio: bytes, media_type: str, inline_base64: bool):
+    """Response fields for a reply clip: a short-lived URL, plus base64 for clients that still need it."""
+    clip_id = tts.store_clip(audio, media_type)
+    fields = {"audio_id": clip_id, "audio_url": f"/api/audio/{clip_id}", "media_type": media_type}
+    if inline_base64:
+        with metrics.timed("audio.base64"):
+            fields["audio_base64"] = base64.b64encode(audio).decode('utf-8')
+    return fields
+
+def parse_byte_range(header: str, size: int):
+    """(start, end) inclusive for a single `bytes=` range; None if absent or unparsable; raises 416 if unsatisfiable."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            # Suffix range: the last N bytes
+            start, end = max(size - int(end_text), 0), size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        raise HTTPException(status_code=416, detail="Range not satisfiable", headers={"Content-Range": f"bytes */{size}"})
+    return start, min(end, size - 1)
+
 # --- API Endpoints ---
 
 @app.post("/api/reset")
 async def reset_session(db: Session = Depends(get_db)):
     """Deletes ALL sessions."""
-    try:
-        db.query(ChatSession).delete()
-        db.commit()
-        return {"status": "reset", "message": "All history cleared"}
-    except Exception as e:
-        db.rollback()
-        # Fallback
-        db.query(ChatMessage).delete()
-        db.query(ChatSession).delete()
-        db.commit()
-        return {"status": "reset", "message": "All history cleared (Fallback)"}
+    def reset():
+        message_log.flush()
+        try:
+            db.query(ChatSession).delete()
+            db.commit()
+            return {"status": "reset", "message": "All history cleared"}
+        except Exception as e:
+            db.rollback()
+            # Fallback
+            db.query(InterviewContext).delete()
+            db.query(ChatMessage).delete()
+            db.query(ChatSession).delete()
+            db.commit()
+            return {"status": "reset", "message": "All history cleared (Fallback)"}
+
+    return await run_io(reset)
 
 @app.get("/api/sessions")
-async def get_sessions(db: Session = Depends(get_db)):
-    """Get list of chat sessions."""
-    sessions = db.query(ChatSession).order_by(ChatSession.created_at.desc()).all()
-    return {"sessions": sessions}
+async def get_sessions(request: Request, limit: int = 50, cursor: Optional[str] = None, db: Session = Depends(get_db)):
+    """Get one page of chat sessions, newest first; pass next_cursor back for the following page."""
+    limit = page_size(limit, 50, 200)
+
+    def load_page():
+        message_log.sync()
+        query = db.query(ChatSession.id, ChatSession.title, ChatSession.created_at)
+        if cursor:
+            created_at, session_id = decode_cursor(cursor)
+            query = query.filter(or_(
+                ChatSession.created_at < created_at,
+                and_(ChatSession.created_at == created_at, ChatSession.id < session_id),
+            ))
+        return query.order_by(ChatSession.created_at.desc(), ChatSession.id.desc()).limit(limit + 1).all()
+
+    rows = await run_io(load_page)
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+    sessions = [{"id": r.id, "title": r.title, "created_at": r.created_at} for r in page]
+    return conditional_json(
+        request, make_etag(sessions, next_cursor),
+        lambda: jsonable_encoder({"sessions": sessions, "next_cursor": next_cursor}),
+    )
 
 @app.get("/api/history/{session_id}")
-async def get_session_history(session_id: str, db: Session = Depends(get_db)):
-    """Get messages for a specific session."""
-    messages = db.query(ChatMessage).filter(ChatMessage.session_id == session_id).order_by(ChatMessage.timestamp).all()
-    return {"history": messages}
+async def get_session_history(
+    session_id: str,
+    request: Request,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    view: str = "full",
+    db: Session = Depends(get_db),
+):
+    """
+    Get one page of a session's messages, oldest first.
+    view=lean leaves out table contents (fetch one with /api/history/{session_id}/messages/{id}).
+    """
+    if view not in ("full", "lean"):
+        raise HTTPException(status_code=400, detail="view must be 'full' or 'lean'")
+    limit = page_size(limit, 100, 500)
+
+    def load_keys():
+        message_log.sync(session_id)
+        query = db.query(ChatMessage.id, ChatMessage.timestamp).filter(ChatMessage.session_id == session_id)
+        if cursor:
+            timestamp, message_id = decode_cursor(cursor)
+            query = query.filter(or_(
+                ChatMessage.timestamp > timestamp,
+                and_(ChatMessage.timestamp == timestamp, ChatMessage.id > message_id),
+            ))
+        return query.order_by(ChatMessage.timestamp, ChatMessage.id).limit(limit + 1).all()
+
+    # Messages are never edited, so the page's ids identify its content; unchanged pages skip loading it
+    keys = await run_io(load_keys)
+    page = keys[:limit]
+    next_cursor = encode_cursor(page[-1].timestamp, page[-1].id) if len(keys) > limit else None
+    etag = make_etag(session_id, view, [k.id for k in page], next_cursor)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    def load_messages():
+        ids = [k.id for k in page]
+        if view == "lean":
+            rows = db.query(ChatMessage.id, ChatMessage.session_id, ChatMessage.role, ChatMessage.type,
+                            ChatMessage.timestamp).filter(ChatMessage.id.in_(ids)).all()
+            text_ids = [r.id for r in rows if r.type == "text"]
+            texts = dict(db.query(ChatMessage.id, ChatMessage.content).filter(ChatMessage.id.in_(text_ids))) if text_ids else {}
+            messages = {
+                r.id: {"id": r.id, "session_id": r.session_id, "role": r.role, "type": r.type, "timestamp": r.timestamp,
+                       "content": texts.get(r.id), "content_omitted": r.type != "text"}
+                for r in rows
+            }
+        else:
+            messages = {m.id: m for m in db.query(ChatMessage).filter(ChatMessage.id.in_(ids))}
+        return [messages[i] for i in ids]
+
+    history = await run_io(load_messages)
+    return conditional_json(
+        request, etag,
+        lambda: jsonable_encoder({"history": history, "next_cursor": next_cursor}),
+    )
+
+@app.get("/api/history/{session_id}/messages/{message_id}")
+async def get_history_message(session_id: str, message_id: int, db: Session = Depends(get_db)):
+    """Get one full message, e.g. a table left out of a lean history page."""
+    message = await run_io(
+        lambda: db.query(ChatMessage).filter(ChatMessage.session_id == session_id, ChatMessage.id == message_id).first()
+    )
+    if not message:
+        raise HTTPException(status_code=404, detail="Message not found")
+    return message
 
 # --- NEW: Rename Session ---
 @app.put("/api/sessions/{session_id}")
 async def rename_session(session_id: str, request: RenameSessionRequest, db: Session = Depends(get_db)):
-    session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    session.title = request.new_title
-    db.commit()
-    return {"status": "success", "title": session.title}
+    def rename():
+        message_log.sync(session_id)
+        session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        session.title = request.new_title
+        db.commit()
+        return {"status": "success", "title": session.title}
+
+    return await run_io(rename)
 
 # --- NEW: Delete Specific Session ---
 @app.delete("/api/sessions/{session_id}")
 async def delete_session(session_id: str, db: Session = Depends(get_db)):
-    session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
-    db.delete(session)
-    db.commit()
-    return {"status": "success", "message": "Session deleted"}
+    def delete():
+        message_log.sync(session_id)
+        session = db.query(ChatSession).filter(ChatSession.id == session_id).first()
+        if not session:
+            raise HTTPException(status_code=404, detail="Session not found")
+
+        db.delete(session)
+        db.commit()
+        return {"status": "success", "message": "Session deleted"}
+
+    return await run_io(delete)
+
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters for the extracted-text and other caches."""
+    return {"caches": cache_stats()}
+
+@app.get("/api/llm/stats")
+async def get_llm_stats():
+    """Per-route models and recent latency, circuit breaker states, retry and hedge counters."""
+    return llm_gateway.gateway.snapshot()
+
+@app.get("/metrics")
+async def get_metrics():
+    """Stage latency histograms, error counters and request timings in Prometheus text format."""
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    return Response(content=metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/api/metrics/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Per-stage timings of one recent request, by the X-Trace-Id it was answered with."""
+    stages = metrics.get_trace(trace_id)
+    if stages is None:
+        raise HTTPException(status_code=404, detail="Trace not found (expired or metrics disabled)")
+    return {"trace_id": trace_id, "stages": stages, "total_seconds": round(sum(s["seconds"] for s in stages), 6)}
 
 
 @app.post("/api/analyze")
 async def analyze_resumes(
     job_description: str = Form(...),
     session_id: str = Form(None),
+    top_k: Optional[int] = Form(None, ge=0),
     resumes: List[UploadFile] = File(...),
     db: Session = Depends(get_db)
 ):
+    def analyze():
+        if not resumes:
+            raise HTTPException(status_code=400, detail="No resumes uploaded")
+
+        turn = begin_turn(db, session_id, job_description).add("user", "text", job_description)
+
+        file_objects = as_named_files(resumes)
+
+        results = analyzer.analyze_resumes(job_description, file_objects, top_k=top_k)
+
+        message_log.commit(turn.add("bot", "table", results))
+
+        return {"results": results, "session_id": turn.session_id}
+
     try:
+        return await run_io(analyze)
+    
+    except Exception as e:
+        print(f"Error: {e}")
+        return JSONResponse(status_code=500, content={"error": str(e)})
+
+@app.post("/api/analyze/stream")
+async def analyze_resumes_stream(
+    job_description: str = Form(...),
+    session_id: str = Form(None),
+    top_k: Optional[int] = Form(None, ge=0),
+    resumes: List[UploadFile] = File(...),
+    db: Session = Depends(get_db)
+):
+    """Same as /api/analyze, but streams NDJSON: each candidate as soon as it is scored, then the sorted results."""
+    def start_session():
         session = get_or_create_session(db, session_id, title_hint=job_description)
-        current_session_id = session.id
+        db.add(ChatMessage(session_id=session.id, role="user", type="text", content=job_description))
+        db.commit()
+        return session.id
 
+    try:
         if not resumes:
             raise HTTPException(status_code=400, detail="No resumes uploaded")
-        
-        user_msg = ChatMessage(session_id=current_session_id, role="user", type="text", content=job_description)
-        db.add(user_msg)
-        db.commit()
 
-        file_objects = [file.file for file in resumes]
-        for i, f_obj in enumerate(file_objects):
-            if not hasattr(f_obj, 'name'):
-                f_obj.name = resumes[i].filename
+        current_session_id = await run_io(start_session)
+
+        events = analyzer.iter_analyze_resumes(job_description, as_named_files(resumes), top_k=top_k)
+        return StreamingResponse(
+            ndjson_analysis_stream(events, current_session_id),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error: {e}")
+        return JSONResponse(status_code=500, content={"error": str(e)})
 
-        results = analyzer.analyze_resumes(job_description, file_objects)
+@app.post("/api/analyze/bulk")
+async def analyze_resumes_bulk(
+    job_description: str = Form(...),
+    session_id: str = Form(None),
+    top_k: Optional[int] = Form(None, ge=0),
+    resumes: List[UploadFile] = File(None),
+    archive: UploadFile = File(None),
+    db: Session = Depends(get_db)
+):
+    """
+    For large batches: a ZIP `archive` of PDFs (or many `resumes`), read one entry at a time from the spooled
+    upload with bounded memory. Streams NDJSON like /api/analyze/stream, plus `extracted` progress events
+    while a batch bigger than top_k is read for pre-ranking.
+    """
+    try:
+        total, entries = bulk_entries(resumes, archive)
+    except ingest.IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        bot_msg = ChatMessage(session_id=current_session_id, role="bot", type="table", content=results)
-        db.add(bot_msg)
+    def start_session():
+        session = get_or_create_session(db, session_id, title_hint=job_description)
+        db.add(ChatMessage(session_id=session.id, role="user", type="text", content=job_description))
         db.commit()
+        return session.id
+
+    current_session_id = await run_io(start_session)
+    events = analyzer.iter_analyze_stream(job_description, total, ingest.iter_extracted(entries), top_k=top_k)
+    return StreamingResponse(
+        ndjson_analysis_stream(events, current_session_id),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/api/corpus/match")
+async def match_corpus(
+    job_description: str = Form(...),
+    session_id: str = Form(None),
+    top_k: Optional[int] = Form(None, ge=0),
+    limit: Optional[int] = Form(None, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Matches a job description against every previously analyzed resume (no upload needed)."""
+    def match():
+        turn = begin_turn(db, session_id, job_description).add("user", "text", job_description)
+
+        results = analyzer.analyze_corpus(job_description, top_k=top_k, limit=limit or analyzer.CORPUS_MATCH_LIMIT)
+
+        message_log.commit(turn.add("bot", "table", results))
+
+        return {"results": results, "session_id": turn.session_id}
+
+    try:
+        return await run_io(match)
 
-        return {"results": results, "session_id": current_session_id}
-    
     except Exception as e:
         print(f"Error: {e}")
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+@app.get("/api/corpus/stats")
+async def get_corpus_stats():
+    return await run_io(resume_store.corpus_stats)
+
 @app.post("/api/schedule")
 async def schedule_interviews(request: ScheduleRequest):
     try:
-        if request.start_time:
-            dt_str = request.start_time.replace('Z', '+00:00')
-            start_datetime = datetime.datetime.fromisoformat(dt_str)
-        else:
-            start_datetime = datetime.datetime.now()
+        start_datetime = parse_start_time(request.start_time)
 
-        logs = scheduler.batch_schedule_interviews(
+        logs = await run_io(
+            scheduler.batch_schedule_interviews,
             request.candidates, 
-            start_datetime
+            start_datetime,
+            request.interviewers
         )
         return {"logs": logs}
+    except (ValueError, KeyError) as e:
+        return JSONResponse(status_code=400, content={"error": f"Invalid schedule request: {e}"})
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+@app.get("/api/bookings")
+async def get_bookings(interviewer_id: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None,
+                       limit: int = 500):
+    """Booked interview slots in time order, optionally for one interviewer and overlapping [start, end)."""
+    try:
+        bookings = await run_io(slot_allocator.list_bookings, interviewer_id, start, end, page_size(limit, 500, 5000))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"bookings": bookings}
+
+@app.delete("/api/bookings/{booking_id}")
+async def cancel_booking(booking_id: int):
+    """Frees a slot (e.g. the candidate declined) so the next batch can use it."""
+    if not await run_io(slot_allocator.release, [booking_id]):
+        raise HTTPException(status_code=404, detail="Booking not found")
+    return {"message": "Booking cancelled"}
+
+# --- Background Jobs ---
+@app.post("/api/jobs/analyze", status_code=202)
+async def submit_analysis_job(
+    job_description: str = Form(...),
+    session_id: str = Form(None),
+    top_k: Optional[int] = Form(None, ge=0),
+    resumes: List[UploadFile] = File(None),
+    archive: UploadFile = File(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Queues an analysis and returns at once; poll GET /api/jobs/{job_id} for progress and results.
+    Takes PDFs as `resumes` or a ZIP `archive`; either way they are copied into the job one at a time.
+    """
+    try:
+        total, entries = bulk_entries(resumes, archive)
+    except ingest.IngestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def submit():
+        session = get_or_create_session(db, session_id, title_hint=job_description)
+        db.add(ChatMessage(session_id=session.id, role="user", type="text", content=job_description))
+        db.commit()
+        return session.id, jobs.submit_analysis(job_description, entries, top_k=top_k, session_id=session.id)
+
+    current_session_id, job_id = await run_io(submit)
+    return {"job_id": job_id, "session_id": current_session_id, "status": "queued", "total": total}
+
+@app.post("/api/jobs/schedule", status_code=202)
+async def submit_schedule_job(request: ScheduleRequest):
+    """Queues invitation emails; slots are fixed at submit time. Poll GET /api/jobs/{job_id}."""
+    try:
+        start_datetime = parse_start_time(request.start_time)
+        job_id = await run_io(jobs.submit_schedule, request.candidates, start_datetime, request.interviewers)
+    except (ValueError, KeyError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"job_id": job_id, "status": "queued", "total": len(request.candidates)}
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, items: bool = False):
+    """Status and per-item progress; `result` is filled in once the job has completed."""
+    status = await run_io(jobs.job_status, job_id, items)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
+
 @app.post("/api/interview/transcribe")
 async def transcribe(audio: UploadFile = File(...)):
     try:
         audio_bytes = await audio.read()
-        text = interviewer.transcribe_audio(audio_bytes)
+        text = await run_stt(interviewer.transcribe_audio, audio_bytes)
         return {"text": text}
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
 
-@app.post("/api/interview/chat")
-async def chat(request: ChatRequest, db: Session = Depends(get_db)):
-    try:
-        session_title = request.user_text if request.user_text else "Interview Session"
-        session = get_or_create_session(db, request.session_id, title_hint=session_title)
-        current_session_id = session.id
+@app.websocket("/ws/interview/transcribe")
+async def transcribe_stream(websocket: WebSocket, sample_rate: int = 16000):
+    """
+    Live transcription while the candidate is still speaking.
+    Client -> server: binary frames of int16 mono PCM at 16 kHz, then {"type": "end"} per utterance.
+    Server -> client: {"type": "partial", "text": ...} as audio accumulates, {"type": "final", "text": ...} after "end".
+    Any other `sample_rate` is refused when the socket opens; resampling is the client's job.
+    """
+    await websocket.accept()
+    if sample_rate != stt_models.SAMPLE_RATE:
+        await websocket.send_json({"type": "error", "error": f"sample_rate must be {stt_models.SAMPLE_RATE}"})
+        await websocket.close(code=1003)
+        return
+    transcriber = StreamingTranscriber()
+    decoding = None
+
+    async def send_partial():
+        text = await run_stt(transcriber.partial)
+        await websocket.send_json({"type": "partial", "text": text})
 
-        recent_msgs = db.query(ChatMessage).filter(ChatMessage.session_id == current_session_id)\
-                        .order_by(ChatMessage.timestamp.desc()).limit(10).all()
-        
-        conversation_history = []
-        for msg in reversed(recent_msgs):
-            if msg.type == 'text':
-                role = "assistant" if msg.role == "bot" or msg.role == "assistant" else "user"
-                conversation_history.append({"role": role, "content": str(msg.content)})
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("bytes"):
+                transcriber.add_pcm16(message["bytes"])
+                # At most one partial decode in flight; audio keeps buffering meanwhile
+                if transcriber.ready_for_partial() and (decoding is None or decoding.done()):
+                    decoding = asyncio.create_task(send_partial())
+
+            elif message.get("text"):
+                control = json.loads(message["text"])
+                if control.get("type") == "end":
+                    if decoding is not None:
+                        await asyncio.gather(decoding, return_exceptions=True)
+                        decoding = None
+                    text = await run_stt(transcriber.finish)
+                    await websocket.send_json({"type": "final", "text": text})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"Streaming STT Error: {e}")
+        try:
+            await websocket.send_json({"type": "error", "error": str(e)})
+        except Exception:
+            pass
+    finally:
+        if decoding is not None and not decoding.done():
+            decoding.cancel()
+
+def start_interview_turn(db: Session, request: ChatRequest):
+    """
+    Resolves the session and assembles the prompt within the session's token budget. Blocking.
+    Nothing is written yet: the answer (and the resume/JD on first sight) go into the returned Turn,
+    which is committed together with the reply.
+    """
+    session_title_hint = request.user_text if request.user_text else "Interview Session"
+    turn = begin_turn(db, request.session_id, session_title_hint, resume_text=request.resume_text,
+                      job_desc=request.job_desc, track_profile=True)
+    turn.add("user", "text", request.user_text)
+
+    messages, report = interview_context.assemble_prompt(db, None if turn.is_new_session else turn.session_id, turn)
+    return turn, messages, report
+
+def finish_interview_turn(turn: Turn, ai_response: Optional[str], report):
+    """One commit for the whole turn; a failed reply still keeps the candidate's answer. Blocking."""
+    if ai_response is not None:
+        turn.add("assistant", "text", ai_response)
+    message_log.commit(turn)
+    if ai_response is not None:
+        interview_context.schedule_summary(turn.session_id, report)
 
-        conversation_history.append({"role": "user", "content": request.user_text})
+@app.post("/api/interview/chat")
+async def chat(request: ChatRequest, db: Session = Depends(get_db)):
+    def turn():
+        pending, messages, report = start_interview_turn(db, request)
+
+        ai_response = None
+        try:
+            ai_response, report["llm_prompt_tokens"] = interviewer.complete_interview(messages)
+        finally:
+            finish_interview_turn(pending, ai_response, report)
         
-        db.add(ChatMessage(session_id=current_session_id, role="user", type="text", content=request.user_text))
-        db.commit()
+        return pending.session_id, ai_response, report, interviewer.synthesize_speech(ai_response)
 
-        ai_response = interviewer.generate_interview_question(
-            conversation_history, 
-            request.resume_text, 
-            request.job_desc
-        )
-        
-        db.add(ChatMessage(session_id=current_session_id, role="assistant", type="text", content=ai_response))
-        db.commit()
-        
-        audio_path = interviewer.text_to_speech(ai_response)
+    try:
+        current_session_id, ai_response, report, audio = await run_io(turn)
         
-        if not audio_path:
+        if not audio:
              return JSONResponse(status_code=500, content={"error": "TTS failed"})
 
-        with open(audio_path, "rb") as audio_f:
-            audio_b64 = base64.b64encode(audio_f.read()).decode('utf-8')
-        
-        os.remove(audio_path)
+        inline_base64 = AUDIO_BASE64_COMPAT if request.audio_base64 is None else request.audio_base64
 
         return {
             "ai_text": ai_response,
-            "audio_base64": audio_b64,
-            "session_id": current_session_id
+            **audio_fields(audio, interviewer.synthesizer.media_type, inline_base64),
+            "session_id": current_session_id,
+            "context": report
         }
     except Exception as e:
         return JSONResponse(status_code=500, content={"error": str(e)})
 
+@app.post("/api/interview/chat/stream")
+async def chat_stream(request: ChatRequest, db: Session = Depends(get_db)):
+    """
+    Streaming interview turn (NDJSON): text deltas as the LLM writes, then one audio clip URL per sentence,
+    synthesized while later sentences are still being generated. Ends with {"type": "done", ...}.
+    """
+    try:
+        pending, messages, report = await run_io(start_interview_turn, db, request)
+    except Exception as e:
+        return JSONResponse(status_code=500, content={"error": str(e)})
+    current_session_id = pending.session_id
+
+    inline_base64 = AUDIO_BASE64_COMPAT if request.audio_base64 is None else request.audio_base64
+
+    async def turn_stream():
+        yield json.dumps({"type": "session", "session_id": current_session_id}) + "\n"
+        try:
+            events = interviewer.iter_interview_turn(messages)
+            async for event in iterate_io(events):
+                if event["type"] == "audio":
+                    event = {"type": "audio", "index": event["index"], "text": event["text"],
+                             **audio_fields(event["audio"], event["media_type"], inline_base64)}
+                elif event["type"] == "done":
+                    # Committed before "done" goes out, so the next turn always sees this one
+                    await run_io(finish_interview_turn, pending, event["ai_text"], report)
+                    event = dict(event, session_id=current_session_id, context=report)
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            logger.exception("Interview stream failed (session %s)", current_session_id)
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+        finally:
+            # pending.committed is set by the commit itself, so a failure after it (summary scheduling,
+            # cancellation) doesn't write the answer twice
+            if not pending.committed:
+                # Failed or client went away: keep the candidate's answer, without awaiting in a closing generator
+                executors.io_executor.submit(finish_interview_turn, pending, None, report)
+
+    return StreamingResponse(
+        turn_stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.api_route("/api/audio/{clip_id}", methods=["GET", "HEAD"])
+async def get_audio(clip_id: str, request: Request):
+    """
+    Raw reply audio with its real content type; supports single byte ranges for seeking/streaming players.
+    Clips are files in AUDIO_CLIP_DIR, so any worker can answer for a clip another worker stored.
+    """
+    clip = tts.get_clip(clip_id)
+    if clip is None:
+        raise HTTPException(status_code=404, detail="Audio expired or not found")
+    audio, media_type = clip
+    size = len(audio)
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Cache-Control": f"private, max-age={tts.AUDIO_CLIP_TTL_SECONDS}",
+    }
+
+    byte_range = parse_byte_range(request.headers.get("range"), size)
+    if byte_range is None:
+        return Response(content=audio, media_type=media_type, headers=headers)
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return Response(content=audio[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+
 # SERVE FRONTEND
 current_dir = os.path.dirname(os.path.abspath(__file__))
 root_dir = os.path.dirname(current_dir)
@@ -0,0 +1,176 @@
+import datetime
+import os
+import threading
+import uuid
+from collections import Counter
+
+from dotenv import load_dotenv
+
+from database import SessionLocal, ChatSession, ChatMessage
+import interview_context
+
+load_dotenv()
+
+# --- Configuration ---
+# Write-behind trades durability for throughput: a crash loses turns younger than one flush interval
+MESSAGE_WRITE_BEHIND = os.environ.get("MESSAGE_WRITE_BEHIND", "false").lower() == "true"
+MESSAGE_FLUSH_SECONDS = float(os.environ.get("MESSAGE_FLUSH_SECONDS", "0.05"))
+MESSAGE_FLUSH_BATCH = int(os.environ.get("MESSAGE_FLUSH_BATCH", "200"))  # turns per commit
+
+
+class Turn:
+    """
+    Everything one chat turn writes: the session (if new), the interview profile and its messages.
+    Built up in memory while the turn runs and committed once by MessageLog.commit.
+    """
+
+    def __init__(self, session_id=None, title=None, resume_text=None, job_desc=None, track_profile=False):
+        self.is_new_session = session_id is None
+        self.session_id = session_id or str(uuid.uuid4())
+        self.title = title
+        self.resume_text = resume_text
+        self.job_desc = job_desc
+        self.track_profile = track_profile  # interview turns keep an InterviewContext row
+        self.messages = []
+        self.committed = False  # set by MessageLog.commit; later commits of the same turn are no-ops
+
+    def add(self, role, type, content):
+        # Timestamped now, not at flush, so history order matches the conversation
+        self.messages.append({"role": role, "type": type, "content": content, "timestamp": datetime.datetime.utcnow()})
+        return self
+
+
+def _apply(db, turn):
+    if turn.is_new_session:
+        db.add(ChatSession(id=turn.session_id, title=turn.title))
+    if turn.track_profile:
+        interview_context.remember_profile(db, turn.session_id, turn.resume_text, turn.job_desc)
+    db.add_all([ChatMessage(session_id=turn.session_id, **message) for message in turn.messages])
+    # Flushed per turn so a later turn of the same session in this batch sees its session and profile rows
+    db.flush()
+
+
+def write_turns(turns):
+    """Writes the turns in one transaction."""
+    db = SessionLocal()
+    try:
+        for turn in turns:
+            _apply(db, turn)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+class MessageLog:
+    """
+    Commits Turns either immediately (one commit per turn) or, with write-behind, from a background thread
+    that groups whatever queued up within MESSAGE_FLUSH_SECONDS into one commit.
+    Readers call sync(session_id) first so a session's own pending turns are never missing from what they read.
+    """
+
+    def __init__(self, write_behind=MESSAGE_WRITE_BEHIND, flush_seconds=MESSAGE_FLUSH_SECONDS,
+                 batch_size=MESSAGE_FLUSH_BATCH):
+        self.write_behind = write_behind
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self._queue = []
+        self._pending_sessions = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()  # one write-behind flush at a time keeps queued batches in order
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.stats = {"turns": 0, "commits": 0, "failed_turns": 0}
+
+    def commit(self, turn):
+        with self._lock:
+            if turn.committed:
+                return
+            turn.committed = True
+        if not self.write_behind:
+            # Nothing is queued in this mode, so concurrent sessions commit in parallel on their own connections
+            try:
+                write_turns([turn])
+            except Exception:
+                turn.committed = False
+                raise
+            self._count(commits=1, turns=1)
+            return
+        with self._lock:
+            self._queue.append(turn)
+            self._pending_sessions[turn.session_id] += 1
+            full = len(self._queue) >= self.batch_size
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def sync(self, session_id=None):
+        """Flushes now if `session_id` (or, with None, any session) still has turns waiting."""
+        with self._lock:
+            waiting = self._pending_sessions[session_id] if session_id else len(self._queue)
+        if waiting:
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    batch, self._queue = self._queue[:self.batch_size], self._queue[self.batch_size:]
+                if not batch:
+                    return
+                self._write_batch(batch)
+                with self._lock:
+                    self._pending_sessions.subtract(turn.session_id for turn in batch)
+                    self._pending_sessions += Counter()  # drop zero counts
+
+    def _count(self, commits=0, turns=0, failed_turns=0):
+        # The sync commit path and the flusher thread both count
+        with self._lock:
+            self.stats["commits"] += commits
+            self.stats["turns"] += turns
+            self.stats["failed_turns"] += failed_turns
+
+    def _write_batch(self, batch):
+        try:
+            write_turns(batch)
+            self._count(commits=1, turns=len(batch))
+            return
+        except Exception as e:
+            print(f"Message Log Error (batch of {len(batch)}): {e}")
+        # One bad turn must not take the rest of the batch with it
+        for turn in batch:
+            try:
+                write_turns([turn])
+                self._count(commits=1, turns=1)
+            except Exception as e:
+                self._count(failed_turns=1)
+                print(f"Message Log Error ({turn.session_id}): {e}")
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._stop.clear()
+                    self._thread = threading.Thread(target=self._run, name="message-log", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Stops the flusher and writes everything still queued."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+message_log = MessageLog()
@@ -0,0 +1,224 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- Configuration ---
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+METRICS_TRACE_HISTORY = int(os.environ.get("METRICS_TRACE_HISTORY", "1000"))  # recent traces kept for lookup
+METRICS_SLOW_SECONDS = float(os.environ.get("METRICS_SLOW_SECONDS", "0"))  # print stages slower than this, 0 = off
+
+# Stage latencies range from a cached TTS phrase (ms) to a batched scoring call (tens of seconds)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# Set per request by MetricsMiddleware (and per job by the job runner); executors.run_io copies it into threads
+trace_id_var = contextvars.ContextVar("trace_id", default=None)
+
+
+def new_trace_id():
+    return uuid.uuid4().hex[:16]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in list(zip(names, values)) + list(extra)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = sorted(self._values.items())
+        lines += [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense (per label set: bucket counts, sum, count)."""
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [per-bucket counts (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(labels.get(name, "") for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._series.items())
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, [('le', le)])} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+stage_seconds = Histogram("smarthire_stage_seconds", "Time spent in one pipeline stage", ("stage",))
+stage_errors = Counter("smarthire_stage_errors_total", "Stage calls that raised or reported failure", ("stage",))
+http_seconds = Histogram("smarthire_http_request_seconds", "HTTP request time, until the last body byte",
+                         ("method", "route", "status"))
+REGISTRY = [stage_seconds, stage_errors, http_seconds]
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+# --- Per-trace breakdown ---
+# Trace ids stay out of metric labels (one series per request would swamp Prometheus);
+# instead the stages of recent traces are kept here and served by /api/metrics/traces/{trace_id}.
+_traces = OrderedDict()
+_traces_lock = threading.Lock()
+
+
+def _remember(trace_id, stage, seconds, failed):
+    with _traces_lock:
+        stages = _traces.get(trace_id)
+        if stages is None:
+            stages = _traces[trace_id] = []
+            while len(_traces) > METRICS_TRACE_HISTORY:
+                _traces.popitem(last=False)
+        stages.append({"stage": stage, "seconds": round(seconds, 6), "error": failed})
+
+
+def get_trace(trace_id):
+    with _traces_lock:
+        stages = _traces.get(trace_id)
+        return list(stages) if stages is not None else None
+
+
+def record(stage, seconds, failed=False):
+    stage_seconds.observe(seconds, stage=stage)
+    if failed:
+        stage_errors.inc(stage=stage)
+    trace_id = trace_id_var.get()
+    if trace_id:
+        _remember(trace_id, stage, seconds, failed)
+    if METRICS_SLOW_SECONDS and seconds >= METRICS_SLOW_SECONDS:
+        print(f"Slow stage {stage}: {seconds:.2f}s (trace {trace_id or '-'})")
+
+
+def error(stage):
+    """Counts a failure that was handled without raising (e.g. a send that gave up)."""
+    if METRICS_ENABLED:
+        stage_errors.inc(stage=stage)
+
+
+class _Timer:
+    __slots__ = ("stage", "started")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        record(self.stage, time.perf_counter() - self.started, exc_type is not None)
+        return False
+
+
+class _NoopTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_TIMER = _NoopTimer()
+
+
+def _timed(stage):
+    return _Timer(stage)
+
+
+def _noop(stage):
+    return _NOOP_TIMER
+
+
+# Chosen once at import, so disabled instrumentation costs a call returning a shared no-op context manager
+timed = _timed if METRICS_ENABLED else _noop
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware: gives every HTTP request a trace id (X-Request-ID if the client sent one),
+    returns it as X-Trace-Id and records the request duration by route template.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        headers = dict(scope.get("headers") or [])
+        trace_id = headers.get(b"x-request-id", b"").decode("latin-1")[:64] or new_trace_id()
+        token = trace_id_var.set(trace_id)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_trace(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message = dict(message, headers=list(message.get("headers", [])) + [
+                    (b"x-trace-id", trace_id.encode("latin-1"))
+                ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_trace)
+        finally:
+            route = scope.get("route")
+            http_seconds.observe(time.perf_counter() - started, method=scope["method"],
+                                 route=getattr(route, "path", "unmatched"), status=status)
+            trace_id_var.reset(token)
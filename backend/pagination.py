@@ -0,0 +1,53 @@
+import base64
+import datetime
+import hashlib
+import json
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse, Response
+
+
+def page_size(limit, default, maximum):
+    return default if not limit else max(1, min(limit, maximum))
+
+
+def encode_cursor(timestamp, row_id):
+    """Opaque keyset cursor for the (timestamp, id) position of the last row on a page."""
+    raw = json.dumps([timestamp.isoformat() if timestamp else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """(timestamp, id) from encode_cursor; 400 on anything else."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return (datetime.datetime.fromisoformat(timestamp) if timestamp else None), row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def make_etag(*parts):
+    digest = hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+    return f'W/"{digest[:32]}"'
+
+
+def _cache_headers(etag):
+    # no-cache: the browser keeps the body but revalidates each time, so unchanged pages come back as bodiless 304s
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def etag_matches(request, etag):
+    if_none_match = request.headers.get("if-none-match", "")
+    return etag in [tag.strip() for tag in if_none_match.split(",")]
+
+
+def not_modified(etag):
+    return Response(status_code=304, headers=_cache_headers(etag))
+
+
+def conditional_json(request, etag, build_payload):
+    """304 when the client already holds this ETag, otherwise the JSON from build_payload()."""
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    return JSONResponse(content=build_payload(), headers=_cache_headers(etag))
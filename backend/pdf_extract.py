@@ -0,0 +1,207 @@
+"""PDF text extraction in worker processes, with page and length caps and per-file timeouts."""
+import io
+import multiprocessing
+import os
+import threading
+
+from dotenv import load_dotenv
+from pypdf import PdfReader
+
+load_dotenv()
+
+# --- Configuration ---
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))  # 0 = parse in the calling thread
+PDF_MAX_PAGES = int(os.environ.get("PDF_MAX_PAGES", "10"))  # 0 = every page
+PDF_MAX_CHARS = int(os.environ.get("PDF_MAX_CHARS", "30000"))  # stop reading pages past this much text, 0 = no cap
+PDF_TIMEOUT_SECONDS = float(os.environ.get("PDF_TIMEOUT_SECONDS", "20"))  # per file; only applies with workers
+PDF_MAX_TASKS_PER_WORKER = int(os.environ.get("PDF_MAX_TASKS_PER_WORKER", "500"))  # then it is recycled, 0 = never
+PDF_WORKER_START_SECONDS = 60  # allowance for a new worker's imports, outside the per-file timeout
+# forkserver forks workers from a clean single-threaded server rather than from the threaded API process
+PDF_START_METHOD = os.environ.get(
+    "PDF_START_METHOD", "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+class PdfExtractionError(Exception):
+    """code: unreadable | encrypted | empty | timeout | crashed"""
+
+    def __init__(self, code, message):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+    def as_dict(self):
+        return {"code": self.code, "message": self.message}
+
+
+def parse_pdf(pdf_bytes, max_pages=PDF_MAX_PAGES, max_chars=PDF_MAX_CHARS):
+    """Returns {"text", "pages_read", "page_count", "truncated"}. Runs inside a worker (or inline)."""
+    try:
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+        if reader.is_encrypted:
+            # Many "encrypted" resumes only restrict printing and open with an empty password
+            try:
+                opened = reader.decrypt("")
+            except Exception:
+                opened = False
+            if not opened:
+                raise PdfExtractionError("encrypted", "The PDF is password-protected")
+
+        page_count = len(reader.pages)
+        parts, chars = [], 0
+        for page in reader.pages:
+            if max_pages and len(parts) >= max_pages:
+                break
+            text = page.extract_text() or ""
+            parts.append(text)
+            chars += len(text)
+            if max_chars and chars >= max_chars:
+                break
+    except PdfExtractionError:
+        raise
+    except Exception as e:
+        raise PdfExtractionError("unreadable", f"{type(e).__name__}: {e}")
+
+    text = "\n".join(parts)
+    truncated = len(parts) < page_count or bool(max_chars and len(text) > max_chars)
+    if max_chars:
+        text = text[:max_chars]
+    if not text.strip():
+        raise PdfExtractionError("empty", "No text layer found (scanned image?)")
+    return {"text": text, "pages_read": len(parts), "page_count": page_count, "truncated": truncated}
+
+
+def _serve(conn):
+    """Worker process loop: one (pdf bytes, max pages, max chars) task in, one ("ok" | "error", payload) out."""
+    conn.send(("ready", None))
+    while True:
+        try:
+            pdf_bytes, max_pages, max_chars = conn.recv()
+        except (EOFError, OSError):
+            return
+        try:
+            reply = ("ok", parse_pdf(pdf_bytes, max_pages, max_chars))
+        except PdfExtractionError as e:
+            reply = ("error", (e.code, e.message))
+        except Exception as e:
+            reply = ("error", ("unreadable", f"{type(e).__name__}: {e}"))
+        conn.send(reply)
+
+
+class _Worker:
+    def __init__(self, context):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child_conn,), name="pdf-extract", daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.tasks = 0
+        # Process start-up (imports) must not count against the first file's timeout
+        try:
+            ready = self.conn.poll(PDF_WORKER_START_SECONDS) and self.conn.recv()[0] == "ready"
+        except (EOFError, OSError):
+            ready = False
+        if not ready:
+            self.stop()
+            raise PdfExtractionError("crashed", "The parser process did not start")
+
+    def run(self, pdf_bytes, max_pages, max_chars, timeout):
+        self.tasks += 1
+        try:
+            self.conn.send((pdf_bytes, max_pages, max_chars))
+            if not self.conn.poll(timeout):
+                raise PdfExtractionError("timeout", f"Parsing took longer than {timeout:g}s")
+            status, payload = self.conn.recv()
+        except (EOFError, OSError, BrokenPipeError):
+            raise PdfExtractionError("crashed", "The parser process died")
+        if status == "error":
+            raise PdfExtractionError(*payload)
+        return payload
+
+    def stop(self):
+        self.conn.close()
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(1)
+
+
+class PdfExtractor:
+    """
+    Bounded pool of parser processes, started on first use. extract() blocks the calling thread
+    (callers fan out with their own thread pools), so at most `workers` parses run at once.
+    """
+
+    def __init__(self, workers=PDF_WORKERS, timeout=PDF_TIMEOUT_SECONDS, max_pages=PDF_MAX_PAGES,
+                 max_chars=PDF_MAX_CHARS, max_tasks=PDF_MAX_TASKS_PER_WORKER, start_method=PDF_START_METHOD):
+        self.workers = workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.max_tasks = max_tasks
+        self.start_method = start_method
+        self.stats = {"parsed": 0, "failed": 0, "timeouts": 0, "workers_started": 0}
+        self._context = None
+        self._slots = threading.BoundedSemaphore(max(1, workers))
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def _take(self):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+            if self._context is None:
+                self._context = multiprocessing.get_context(self.start_method)
+                if self.start_method == "forkserver":
+                    self._context.set_forkserver_preload([__name__])
+            self.stats["workers_started"] += 1
+        return _Worker(self._context)
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _parse_inline(self, pdf_bytes):
+        try:
+            result = parse_pdf(pdf_bytes, self.max_pages, self.max_chars)
+        except PdfExtractionError:
+            self._count("failed")
+            raise
+        self._count("parsed")
+        return result
+
+    def extract(self, pdf_bytes):
+        if self.workers <= 0:
+            return self._parse_inline(pdf_bytes)
+
+        with self._slots:
+            try:
+                worker = self._take()
+            except PdfExtractionError as e:
+                # No isolation beats failing every file (e.g. a main module without a __main__ guard)
+                print(f"PDF worker unavailable ({e.message}); parsing in-process")
+                return self._parse_inline(pdf_bytes)
+            reusable = False
+            try:
+                result = worker.run(pdf_bytes, self.max_pages, self.max_chars, self.timeout)
+                reusable = True
+                self._count("parsed")
+                return result
+            except PdfExtractionError as e:
+                # A bad file leaves the worker fine; a timeout or crash leaves it killed or dead
+                reusable = e.code not in ("timeout", "crashed")
+                self._count("timeouts" if e.code == "timeout" else "failed")
+                raise
+            finally:
+                if reusable and (not self.max_tasks or worker.tasks < self.max_tasks):
+                    with self._lock:
+                        self._idle.append(worker)
+                else:
+                    worker.stop()
+
+    def shutdown(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
+
+
+extractor = PdfExtractor()
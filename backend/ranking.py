@@ -0,0 +1,70 @@
+import re
+from collections import Counter
+
+import numpy as np
+
+# Okapi BM25 parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it of on or our the their this to we with you your
+need needs looking seeking candidate candidates experience years strong good plus role job
+""".split())
+
+
+def tokenize(text):
+    """Lowercased word tokens; keeps tech terms like c++, c#, node.js intact."""
+    return [t for t in TOKEN_PATTERN.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+def estimate_tokens(text):
+    """Rough LLM token count (~4 characters per token), good enough for prompt budgeting."""
+    return len(text or "") // 4
+
+
+def bm25_scores(query, documents):
+    """
+    Scores every document against the query in one vectorized pass.
+    Only query terms can contribute to BM25, so the term matrix is (n_documents x n_query_terms).
+    """
+    query_terms = list(dict.fromkeys(tokenize(query)))
+    if not documents:
+        return np.zeros(0)
+    if not query_terms:
+        return np.zeros(len(documents))
+
+    column = {term: i for i, term in enumerate(query_terms)}
+    tf = np.zeros((len(documents), len(query_terms)), dtype=np.float32)
+    doc_lengths = np.empty(len(documents), dtype=np.float32)
+
+    for row, text in enumerate(documents):
+        tokens = tokenize(text)
+        doc_lengths[row] = len(tokens)
+        for term, count in Counter(tokens).items():
+            col = column.get(term)
+            if col is not None:
+                tf[row, col] = count
+
+    n_docs = len(documents)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+    avg_length = max(float(doc_lengths.mean()), 1.0)
+
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / avg_length)
+    weights = tf * (BM25_K1 + 1) / (tf + norm[:, None])
+    return weights @ idf
+
+
+def top_k_indices(scores, k):
+    """Indices of the k highest scores, best first (ties keep input order)."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return []
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return sorted(candidates.tolist(), key=lambda i: (-scores[i], i))
@@ -0,0 +1,140 @@
+import datetime
+import re
+from collections import Counter
+
+import numpy as np
+from sqlalchemy import func
+
+from database import SessionLocal, Resume, ResumeTerm
+from ranking import tokenize, BM25_K1, BM25_B
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+
+
+def add_resumes(items):
+    """
+    items: [(content_hash, filename, text), ...]
+    Stores new resumes and their postings in one transaction; already-known hashes are skipped.
+    Returns {content_hash: resume_id}.
+    """
+    items = [item for item in items if item[0]]
+    if not items:
+        return {}
+
+    db = SessionLocal()
+    try:
+        hashes = list({item[0] for item in items})
+        existing = dict(db.query(Resume.content_hash, Resume.id).filter(Resume.content_hash.in_(hashes)).all())
+
+        new_resumes = []
+        for content_hash, filename, text in items:
+            if content_hash in existing or any(r.content_hash == content_hash for r, _ in new_resumes):
+                continue
+            tokens = tokenize(text)
+            email = EMAIL_PATTERN.search(text or "")
+            resume = Resume(content_hash=content_hash, filename=filename, text=text,
+                            email=email.group(0) if email else None, doc_length=len(tokens))
+            db.add(resume)
+            new_resumes.append((resume, Counter(tokens)))
+
+        db.flush()  # assigns ids
+        for resume, counts in new_resumes:
+            db.bulk_save_objects([ResumeTerm(term=term, resume_id=resume.id, tf=tf) for term, tf in counts.items()])
+            existing[resume.content_hash] = resume.id
+
+        db.commit()
+        return existing
+    except Exception as e:
+        db.rollback()
+        print(f"Resume Store Error: {e}")
+        return {}
+    finally:
+        db.close()
+
+
+def update_contacts(contacts):
+    """contacts: {resume_id: {"name": ..., "email": ...}} as parsed by the scoring LLM."""
+    if not contacts:
+        return
+    db = SessionLocal()
+    try:
+        now = datetime.datetime.utcnow()
+        for resume in db.query(Resume).filter(Resume.id.in_(list(contacts))).all():
+            fields = contacts[resume.id]
+            if fields.get("name") and fields["name"] != "Unknown":
+                resume.name = fields["name"]
+            if fields.get("email") and "@" in fields["email"]:
+                resume.email = fields["email"]
+            resume.updated_at = now
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Resume Store Error: {e}")
+    finally:
+        db.close()
+
+
+def search(query, limit=100):
+    """
+    BM25 over the stored corpus, driven by the inverted index.
+    Only postings for the query's terms are read, so cost scales with matches, not corpus size.
+    Returns [(resume_id, score), ...] best first.
+    """
+    query_terms = list(dict.fromkeys(tokenize(query)))
+    if not query_terms:
+        return []
+
+    db = SessionLocal()
+    try:
+        postings = db.query(ResumeTerm.term, ResumeTerm.resume_id, ResumeTerm.tf)\
+                     .filter(ResumeTerm.term.in_(query_terms)).all()
+        if not postings:
+            return []
+
+        n_docs, avg_length = db.query(func.count(Resume.id), func.avg(Resume.doc_length)).one()
+
+        candidate_ids = list({resume_id for _, resume_id, _ in postings})
+        row = {resume_id: i for i, resume_id in enumerate(candidate_ids)}
+        column = {term: i for i, term in enumerate(query_terms)}
+
+        tf = np.zeros((len(candidate_ids), len(query_terms)), dtype=np.float32)
+        for term, resume_id, count in postings:
+            tf[row[resume_id], column[term]] = count
+
+        lengths = dict(db.query(Resume.id, Resume.doc_length).filter(Resume.id.in_(candidate_ids)).all())
+    finally:
+        db.close()
+
+    doc_lengths = np.array([lengths.get(resume_id, 0) for resume_id in candidate_ids], dtype=np.float32)
+    df = np.count_nonzero(tf, axis=0)
+    idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_lengths / max(float(avg_length or 1), 1.0))
+    scores = (tf * (BM25_K1 + 1) / (tf + norm[:, None])) @ idf
+
+    order = np.argsort(-scores, kind="stable")[:limit]
+    return [(candidate_ids[i], float(scores[i])) for i in order]
+
+
+def get_resumes(resume_ids):
+    """Returns {resume_id: Resume} for the given ids."""
+    if not resume_ids:
+        return {}
+    db = SessionLocal()
+    try:
+        resumes = db.query(Resume).filter(Resume.id.in_(list(resume_ids))).all()
+        for resume in resumes:
+            db.expunge(resume)
+        return {resume.id: resume for resume in resumes}
+    finally:
+        db.close()
+
+
+def corpus_stats():
+    db = SessionLocal()
+    try:
+        return {
+            "resumes": db.query(func.count(Resume.id)).scalar(),
+            "postings": db.query(func.count(ResumeTerm.term)).scalar(),
+        }
+    finally:
+        db.close()
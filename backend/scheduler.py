@@ -1,22 +1,13 @@
-import os
-import datetime
-import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from dotenv import load_dotenv
 
-load_dotenv()
+from mailer import mailer, SENDER_EMAIL
+import slot_allocator
 
-# Config
-SENDER_EMAIL = os.environ.get("SENDER_EMAIL")
-SENDER_PASSWORD = os.environ.get("SENDER_PASSWORD")
-SMTP_SERVER = "smtp.gmail.com"
-SMTP_PORT = 587
-
-# Send Email Logic
-def send_confirmation_email(candidate_name, candidate_email, start_time):
+def build_confirmation_email(candidate_name, candidate_email, start_time, interviewer_name=None):
     subject = f"Interview Invitation: {candidate_name}"
     formatted_time = start_time.strftime("%A, %B %d at %H:%M")
+    interviewer_line = f"\n    👤 Interviewer: {interviewer_name}\n" if interviewer_name else ""
     
     body = f"""
     Hi {candidate_name},
@@ -24,7 +15,7 @@ def send_confirmation_email(candidate_name, candidate_email, start_time):
     We have reviewed your profile and would like to invite you for an interview!
 
     📅 Scheduled Time: {formatted_time}
-
+{interviewer_line}
     Please reply to this email to confirm your availability. If you are unable to attend at this time, let us know on which date and time you would be available.
 
     Best regards,
@@ -36,41 +27,47 @@ def send_confirmation_email(candidate_name, candidate_email, start_time):
     msg['To'] = candidate_email
     msg['Subject'] = subject
     msg.attach(MIMEText(body, 'plain'))
+    return msg
 
-    try:
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
-        server.send_message(msg)
-        server.quit()
-        return True
-    except Exception as e:
-        print(f"Mail Error: {e}")
-        return False
+def assign_slots(selected_candidates, start_datetime_obj, interviewers=None, job_id=None):
+    """
+    Books slots before anything is sent, so parallel delivery can't reorder them: higher scores get earlier
+    slots, around the interviewers' availability and everything already booked.
+    Returns (candidate, slot_allocator.Slot or None if skipped) pairs in candidate order.
+    """
+    return slot_allocator.book(selected_candidates, start_datetime_obj, interviewers, job_id=job_id)
 
-# Main Batch Function 
-def batch_schedule_interviews(selected_candidates, start_datetime_obj):
-    logs = []
-    current_time = start_datetime_obj
-    GAP_MINUTES = 10
-    DURATION_MINUTES = 30
+def skip_log(cand):
+    if not slot_allocator.has_email(cand):
+        return f"⚠️ Skipped {cand['name']} (No Email)"
+    return f"⚠️ Not scheduled {cand['name']} (No free slot)"
 
-    for cand in selected_candidates:
-        name = cand['name']
-        email = cand['email']
+def sent_log(name, start_time, interviewer_name=None):
+    with_whom = f" with {interviewer_name}" if interviewer_name else ""
+    return f"Email Sent: **{name}** for {start_time.strftime('%a %b %d %H:%M')}{with_whom}"
+
+# Main Batch Function 
+def batch_schedule_interviews(selected_candidates, start_datetime_obj, interviewers=None):
+    assignments = assign_slots(selected_candidates, start_datetime_obj, interviewers)
+    to_send = [(cand, slot) for cand, slot in assignments if slot is not None]
 
-        if "No Email" in email or email == "None":
-            logs.append(f"⚠️ Skipped {name} (No Email)")
-            continue
+    # All invitations go out in parallel over pooled, already-authenticated SMTP connections
+    results = iter(mailer.send_many([
+        build_confirmation_email(cand['name'], cand['email'], slot.start, slot.interviewer_name)
+        for cand, slot in to_send
+    ]))
 
-        # Send Email
-        success = send_confirmation_email(name, email, current_time)
-        
-        if success:
-            logs.append(f"Email Sent: **{name}** for {current_time.strftime('%H:%M')}")
-            # Increment Time (30 min interview + 10 min gap)
-            current_time += datetime.timedelta(minutes=DURATION_MINUTES + GAP_MINUTES)
+    logs, undelivered = [], []
+    for cand, slot in assignments:
+        name = cand['name']
+        if slot is None:
+            logs.append(skip_log(cand))
+        elif next(results):
+            logs.append(sent_log(name, slot.start, slot.interviewer_name))
         else:
+            undelivered.append(slot.booking_id)
             logs.append(f"Email Failed: {name} (Check Password/Internet)")
 
-    return logs
\ No newline at end of file
+    # A candidate who never got the invitation shouldn't hold the slot
+    slot_allocator.release(undelivered)
+    return logs
@@ -0,0 +1,294 @@
+"""Interview slot allocation over interviewer calendars and stored bookings."""
+import datetime
+import heapq
+import os
+import threading
+from collections import namedtuple
+from zoneinfo import ZoneInfo
+
+from dotenv import load_dotenv
+from sqlalchemy.exc import IntegrityError
+
+from database import SessionLocal, InterviewBooking, InterviewerLock
+
+load_dotenv()
+
+# --- Configuration ---
+DURATION_MINUTES = int(os.environ.get("INTERVIEW_DURATION_MINUTES", "30"))
+GAP_MINUTES = int(os.environ.get("INTERVIEW_GAP_MINUTES", "10"))  # kept free after (and before) every interview
+WORKDAY_START = os.environ.get("INTERVIEW_DAY_START", "09:00")  # working hours for interviewers without windows
+WORKDAY_END = os.environ.get("INTERVIEW_DAY_END", "17:00")
+WORKDAYS = os.environ.get("INTERVIEW_WORKDAYS", "0,1,2,3,4")  # Monday = 0
+HORIZON_DAYS = int(os.environ.get("INTERVIEW_HORIZON_DAYS", "60"))  # how far ahead working hours are offered
+DEFAULT_INTERVIEWER = os.environ.get("DEFAULT_INTERVIEWER", "hiring-team")  # used when a request names none
+TIMEZONE = os.environ.get("INTERVIEW_TIMEZONE", "")  # zone of working hours and stored slots; empty = server local time
+
+Slot = namedtuple("Slot", "start end interviewer_id interviewer_name booking_id")
+
+
+class SlotConflict(Exception):
+    """A booking collided with one written concurrently by another process."""
+
+
+def has_email(cand):
+    email = cand.get('email') or "None"
+    return "No Email" not in email and email != "None"
+
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def priority(cand):
+    """
+    Explicit `priority`, else the analysis score; higher goes first. Candidates the LLM never reviewed
+    (score None) come after every scored one, in order of their `local_score`.
+    """
+    if cand.get('priority') is not None:
+        return 1, _number(cand['priority'])
+    if cand.get('score') is None and 'local_score' in cand:
+        return 0, _number(cand['local_score'])
+    return 1, _number(cand.get('score'))
+
+
+def wall_clock(value):
+    """Naive wall-clock time in INTERVIEW_TIMEZONE; times with an offset are converted, naive ones are taken as is."""
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if value.tzinfo is not None:
+        value = value.astimezone(ZoneInfo(TIMEZONE) if TIMEZONE else None)
+    return value.replace(tzinfo=None, microsecond=0)
+
+
+def _clock(value):
+    hours, minutes = value.split(":")
+    return datetime.time(int(hours), int(minutes))
+
+
+def merge(intervals):
+    """Sorted, non-overlapping (start, end) pairs; touching intervals are joined."""
+    merged = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def working_windows(start, days=None, day_start=None, day_end=None, workdays=None):
+    """Working hours from `start` onwards, one window per working day, generated lazily."""
+    days = HORIZON_DAYS if days is None else days
+    opens, closes = _clock(day_start or WORKDAY_START), _clock(day_end or WORKDAY_END)
+    weekdays = {int(day) for day in (workdays or WORKDAYS).split(",") if day.strip()}
+    for offset in range(days + 1):
+        day = start.date() + datetime.timedelta(days=offset)
+        if day.weekday() not in weekdays:
+            continue
+        window_start = max(datetime.datetime.combine(day, opens), start)
+        window_end = datetime.datetime.combine(day, closes)
+        if window_start < window_end:
+            yield window_start, window_end
+
+
+class _Calendar:
+    """One interviewer's free time, walked forward only: each call to next_slot() resumes where the last stopped."""
+
+    def __init__(self, windows, busy, duration, gap):
+        self.windows = iter(windows)
+        self.window = next(self.windows, None)
+        # Widened by the gap on both sides, so new interviews keep their distance from existing ones
+        self.busy = merge((start - gap, end + gap) for start, end in busy)
+        self.busy_index = 0
+        self.cursor = None
+        self.duration = duration
+        self.gap = gap
+
+    def next_slot(self):
+        while self.window is not None:
+            window_start, window_end = self.window
+            start = window_start if self.cursor is None else max(self.cursor, window_start)
+            if start + self.duration > window_end:
+                self.window = next(self.windows, None)
+                continue
+            while self.busy_index < len(self.busy) and self.busy[self.busy_index][1] <= start:
+                self.busy_index += 1
+            if self.busy_index < len(self.busy) and self.busy[self.busy_index][0] < start + self.duration:
+                self.cursor = self.busy[self.busy_index][1]
+                continue
+            return start
+        return None
+
+    def take(self, start):
+        self.cursor = start + self.duration + self.gap
+
+
+def allocate(candidates, interviewers, duration=None, gap=None):
+    """
+    interviewers: [{"id", "name", "windows": iterable of (start, end), "busy": [(start, end)]}], in tie-break order.
+    Candidates go in priority order (ties keep their input order), each to the earliest free slot of any
+    interviewer. Returns (candidate, Slot or None) pairs in input order; None means no email or no free slot.
+    """
+    duration = datetime.timedelta(minutes=DURATION_MINUTES if duration is None else duration)
+    gap = datetime.timedelta(minutes=GAP_MINUTES if gap is None else gap)
+
+    calendars = [_Calendar(spec["windows"], spec.get("busy", ()), duration, gap) for spec in interviewers]
+    heap = []
+    for index, calendar in enumerate(calendars):
+        start = calendar.next_slot()
+        if start is not None:
+            heap.append((start, index))
+    heapq.heapify(heap)
+
+    slots = [None] * len(candidates)
+    order = [i for i, cand in enumerate(candidates) if has_email(cand)]
+    order.sort(key=lambda i: priority(candidates[i]), reverse=True)  # stable, so ties keep their input order
+    for i in order:
+        if not heap:
+            break
+        start, index = heapq.heappop(heap)
+        calendar, spec = calendars[index], interviewers[index]
+        calendar.take(start)
+        slots[i] = Slot(start, start + duration, spec["id"], spec.get("name") or spec["id"], None)
+        following = calendar.next_slot()
+        if following is not None:
+            heapq.heappush(heap, (following, index))
+    return list(zip(candidates, slots))
+
+
+def interviewer_specs(raw, start):
+    """
+    Request shape -> allocate() shape. Each entry: {"id", "name"?, "windows"?: [{"start", "end"}], "busy"?: [...]}.
+    Without windows an interviewer is available during working hours. No entries means DEFAULT_INTERVIEWER.
+    """
+    raw = raw or [{"id": DEFAULT_INTERVIEWER}]
+    specs, seen = [], set()
+    for entry in raw:
+        interviewer_id = str(entry.get("id") or entry.get("email") or "").strip()
+        if not interviewer_id:
+            raise ValueError("Every interviewer needs an id")
+        if interviewer_id in seen:
+            raise ValueError(f"Interviewer listed twice: {interviewer_id}")
+        seen.add(interviewer_id)
+
+        if entry.get("windows"):
+            windows = [(max(wall_clock(w["start"]), start), wall_clock(w["end"])) for w in entry["windows"]]
+            windows = merge(windows)
+        else:
+            windows = working_windows(start)
+        busy = [(wall_clock(b["start"]), wall_clock(b["end"])) for b in entry.get("busy") or []]
+        specs.append({"id": interviewer_id, "name": entry.get("name") or interviewer_id,
+                      "windows": windows, "busy": busy})
+    return specs
+
+
+# --- Bookings ---
+# Each interviewer's lock row is written before their bookings are read, so allocations sharing an interviewer
+# run one at a time across processes too (a row lock on Postgres, the database write lock on SQLite).
+# Two processes creating the same interviewer's row at once collide on its key and the batch is allocated again.
+_booking_lock = threading.Lock()
+BOOK_ATTEMPTS = 3
+
+
+def _lock_interviewers(db, interviewer_ids):
+    now = datetime.datetime.utcnow()
+    for interviewer_id in sorted(interviewer_ids):  # one order everywhere, so two batches can't deadlock
+        locked = db.query(InterviewerLock).filter(InterviewerLock.interviewer_id == interviewer_id).update(
+            {"locked_at": now}, synchronize_session=False)
+        if not locked:
+            db.add(InterviewerLock(interviewer_id=interviewer_id, locked_at=now))
+            db.flush()
+
+
+def _book_once(candidates, interviewers, start, duration, gap, job_id):
+    db = SessionLocal()
+    try:
+        specs = interviewer_specs(interviewers, start)
+        busy = {spec["id"]: spec["busy"] for spec in specs}
+        try:
+            _lock_interviewers(db, busy)
+        except IntegrityError:
+            db.rollback()
+            raise SlotConflict()
+        rows = db.query(InterviewBooking.interviewer_id, InterviewBooking.start_at, InterviewBooking.end_at).filter(
+            InterviewBooking.interviewer_id.in_(list(busy)),
+            InterviewBooking.end_at > start - datetime.timedelta(minutes=GAP_MINUTES if gap is None else gap),
+        ).all()
+        for interviewer_id, start_at, end_at in rows:
+            busy[interviewer_id].append((start_at, end_at))
+
+        assignments = allocate(candidates, specs, duration, gap)
+        bookings = [
+            InterviewBooking(interviewer_id=slot.interviewer_id, interviewer_name=slot.interviewer_name,
+                             candidate_name=cand.get('name'), candidate_email=cand.get('email'),
+                             start_at=slot.start, end_at=slot.end, job_id=job_id)
+            for cand, slot in assignments if slot is not None
+        ]
+        db.add_all(bookings)
+        try:
+            db.flush()
+            booked = iter([booking.id for booking in bookings])  # read before commit expires them
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise SlotConflict()
+        return [(cand, slot._replace(booking_id=next(booked)) if slot else None) for cand, slot in assignments]
+    finally:
+        db.close()
+
+
+def book(candidates, start, interviewers=None, duration=None, gap=None, job_id=None):
+    """Allocates slots around the stored bookings and stores the new ones. Returns (candidate, Slot or None) pairs."""
+    start = wall_clock(start)
+    for attempt in range(BOOK_ATTEMPTS):
+        try:
+            with _booking_lock:
+                return _book_once(candidates, interviewers, start, duration, gap, job_id)
+        except SlotConflict:
+            print(f"Booking conflict, allocating again (attempt {attempt + 1})")
+    raise RuntimeError("Could not book interview slots: calendars kept changing")
+
+
+def release(booking_ids):
+    """Frees slots whose invitation could not be delivered."""
+    booking_ids = [booking_id for booking_id in booking_ids if booking_id is not None]
+    if not booking_ids:
+        return 0
+    db = SessionLocal()
+    try:
+        released = db.query(InterviewBooking).filter(InterviewBooking.id.in_(booking_ids)).delete(synchronize_session=False)
+        db.commit()
+        return released
+    finally:
+        db.close()
+
+
+def list_bookings(interviewer_id=None, start=None, end=None, limit=500):
+    db = SessionLocal()
+    try:
+        query = db.query(InterviewBooking)
+        if interviewer_id:
+            query = query.filter(InterviewBooking.interviewer_id == interviewer_id)
+        if start:
+            query = query.filter(InterviewBooking.end_at > wall_clock(start))
+        if end:
+            query = query.filter(InterviewBooking.start_at < wall_clock(end))
+        rows = query.order_by(InterviewBooking.start_at, InterviewBooking.id).limit(limit).all()
+        return [{
+            "id": row.id,
+            "interviewer_id": row.interviewer_id,
+            "interviewer_name": row.interviewer_name,
+            "candidate_name": row.candidate_name,
+            "candidate_email": row.candidate_email,
+            "start": row.start_at,
+            "end": row.end_at,
+            "job_id": row.job_id,
+        } for row in rows]
+    finally:
+        db.close()
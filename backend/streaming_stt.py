@@ -0,0 +1,97 @@
+import os
+import threading
+
+import numpy as np
+from dotenv import load_dotenv
+
+from stt_models import whisper_pool, SAMPLE_RATE
+
+load_dotenv()
+
+# --- STREAMING STT CONFIG ---
+STREAM_WINDOW_SECONDS = float(os.environ.get("STREAM_WINDOW_SECONDS", "15"))  # audio re-decoded per partial, at most
+STREAM_STEP_SECONDS = float(os.environ.get("STREAM_STEP_SECONDS", "1.0"))     # new audio needed before the next partial
+STREAM_OVERLAP_SECONDS = 3.0  # tail kept uncommitted when the window slides, so words at the edge aren't cut
+STREAM_PARTIAL_BEAM_SIZE = 1  # greedy for partials; the final pass uses the same beam as transcribe_audio
+STREAM_FINAL_BEAM_SIZE = 5
+
+
+class StreamingTranscriber:
+    """
+    Incremental speech-to-text over a sliding window.
+
+    PCM chunks are appended as they arrive; partial() re-decodes only the uncommitted tail of the utterance.
+    Once that tail is longer than the window, segments ending before its last few seconds are committed:
+    their text is frozen and their samples dropped, so each pass costs at most one window of audio.
+    If nothing settles, one long segment is committed whole, and audio without speech is dropped past the window.
+    finish() decodes what is left and resets for the next utterance.
+    """
+
+    def __init__(self, window_seconds=STREAM_WINDOW_SECONDS, step_seconds=STREAM_STEP_SECONDS):
+        self.window_samples = int(window_seconds * SAMPLE_RATE)
+        self.step_samples = int(step_seconds * SAMPLE_RATE)
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._audio = np.zeros(0, dtype=np.float32)
+        self._committed = []
+        self._new_samples = 0
+
+    def add_pcm16(self, chunk):
+        """chunk: little-endian int16 mono PCM at SAMPLE_RATE (clients downsample before sending)."""
+        samples = np.frombuffer(chunk[:len(chunk) - len(chunk) % 2], dtype="<i2").astype(np.float32)
+        samples *= 1.0 / 32768.0
+        with self._lock:
+            self._audio = np.concatenate([self._audio, samples])
+            self._new_samples += len(samples)
+
+    def ready_for_partial(self):
+        return self._new_samples >= self.step_samples
+
+    def _decode(self, audio, beam_size):
+        with whisper_pool.acquire() as model:
+            segments, _ = model.transcribe(
+                audio,
+                beam_size=beam_size,
+                condition_on_previous_text=False,
+                initial_prompt=" ".join(self._committed)[-200:] or None,
+            )
+            return [(segment.start, segment.end, segment.text.strip()) for segment in segments]
+
+    def partial(self):
+        with self._lock:
+            audio = self._audio
+            self._new_samples = 0
+        if len(audio) == 0:
+            return " ".join(self._committed)
+
+        segments = self._decode(audio, STREAM_PARTIAL_BEAM_SIZE)
+
+        if len(audio) > self.window_samples:
+            commit_before = len(audio) / SAMPLE_RATE - STREAM_OVERLAP_SECONDS
+            settled = [segment for segment in segments if segment[1] <= commit_before]
+            if not settled and segments:
+                # One segment still running past the window: freeze it rather than re-decode it forever
+                settled = segments
+            if settled:
+                drop = int(settled[-1][1] * SAMPLE_RATE)
+                self._committed.extend(text for _, _, text in settled if text)
+                segments = segments[len(settled):]
+            else:
+                # No speech found (silence, or VAD dropped everything): keep only the newest window
+                drop = len(audio) - self.window_samples
+            with self._lock:
+                # Only the front is trimmed; chunks appended meanwhile stay at the end
+                self._audio = self._audio[drop:]
+
+        return " ".join(self._committed + [text for _, _, text in segments if text])
+
+    def finish(self):
+        with self._lock:
+            audio = self._audio
+        segments = self._decode(audio, STREAM_FINAL_BEAM_SIZE) if len(audio) else []
+        text = " ".join(self._committed + [text for _, _, text in segments if text])
+        with self._lock:
+            self._reset()
+        return text.strip()
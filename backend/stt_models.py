@@ -0,0 +1,165 @@
+import os
+import io
+import queue
+import struct
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# --- WHISPER CONFIG ---
+WHISPER_MODEL_SIZE = os.environ.get("WHISPER_MODEL_SIZE", "base.en")
+WHISPER_DEVICE = os.environ.get("WHISPER_DEVICE", "cpu")
+WHISPER_COMPUTE_TYPE = os.environ.get("WHISPER_COMPUTE_TYPE", "int8")
+WHISPER_CPU_THREADS = int(os.environ.get("WHISPER_CPU_THREADS", "0"))  # 0 = CTranslate2 default
+WHISPER_NUM_WORKERS = int(os.environ.get("WHISPER_NUM_WORKERS", "1"))  # parallel transcriptions per instance
+WHISPER_POOL_SIZE = int(os.environ.get("WHISPER_POOL_SIZE", "1"))      # model instances kept in memory
+WHISPER_WARMUP = os.environ.get("WHISPER_WARMUP", "false").lower() == "true"
+
+SAMPLE_RATE = 16000  # what Whisper expects
+
+
+def _decode_pcm_wav(data):
+    """
+    Fast path for 16 kHz PCM/float WAV: walks the RIFF chunks and views the samples in place (np.frombuffer).
+    The only copies are the float32 conversion and, if needed, downmix. Returns None if unsupported; other
+    sample rates also return None and go through PyAV, whose resampler low-pass filters (np.interp would alias).
+    """
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        size = int.from_bytes(data[pos + 4:pos + 8], "little")
+        body = pos + 8
+
+        if chunk_id == b"fmt ":
+            format_tag, channels, rate = struct.unpack_from("<HHI", data, body)
+            bits = struct.unpack_from("<H", data, body + 14)[0]
+            if format_tag == 0xFFFE and size >= 26:  # WAVE_FORMAT_EXTENSIBLE: real tag starts the SubFormat GUID
+                format_tag = struct.unpack_from("<H", data, body + 24)[0]
+            fmt = (format_tag, channels, rate, bits)
+
+        elif chunk_id == b"data":
+            if fmt is None:
+                return None
+            format_tag, channels, rate, bits = fmt
+            if rate != SAMPLE_RATE:
+                return None
+            # Streamed WAVs often carry a placeholder size, so clamp to what was actually received
+            end = min(body + size, len(data))
+            frame_bytes = channels * bits // 8
+            end -= (end - body) % frame_bytes if frame_bytes else 0
+            raw = memoryview(data)[body:end]
+
+            if format_tag == 1 and bits == 16:
+                samples = np.frombuffer(raw, dtype="<i2").astype(np.float32)
+                samples *= 1.0 / 32768.0
+            elif format_tag == 3 and bits == 32:
+                samples = np.frombuffer(raw, dtype="<f4").astype(np.float32)
+            else:
+                return None
+
+            if channels > 1:
+                samples = samples.reshape(-1, channels).mean(axis=1, dtype=np.float32)
+            return samples
+
+        pos = body + size + (size & 1)
+    return None
+
+
+def decode_audio_bytes(audio_bytes):
+    """Decodes an uploaded clip straight to a float32 16 kHz mono array, without touching disk."""
+    if audio_bytes[:4] == b"RIFF" and audio_bytes[8:12] == b"WAVE":
+        samples = _decode_pcm_wav(audio_bytes)
+        if samples is not None:
+            return samples
+
+    # Compressed input (webm/opus from MediaRecorder, mp3, ...): PyAV decodes from the in-memory buffer
+    from faster_whisper.audio import decode_audio
+    return decode_audio(io.BytesIO(audio_bytes), sampling_rate=SAMPLE_RATE)
+
+
+class WhisperModelPool:
+    """
+    Lazily builds faster-whisper models on first use and hands them out one request at a time.
+    Up to `size` instances are created, so concurrent transcriptions don't queue behind a single model.
+    """
+
+    def __init__(self, model_size=WHISPER_MODEL_SIZE, device=WHISPER_DEVICE, compute_type=WHISPER_COMPUTE_TYPE,
+                 cpu_threads=WHISPER_CPU_THREADS, num_workers=WHISPER_NUM_WORKERS, size=WHISPER_POOL_SIZE):
+        self.model_size = model_size
+        self.device = device
+        self.compute_type = compute_type
+        self.cpu_threads = cpu_threads
+        self.num_workers = max(1, num_workers)
+        self.size = max(1, size)
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        # Imported here so processes that never transcribe don't pay for CTranslate2 either
+        from faster_whisper import WhisperModel
+
+        print(f"Loading Whisper Model ({self.model_size}, {self.compute_type})..")
+        started = time.perf_counter()
+        model = WhisperModel(
+            self.model_size,
+            device=self.device,
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads,
+            num_workers=self.num_workers,
+        )
+        print(f"Whisper Model Loaded in {time.perf_counter() - started:.1f}s!")
+        return model
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                return self._load()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+
+        return self._idle.get()
+
+    @contextmanager
+    def acquire(self):
+        model = self._checkout()
+        try:
+            yield model
+        finally:
+            self._idle.put(model)
+
+    def warm_up(self):
+        """Loads every instance and runs a short silent clip through each, so the first request is fast."""
+        models = [self._checkout() for _ in range(self.size - self._idle.qsize())]
+        try:
+            silence = np.zeros(SAMPLE_RATE, dtype=np.float32)
+            for model in models:
+                segments, _ = model.transcribe(silence, beam_size=1)
+                list(segments)
+        finally:
+            for model in models:
+                self._idle.put(model)
+
+    @property
+    def loaded(self):
+        return self._created
+
+
+whisper_pool = WhisperModelPool()
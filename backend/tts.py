@@ -0,0 +1,202 @@
+import hashlib
+import io
+import os
+import re
+import secrets
+import tempfile
+import threading
+import unicodedata
+import wave
+
+from dotenv import load_dotenv
+
+from cache import FileCache
+import metrics
+
+load_dotenv()
+
+# --- Configuration ---
+TTS_BACKEND = os.environ.get("TTS_BACKEND", "gtts").lower()  # gtts | pyttsx3 | silent
+TTS_VOICE = os.environ.get("TTS_VOICE", "")  # gtts: "<lang>" or "<lang>-<tld>" (en-co.uk); pyttsx3: voice id
+TTS_CACHE_DIR = os.environ.get("TTS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "ai-voice-agent-tts"))
+TTS_CACHE_MB = int(os.environ.get("TTS_CACHE_MB", "256"))  # 0 disables the audio cache
+AUDIO_CLIP_TTL_SECONDS = int(os.environ.get("AUDIO_CLIP_TTL_SECONDS", "600"))
+AUDIO_CLIP_STORE_MB = int(os.environ.get("AUDIO_CLIP_STORE_MB", "64"))
+# On disk so every worker process can serve every clip; point it at shared storage when running several hosts
+AUDIO_CLIP_DIR = os.environ.get("AUDIO_CLIP_DIR", os.path.join(tempfile.gettempdir(), "ai-voice-agent-clips"))
+
+
+def normalize_text(text):
+    """Canonical form used for cache keys: NFKC, collapsed whitespace, trimmed."""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text or "")).strip()
+
+
+# --- Backends ---
+
+class TTSBackend:
+    """A speech engine: synthesize(text) -> audio bytes in `media_type`."""
+
+    name = "base"
+    media_type = "audio/mpeg"
+    extension = ".mp3"
+
+    def __init__(self, voice=""):
+        self.voice = voice
+
+    def synthesize(self, text):
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS (free, needs network)."""
+
+    name = "gtts"
+
+    def __init__(self, voice=""):
+        super().__init__(voice or "en")
+        lang, _, tld = self.voice.partition("-")
+        self.lang = lang
+        self.tld = tld or "com"
+
+    def synthesize(self, text):
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.lang, tld=self.tld).write_to_fp(buffer)
+        return buffer.getvalue()
+
+
+class Pyttsx3Backend(TTSBackend):
+    """Offline system voices through pyttsx3 (espeak / SAPI5 / NSSpeechSynthesizer). Optional dependency."""
+
+    name = "pyttsx3"
+    media_type = "audio/wav"
+    extension = ".wav"
+
+    def __init__(self, voice=""):
+        super().__init__(voice)
+        # Checked here, at startup, rather than on the first reply
+        try:
+            import pyttsx3
+        except ImportError as e:
+            raise RuntimeError("TTS_BACKEND=pyttsx3 needs the optional pyttsx3 package: `pip install pyttsx3`") from e
+        self._pyttsx3 = pyttsx3
+        self._engine = None
+        self._lock = threading.Lock()  # the driver loop is not re-entrant
+
+    def _get_engine(self):
+        if self._engine is None:
+            self._engine = self._pyttsx3.init()
+            if self.voice:
+                self._engine.setProperty("voice", self.voice)
+        return self._engine
+
+    def synthesize(self, text):
+        with self._lock:
+            engine = self._get_engine()
+            fd, path = tempfile.mkstemp(suffix=self.extension)
+            os.close(fd)
+            try:
+                engine.save_to_file(text, path)
+                engine.runAndWait()
+                with open(path, "rb") as f:
+                    return f.read()
+            finally:
+                os.remove(path)
+
+
+class SilentBackend(TTSBackend):
+    """Silence sized to the text (~15 chars/s). No network or audio stack: for tests and benchmarks."""
+
+    name = "silent"
+    media_type = "audio/wav"
+    extension = ".wav"
+    SAMPLE_RATE = 8000
+
+    def synthesize(self, text):
+        seconds = max(0.2, len(text) / 15)
+        buffer = io.BytesIO()
+        with wave.open(buffer, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.SAMPLE_RATE)
+            wav.writeframes(b"\x00\x00" * int(seconds * self.SAMPLE_RATE))
+        return buffer.getvalue()
+
+
+BACKENDS = {backend.name: backend for backend in (GTTSBackend, Pyttsx3Backend, SilentBackend)}
+
+
+# --- Cached synthesizer ---
+
+class Synthesizer:
+    """A backend behind a content-addressed audio cache keyed by (backend, voice, normalized text)."""
+
+    def __init__(self, backend, cache=None):
+        self.backend = backend
+        self.cache = cache
+
+    @property
+    def media_type(self):
+        return self.backend.media_type
+
+    @property
+    def extension(self):
+        return self.backend.extension
+
+    def cache_key(self, text):
+        raw = "\x00".join([self.backend.name, self.backend.voice, normalize_text(text)])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def synthesize(self, text):
+        """Audio bytes for `text`; raises on backend failure so callers decide how to degrade."""
+        text = normalize_text(text)
+        if not text:
+            return b""
+
+        key = self.cache_key(text) if self.cache is not None else None
+        if key is not None:
+            audio = self.cache.get(key)
+            if audio is not None:
+                return audio
+
+        with metrics.timed(f"tts.{self.backend.name}"):
+            audio = self.backend.synthesize(text)
+        if key is not None and audio:
+            self.cache.set(key, audio)
+        return audio
+
+
+def create_synthesizer(backend_name=TTS_BACKEND, voice=TTS_VOICE, cache_dir=TTS_CACHE_DIR, cache_mb=TTS_CACHE_MB):
+    if backend_name not in BACKENDS:
+        raise ValueError(f"Unknown TTS_BACKEND {backend_name!r} (expected one of {', '.join(BACKENDS)})")
+    cache = FileCache("tts_audio", cache_dir, cache_mb * 1024 * 1024) if cache_mb > 0 else None
+    return Synthesizer(BACKENDS[backend_name](voice), cache)
+
+
+synthesizer = create_synthesizer()
+
+
+# --- Short-lived clips served by GET /api/audio/{clip_id} ---
+
+clip_store = FileCache("audio_clips", AUDIO_CLIP_DIR, AUDIO_CLIP_STORE_MB * 1024 * 1024,
+                       ttl_seconds=AUDIO_CLIP_TTL_SECONDS)
+CLIP_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{16,64}")
+
+
+def store_clip(audio, media_type=None):
+    """Keeps `audio` for AUDIO_CLIP_TTL_SECONDS and returns an unguessable clip id. The media type is its first line."""
+    clip_id = secrets.token_urlsafe(16)
+    clip_store.set(clip_id, (media_type or synthesizer.media_type).encode("ascii") + b"\n" + audio)
+    return clip_id
+
+
+def get_clip(clip_id):
+    """(audio bytes, media type), or None once the clip has expired or been evicted."""
+    if not CLIP_ID_PATTERN.fullmatch(clip_id):
+        return None
+    data = clip_store.get(clip_id)
+    if data is None:
+        return None
+    media_type, _, audio = data.partition(b"\n")
+    return audio, media_type.decode("ascii")
@@ -0,0 +1,75 @@
+"""
+Per-utterance input cost of transcribe_audio: old temp-file path vs in-memory decoding.
+
+By default only the audio preparation is timed (the part that differs between the two paths).
+Pass --transcribe to include a full faster-whisper transcription (downloads the model on first use).
+
+    python benchmarks/bench_audio_decode.py --seconds 5 --repeat 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from fixtures import make_wav
+from faster_whisper.audio import decode_audio
+
+from stt_models import decode_audio_bytes, whisper_pool
+
+
+def temp_file_path(audio_bytes, transcribe):
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as temp_audio:
+        temp_audio.write(audio_bytes)
+        path = temp_audio.name
+    try:
+        if transcribe:
+            with whisper_pool.acquire() as model:
+                segments, _ = model.transcribe(path, beam_size=5)
+                list(segments)
+        else:
+            decode_audio(path, sampling_rate=16000)
+    finally:
+        os.remove(path)
+
+
+def in_memory_path(audio_bytes, transcribe):
+    audio = decode_audio_bytes(audio_bytes)
+    if transcribe:
+        with whisper_pool.acquire() as model:
+            segments, _ = model.transcribe(audio, beam_size=5)
+            list(segments)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--transcribe", action="store_true")
+    args = parser.parse_args()
+
+    clips = {
+        "16 kHz mono WAV": make_wav(args.seconds, rate=16000),
+        "48 kHz stereo WAV": make_wav(args.seconds, rate=48000, channels=2),
+    }
+    print(f"{args.seconds:.0f}s utterance, {args.repeat} runs, median ms")
+    print(f"{'clip':<20} {'temp file':>10} {'in memory':>10}")
+    for label, audio_bytes in clips.items():
+        row = []
+        for path in (temp_file_path, in_memory_path):
+            path(audio_bytes, args.transcribe)  # warm caches / model
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                path(audio_bytes, args.transcribe)
+                timings.append((time.perf_counter() - started) * 1000)
+            row.append(statistics.median(timings))
+        print(f"{label:<20} {row[0]:>10.2f} {row[1]:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+API cold start: importing backend.main with lazy Whisper vs loading the model up front (the old import-time behaviour).
+
+    python benchmarks/bench_cold_start.py --runs 3
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+SCENARIOS = {
+    "lazy (default)": "import main",
+    "eager (model loaded at import)": "import main, stt_models; stt_models.whisper_pool.warm_up()",
+}
+
+
+def time_once(code):
+    env = dict(os.environ, OPENROUTER_API_KEY=os.environ.get("OPENROUTER_API_KEY", "stub"))
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=env, check=True,
+                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    for label, code in SCENARIOS.items():
+        timings = [time_once(code) for _ in range(args.runs)]
+        print(f"{label:<32} median {statistics.median(timings):.2f}s  (min {min(timings):.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Load test: concurrent /api/interview/chat turns alongside /api/sessions reads.
+
+With blocking work on the I/O executor the session list stays fast while LLM calls are in flight.
+--inline reproduces the old behaviour (blocking calls made directly on the event loop) for comparison.
+Uses the stub LLM, the silent TTS backend and a throwaway SQLite file, so it needs no network.
+
+    python benchmarks/bench_event_loop.py --chats 20 --reads 20 --latency 0.5
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from stub_llm import start_stub_llm
+
+
+async def inline(fn, *args, **kwargs):
+    return fn(*args, **kwargs)
+
+
+async def timed(coro, issued_at):
+    # Measured from when the request was due, not when the (possibly blocked) loop got around to sending it
+    response = await coro
+    response.raise_for_status()
+    return time.perf_counter() - issued_at
+
+
+async def run(app, chats, reads):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        started = time.perf_counter()
+        chat_tasks = [
+            asyncio.create_task(timed(client.post("/api/interview/chat", json={"user_text": f"answer {i}"}), started))
+            for i in range(chats)
+        ]
+        # Reads arrive 50 ms later, while the turns are waiting on the LLM
+        await asyncio.sleep(0.05)
+        read_latencies = await asyncio.gather(
+            *(timed(client.get("/api/sessions"), started + 0.05) for _ in range(reads))
+        )
+        chat_latencies = await asyncio.gather(*chat_tasks)
+        return time.perf_counter() - started, chat_latencies, read_latencies
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chats", type=int, default=20)
+    parser.add_argument("--reads", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--inline", action="store_true", help="run blocking work on the event loop (old behaviour)")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_llm(latency=args.latency)
+    workdir = tempfile.mkdtemp(prefix="bench-loop-")
+    os.environ["OPENROUTER_BASE_URL"] = base_url
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    os.environ["POSTGRES_DB_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["TTS_BACKEND"] = "silent"
+    os.environ["TTS_CACHE_DIR"] = os.path.join(workdir, "tts")
+
+    import main as api
+
+    if args.inline:
+        api.run_io = inline
+        api.run_stt = inline
+
+    total, chat_latencies, read_latencies = asyncio.run(run(api.app, args.chats, args.reads))
+    server.shutdown()
+
+    mode = "inline (event loop)" if args.inline else f"executor ({api.executors.IO_WORKERS} I/O workers)"
+    print(f"{args.chats} chat turns + {args.reads} session reads, stub latency {args.latency:.2f}s, {mode}")
+    print(f"{'request':<16} {'p50 ms':>9} {'max ms':>9}")
+    for name, latencies in (("interview/chat", chat_latencies), ("sessions", read_latencies)):
+        print(f"{name:<16} {statistics.median(latencies) * 1000:>9.1f} {max(latencies) * 1000:>9.1f}")
+    print(f"total {total:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
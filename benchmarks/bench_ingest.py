@@ -0,0 +1,110 @@
+"""
+Peak RSS of analyzing a batch of resumes, as the batch grows.
+
+  in-memory  the /api/analyze path: every PDF held in memory (uploads under 1 MB stay in the spooled
+             file's memory buffer), then extracted and scored
+  streamed   the /api/analyze/bulk path: a ZIP on disk read entry by entry through ingest.iter_extracted,
+             at most INGEST_IN_FLIGHT PDFs in memory, scoring fed as texts arrive
+
+Each (mode, batch) runs in a fresh process against the stub LLM, so ru_maxrss is that run's own peak.
+"Growth" is the peak minus the RSS after imports. Streamed growth should stay roughly flat. What remains
+is the extracted text (kept for pre-ranking) and the result records.
+
+    python benchmarks/bench_ingest.py --batches 250 1000 4000 --pdf-kb 150
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import zipfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "backend"))
+
+MODES = ["in-memory", "streamed"]
+JOB = "Backend engineer: Python, FastAPI, AWS, PostgreSQL, Docker, Kubernetes."
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KB on Linux
+
+
+def build_zip(path, count, pdf_kb):
+    from fixtures import make_resume_pdf
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for i in range(count):
+            archive.writestr(f"campus_drive/resume_{i}.pdf", make_resume_pdf(i, padding=pdf_kb * 1024))
+
+
+def worker(args):
+    import analyze_and_summary as analyzer
+    import ingest
+    from fixtures import NamedBytesIO
+
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    with open(args.zip, "rb") as f:
+        if args.mode == "in-memory":
+            with zipfile.ZipFile(f) as archive:
+                files = [NamedBytesIO(archive.read(info), os.path.basename(info.filename))
+                         for info in archive.infolist()]
+            results = analyzer.analyze_resumes(JOB, files, top_k=args.top_k)
+        else:
+            total, entries = ingest.zip_entries(f)
+            events = analyzer.iter_analyze_stream(JOB, total, ingest.iter_extracted(entries), top_k=args.top_k)
+            results = analyzer.final_results(events)
+    print(json.dumps({"baseline_mb": baseline, "peak_mb": peak_rss_mb(), "results": len(results),
+                      "seconds": time.perf_counter() - started}))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batches", type=int, nargs="+", default=[250, 1000, 4000])
+    parser.add_argument("--pdf-kb", type=int, default=150, help="size of each synthetic PDF")
+    parser.add_argument("--top-k", type=int, default=50, help="pre-rank shortlist; 0 scores everything")
+    parser.add_argument("--llm-latency", type=float, default=0.01)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    parser.add_argument("--zip", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    from stub_llm import start_stub_llm
+    llm_server, llm_url = start_stub_llm(latency=args.llm_latency, per_token_latency=0)
+    print(f"{args.pdf_kb} KB PDFs, top_k={args.top_k}")
+    print(f"{'mode':<10} {'batch':>6} {'zip MB':>7} {'peak MB':>8} {'growth MB':>10} {'seconds':>8}")
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            for count in args.batches:
+                path = os.path.join(workdir, f"batch_{count}.zip")
+                build_zip(path, count, args.pdf_kb)
+                for mode in MODES:
+                    env = dict(os.environ, OPENROUTER_BASE_URL=llm_url, TTS_BACKEND="silent",
+                               POSTGRES_DB_URL=f"sqlite:///{os.path.join(workdir, f'{mode}_{count}.db')}",
+                               RESULT_CACHE_BACKEND="off", TEXT_CACHE_DB_MB="0")
+                    env.setdefault("OPENROUTER_API_KEY", "stub")
+                    proc = subprocess.run(
+                        [sys.executable, os.path.abspath(__file__), "--worker", "--mode", mode, "--zip", path,
+                         "--top-k", str(args.top_k)],
+                        env=env, capture_output=True, text=True,
+                    )
+                    if proc.returncode != 0:
+                        print(f"{mode:<10} {count:>6} failed\n{proc.stderr[-2000:]}")
+                        continue
+                    row = json.loads(proc.stdout.strip().splitlines()[-1])
+                    print(f"{mode:<10} {count:>6} {os.path.getsize(path) / 2**20:>7.1f} {row['peak_mb']:>8.1f} "
+                          f"{row['peak_mb'] - row['baseline_mb']:>10.1f} {row['seconds']:>8.1f}")
+    finally:
+        llm_server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+LLM gateway behaviour against the stub LLM:
+
+  keep-alive  per-call latency and connections opened, pooled keep-alive vs a new connection per call
+  hedging     p50/p95/p99 of interview calls when a few completions land in a slow tail, hedging off vs on,
+              and how many extra requests the hedges cost
+  retries     share of calls that succeed when the provider returns 503s, no retries vs the route's retries
+  outage      time per call while the provider is down, circuit breaker off vs on
+
+    python benchmarks/bench_llm_gateway.py --calls 300 --slow-fraction 0.03 --slow-latency 1.0
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "backend"))
+
+from stub_llm import start_stub_llm  # noqa: E402
+
+MESSAGES = [{"role": "user", "content": "Next interview question, please."}]
+
+
+def percentiles(latencies):
+    ordered = sorted(latencies)
+    return [ordered[min(len(ordered) - 1, int(len(ordered) * p))] for p in (0.5, 0.95, 0.99)]
+
+
+def run_calls(gateway, calls, concurrency, route="interview"):
+    """Returns (latencies of successful calls, failures, seconds)."""
+    def one(_):
+        started = time.perf_counter()
+        try:
+            gateway.complete(route, MESSAGES)
+        except Exception:
+            return None
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, range(calls)))
+    latencies = [r for r in results if r is not None]
+    return latencies, len(results) - len(latencies), time.perf_counter() - started
+
+
+def make_gateway(llm_gateway, url, hedge=True, retries=None, **kwargs):
+    routes = dict(llm_gateway.ROUTES)
+    interview = routes["interview"]._replace(hedge=hedge)
+    if retries is not None:
+        interview = interview._replace(max_retries=retries)
+    routes["interview"] = interview
+    return llm_gateway.LLMGateway(routes=routes, base_url=url, api_key="stub", **kwargs)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.1, help="typical completion time")
+    parser.add_argument("--slow-fraction", type=float, default=0.03, help="completions that land in the slow tail")
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    parser.add_argument("--error-rate", type=float, default=0.2, help="503s in the retries run")
+    parser.add_argument("--backoff", type=float, default=0.05, help="retry backoff base, seconds (default 1.0 in the app)")
+    args = parser.parse_args()
+
+    server, url = start_stub_llm(latency=args.latency)
+    os.environ["OPENROUTER_BASE_URL"] = url
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    import llm_gateway
+    llm_gateway.LLM_BACKOFF_BASE = args.backoff
+    warmup = llm_gateway.LLM_HEDGE_MIN_SAMPLES * 2
+
+    print(f"stub latency {args.latency:g}s, {args.calls} calls, {args.concurrency} at a time")
+
+    print("\nkeep-alive: sequential calls")
+    print(f"{'pool':<12} {'ms/call':>8} {'connections':>12}")
+    for name, keepalive in (("keep-alive", llm_gateway.LLM_KEEPALIVE_CONNECTIONS), ("no reuse", 0)):
+        gateway = make_gateway(llm_gateway, url, hedge=False, keepalive_connections=keepalive)
+        opened = server.connection_count
+        latencies, _, elapsed = run_calls(gateway, min(args.calls, 100), 1)
+        print(f"{name:<12} {elapsed / len(latencies) * 1000:>8.1f} {server.connection_count - opened:>12}")
+        gateway.close()
+
+    print(f"\nhedging: {args.slow_fraction:.0%} of completions take {args.slow_latency:g}s")
+    print(f"{'hedge':<6} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'requests':>9} {'hedged':>7} {'won':>5}")
+    for hedge in (False, True):
+        gateway = make_gateway(llm_gateway, url, hedge=hedge)
+        server.config.update(slow_fraction=0.0)
+        run_calls(gateway, warmup, args.concurrency)  # history for the p95 trigger
+        server.config.update(slow_fraction=args.slow_fraction, slow_latency=args.slow_latency)
+        requests_before = server.request_count
+        latencies, _, _ = run_calls(gateway, args.calls, args.concurrency)
+        p50, p95, p99 = percentiles(latencies)
+        print(f"{'on' if hedge else 'off':<6} {p50:>7.3f} {p95:>7.3f} {p99:>7.3f} "
+              f"{server.request_count - requests_before:>9} {gateway.stats['hedged']:>7} {gateway.stats['hedge_wins']:>5}")
+        gateway.close()
+    server.config.update(slow_fraction=0.0)
+
+    print(f"\nretries: {args.error_rate:.0%} of requests get a 503")
+    print(f"{'retries':>7} {'succeeded':>10} {'p95 s':>7}")
+    server.config.update(error_rate=args.error_rate)
+    for retries in (0, llm_gateway.ROUTES["interview"].max_retries):
+        gateway = make_gateway(llm_gateway, url, hedge=False, retries=retries, breaker_failures=0)
+        latencies, failures, _ = run_calls(gateway, args.calls, args.concurrency)
+        print(f"{retries:>7} {len(latencies) / args.calls:>10.1%} {percentiles(latencies)[1] if latencies else 0:>7.3f}")
+        gateway.close()
+
+    print("\noutage: every request gets a 503")
+    print(f"{'breaker':<8} {'ms/call':>8} {'requests sent':>14}")
+    server.config.update(error_rate=1.0)
+    for name, failures in (("off", 0), ("on", llm_gateway.LLM_BREAKER_FAILURES)):
+        gateway = make_gateway(llm_gateway, url, hedge=False, breaker_failures=failures)
+        requests_before = server.request_count
+        _, _, elapsed = run_calls(gateway, min(args.calls, 100), args.concurrency)
+        print(f"{name:<8} {elapsed / min(args.calls, 100) * args.concurrency * 1000:>8.1f} "
+              f"{server.request_count - requests_before:>14}")
+        gateway.close()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Per-call cost of stage instrumentation: a bare call, the disabled no-op timer, and the recording timer
+(with and without a trace id set). Compare with the stages being timed, which take milliseconds to seconds.
+
+    python benchmarks/bench_metrics.py --calls 200000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import metrics
+
+
+def work():
+    return None
+
+
+def per_call_ns(fn, calls):
+    started = time.perf_counter_ns()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter_ns() - started) / calls
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+
+    def bare():
+        work()
+
+    def disabled():
+        with metrics._noop("bench"):
+            work()
+
+    def enabled():
+        with metrics._timed("bench"):
+            work()
+
+    baseline = per_call_ns(bare, args.calls)
+    rows = [("bare call", baseline), ("disabled (no-op)", per_call_ns(disabled, args.calls)),
+            ("enabled, no trace", per_call_ns(enabled, args.calls))]
+    token = metrics.trace_id_var.set("bench-trace")
+    metrics.METRICS_TRACE_HISTORY = args.calls  # keep one growing trace, the worst case
+    rows.append(("enabled, traced", per_call_ns(enabled, args.calls)))
+    metrics.trace_id_var.reset(token)
+
+    print(f"{args.calls} calls")
+    print(f"{'mode':<20} {'ns/call':>9} {'overhead ns':>12}")
+    for name, ns in rows:
+        print(f"{name:<20} {ns:>9.0f} {ns - baseline:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
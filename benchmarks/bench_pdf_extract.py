@@ -0,0 +1,98 @@
+"""
+PDF extraction throughput and isolation.
+
+  throughput  N resumes extracted from T caller threads, inline (PDF_WORKERS=0, threads share the GIL)
+              vs. a pool of worker processes. The speedup follows the cores available; on one core
+              the pool only adds pickling and pipe overhead.
+  page cap    one long PDF read whole vs. with PDF_MAX_PAGES / PDF_MAX_CHARS.
+  timeout     a file that parses slower than PDF_TIMEOUT_SECONDS: how long until it fails, and
+              whether the next file still extracts on a replacement worker.
+
+    python benchmarks/bench_pdf_extract.py --files 200 --workers 0 1 2 4 --pages 500
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(os.path.dirname(BENCH_DIR), "backend"))
+
+import pdf_extract  # noqa: E402
+from fixtures import make_resume_pdf  # noqa: E402
+
+
+def make_long_pdf(pages):
+    """A PDF with `pages` copies of one resume page."""
+    import io
+    from pypdf import PdfReader, PdfWriter
+
+    page = PdfReader(io.BytesIO(make_resume_pdf(0))).pages[0]
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_page(page)
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def throughput(files, workers, threads):
+    extractor = pdf_extract.PdfExtractor(workers=workers)
+    try:
+        extractor.extract(files[0])  # start-up outside the timing
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(extractor.extract, files))
+        return time.perf_counter() - started
+    finally:
+        extractor.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--threads", type=int, default=8, help="caller threads, as in ingest/analyzer")
+    parser.add_argument("--pages", type=int, default=500, help="length of the page-cap test PDF")
+    parser.add_argument("--timeout", type=float, default=0.5, help="per-file timeout for the timeout test")
+    args = parser.parse_args()
+
+    print(f"cpus={os.cpu_count()} start_method={pdf_extract.PDF_START_METHOD}")
+    files = [make_resume_pdf(i) for i in range(args.files)]
+    print(f"\nthroughput: {args.files} resumes, {args.threads} caller threads")
+    print(f"{'workers':>8} {'seconds':>8} {'files/s':>8}")
+    for workers in args.workers:
+        elapsed = throughput(files, workers, args.threads)
+        print(f"{workers or 'inline':>8} {elapsed:>8.2f} {args.files / elapsed:>8.1f}")
+
+    long_pdf = make_long_pdf(args.pages)
+    print(f"\npage cap: one {args.pages}-page PDF ({len(long_pdf) / 2**20:.1f} MB), inline")
+    print(f"{'max_pages':>9} {'max_chars':>9} {'pages read':>10} {'chars':>7} {'seconds':>8}")
+    for max_pages, max_chars in ((0, 0), (pdf_extract.PDF_MAX_PAGES, 0),
+                                 (pdf_extract.PDF_MAX_PAGES, pdf_extract.PDF_MAX_CHARS)):
+        started = time.perf_counter()
+        result = pdf_extract.parse_pdf(long_pdf, max_pages, max_chars)
+        print(f"{max_pages or '-':>9} {max_chars or '-':>9} {result['pages_read']:>10} {len(result['text']):>7} "
+              f"{time.perf_counter() - started:>8.2f}")
+
+    print(f"\ntimeout: the {args.pages}-page PDF uncapped with a {args.timeout:g}s limit, then a normal resume")
+    extractor = pdf_extract.PdfExtractor(workers=1, timeout=args.timeout, max_pages=0, max_chars=0)
+    try:
+        extractor.extract(files[0])
+        started = time.perf_counter()
+        try:
+            extractor.extract(long_pdf)
+            print("  long PDF finished inside the limit; raise --pages or lower --timeout")
+        except pdf_extract.PdfExtractionError as e:
+            print(f"  failed after {time.perf_counter() - started:.2f}s: {e.code} ({e.message})")
+        started = time.perf_counter()
+        extractor.extract(files[1])
+        print(f"  next file extracted in {time.perf_counter() - started:.2f}s; stats {extractor.stats}")
+    finally:
+        extractor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
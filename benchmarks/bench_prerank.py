@@ -0,0 +1,42 @@
+"""
+BM25 pre-ranking throughput on a synthetic corpus (default 10k resumes).
+
+    python benchmarks/bench_prerank.py --resumes 10000 --top-k 50
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from fixtures import resume_text
+from ranking import bm25_scores, top_k_indices
+
+JOB = "Senior Python developer with AWS, Docker and Kubernetes experience; FastAPI and PostgreSQL a plus"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=10000)
+    parser.add_argument("--top-k", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    corpus = ["\n".join(resume_text(i)) for i in range(args.resumes)]
+
+    timings = []
+    for _ in range(args.repeat):
+        started = time.perf_counter()
+        scores = bm25_scores(JOB, corpus)
+        shortlist = top_k_indices(scores, args.top_k)
+        timings.append(time.perf_counter() - started)
+
+    best = min(timings)
+    print(f"{args.resumes} resumes ranked in {best * 1000:.1f} ms "
+          f"({args.resumes / best:,.0f} resumes/s), shortlist of {len(shortlist)} sent to the LLM")
+
+
+if __name__ == "__main__":
+    main()
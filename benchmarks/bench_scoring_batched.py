@@ -0,0 +1,59 @@
+"""
+Token and latency cost of one-resume-per-call scoring vs batched JSON scoring.
+
+    python benchmarks/bench_scoring_batched.py --resumes 40 --latency 0.3 --per-token-latency 0.002
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from stub_llm import start_stub_llm
+from fixtures import resume_text
+
+JOB = ("Senior Python developer with AWS, Docker and Kubernetes experience. FastAPI and PostgreSQL a plus. "
+       "Must have led a team, owned production services end to end and mentored junior engineers.")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--per-token-latency", type=float, default=0.002)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    server, base_url = start_stub_llm(latency=args.latency, per_token_latency=args.per_token_latency)
+    os.environ["OPENROUTER_BASE_URL"] = base_url
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    os.environ["RESULT_CACHE_BACKEND"] = "off"
+
+    import analyze_and_summary as analyzer
+
+    resumes = [(f"resume_{i}.pdf", "\n".join(resume_text(i))) for i in range(args.resumes)]
+
+    print(f"{args.resumes} resumes, stub latency {args.latency}s + {args.per_token_latency}s/output token")
+    print(f"{'mode':>8} {'calls':>6} {'prompt tok':>11} {'output tok':>11} {'seconds':>8}")
+    baseline = None
+    for mode in ("single", "batched"):
+        engine = analyzer.ScoringEngine(concurrency=args.concurrency, rpm=0, tpm=0, mode=mode)
+        started = time.perf_counter()
+        records = engine.score_all(JOB, resumes)
+        elapsed = time.perf_counter() - started
+        assert all(records)
+        usage = engine.usage
+        print(f"{mode:>8} {usage['calls']:>6} {usage['prompt_tokens']:>11} {usage['completion_tokens']:>11} {elapsed:>8.2f}")
+        if baseline is None:
+            baseline = (usage["prompt_tokens"], elapsed)
+        else:
+            print(f"prompt tokens saved: {1 - usage['prompt_tokens'] / baseline[0]:.0%}, "
+                  f"wall-clock saved: {1 - elapsed / baseline[1]:.0%}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Wall-clock scaling of analyze_resumes with batch size, sequential vs bounded-concurrency scoring.
+
+    python benchmarks/bench_scoring_concurrency.py --latency 0.3 --sizes 1 10 50 200 --concurrency 1 8 32
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from stub_llm import start_stub_llm
+from fixtures import make_resume_files
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    server, base_url = start_stub_llm(latency=args.latency)
+    os.environ["OPENROUTER_BASE_URL"] = base_url
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+    # Every run must pay for its LLM calls, otherwise later rows just measure cache hits
+    os.environ["RESULT_CACHE_BACKEND"] = "off"
+
+    import analyze_and_summary as analyzer
+
+    print(f"stub latency {args.latency:.2f}s per call")
+    print(f"{'batch':>6} {'workers':>8} {'seconds':>9} {'resumes/s':>10}")
+    for concurrency in args.concurrency:
+        analyzer.scoring_engine = analyzer.ScoringEngine(concurrency=concurrency, rpm=0, tpm=0)
+        for size in args.sizes:
+            files = make_resume_files(size)
+            started = time.perf_counter()
+            results = analyzer.analyze_resumes("Senior Python developer with AWS", files, top_k=0)
+            elapsed = time.perf_counter() - started
+            assert len(results) == size
+            print(f"{size:>6} {concurrency:>8} {elapsed:>9.2f} {size / elapsed:>10.1f}")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Slot allocation time as candidates, interviewers and existing bookings grow. Each interviewer works
+09:00-17:00 on weekdays with some time already booked; candidates carry random scores.
+The time per candidate should stay roughly flat (O(log k) per slot) however far ahead the slots land.
+--persist also times slot_allocator.book(), which reads and writes the bookings table (a temporary SQLite file).
+
+    python benchmarks/bench_slot_allocator.py --candidates 1000 5000 20000 --interviewers 10 50
+"""
+import argparse
+import datetime
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+START = datetime.datetime(2030, 1, 7, 9, 0)  # a Monday
+
+
+def existing_bookings(rng, count, horizon_days):
+    busy = []
+    for _ in range(count):
+        day = START + datetime.timedelta(days=rng.randrange(horizon_days))
+        start = day.replace(hour=rng.randrange(9, 17), minute=rng.choice((0, 20, 40)))
+        busy.append((start, start + datetime.timedelta(minutes=30)))
+    return busy
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candidates", type=int, nargs="+", default=[1000, 5000, 20000])
+    parser.add_argument("--interviewers", type=int, nargs="+", default=[10, 50])
+    parser.add_argument("--booked", type=int, default=40, help="existing bookings per interviewer")
+    parser.add_argument("--persist", action="store_true", help="also time book() against SQLite")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="bench-slots-")
+    os.environ["POSTGRES_DB_URL"] = f"sqlite:///{os.path.join(workdir, 'slots.db')}"
+    import slot_allocator
+
+    rng = random.Random(7)
+    print(f"{'candidates':>10} {'interviewers':>12} {'booked':>7} {'ms':>9} {'us/cand':>8} {'last slot':>17}")
+    for interviewers in args.interviewers:
+        for candidates in args.candidates:
+            # Enough working days for everyone: 12 slots per interviewer per day
+            horizon = candidates // (12 * interviewers) * 7 // 5 + 14
+            people = [{"name": f"C{i}", "email": f"c{i}@example.com", "score": str(rng.randrange(101))}
+                      for i in range(candidates)]
+            specs = [{"id": f"i{j}", "name": f"Interviewer {j}",
+                      "windows": slot_allocator.working_windows(START, days=horizon),
+                      "busy": existing_bookings(rng, args.booked, horizon)} for j in range(interviewers)]
+
+            started = time.perf_counter()
+            assignments = slot_allocator.allocate(people, specs)
+            elapsed = time.perf_counter() - started
+            placed = [slot for _, slot in assignments if slot is not None]
+            last = max(slot.start for slot in placed).strftime("%Y-%m-%d %H:%M") if placed else "-"
+            print(f"{candidates:>10} {interviewers:>12} {args.booked * interviewers:>7} {elapsed * 1000:>9.1f} "
+                  f"{elapsed / candidates * 1e6:>8.1f} {last:>17}")
+
+    if args.persist:
+        candidates = args.candidates[0]
+        roster = [{"id": f"i{j}"} for j in range(args.interviewers[0])]
+        print(f"\nbook(): {candidates} candidates per batch, {len(roster)} interviewers, same start time")
+        for batch in range(3):
+            people = [{"name": f"B{batch}-{i}", "email": f"b{batch}.{i}@example.com", "score": str(rng.randrange(101))}
+                      for i in range(candidates)]
+            started = time.perf_counter()
+            booked = slot_allocator.book(people, START, roster)
+            elapsed = time.perf_counter() - started
+            first = min(slot.start for _, slot in booked if slot).strftime("%Y-%m-%d %H:%M")
+            print(f"  batch {batch + 1}: {elapsed * 1000:8.1f} ms, earliest slot {first}")
+
+
+if __name__ == "__main__":
+    main()
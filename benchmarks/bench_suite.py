@@ -0,0 +1,282 @@
+"""
+End-to-end load test of the API against local stand-ins only: the stub LLM (latency and output size
+configurable), a stub TTS backend, a stub Whisper model and the aiosmtpd SMTP stand-in.
+The API runs under uvicorn on a local port and is driven over real HTTP, closed-loop: `concurrency`
+clients each send their next request as soon as the previous one returns.
+
+Scenarios:
+  analyze     POST /api/analyze with --resumes synthetic PDFs (distinct per request, so caches don't help)
+  transcribe  POST /api/interview/transcribe with a synthetic --audio-seconds clip
+  chat        POST /api/interview/chat; each client keeps one interview session going
+  schedule    POST /api/schedule with --candidates invitations
+
+Results (throughput, p50/p95/p99/max latency, errors) go to --output as JSON; --compare prints the
+change against an earlier file.
+
+    python benchmarks/bench_suite.py --concurrency 1 8 --requests 40 --output bench.json
+    python benchmarks/bench_suite.py --concurrency 1 8 --requests 40 --compare bench.json
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+from fixtures import make_resume_pdf, make_wav
+from stub_llm import start_stub_llm
+from stub_smtp import free_port, start_stub_smtp
+
+SCENARIOS = ["analyze", "transcribe", "chat", "schedule"]
+JOB_DESCRIPTION = "Backend engineer: Python, FastAPI, AWS, PostgreSQL. Contact hiring@example.com"
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(scenario, concurrency, latencies, errors, seconds):
+    ordered = sorted(latencies)
+    to_ms = lambda value: round(value * 1000, 2) if value is not None else None
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "throughput_rps": round(len(latencies) / seconds, 3) if seconds else 0.0,
+        "latency_ms": {
+            "p50": to_ms(percentile(ordered, 50)),
+            "p95": to_ms(percentile(ordered, 95)),
+            "p99": to_ms(percentile(ordered, 99)),
+            "mean": to_ms(sum(ordered) / len(ordered)) if ordered else None,
+            "max": to_ms(ordered[-1]) if ordered else None,
+        },
+    }
+
+
+class Scenario:
+    """Builds each client's requests; `state` is per client (e.g. its interview session)."""
+
+    def __init__(self, args):
+        self.args = args
+        self.wav = make_wav(args.audio_seconds, rate=16000)
+        self._counter = 0
+        self._lock = threading.Lock()
+
+    def next_id(self):
+        with self._lock:
+            self._counter += 1
+            return self._counter
+
+    async def analyze(self, client, state):
+        seed = self.next_id() * 1000
+        files = [("resumes", (f"resume_{seed + i}.pdf", make_resume_pdf(seed + i), "application/pdf"))
+                 for i in range(self.args.resumes)]
+        return await client.post("/api/analyze", data={"job_description": JOB_DESCRIPTION}, files=files)
+
+    async def transcribe(self, client, state):
+        return await client.post("/api/interview/transcribe", files={"audio": ("answer.wav", self.wav, "audio/wav")})
+
+    async def chat(self, client, state):
+        payload = {"user_text": f"Answer {self.next_id()}: I designed the ingestion pipeline and its retries.",
+                   "audio_base64": False}
+        if "session_id" in state:
+            payload["session_id"] = state["session_id"]
+        else:
+            payload.update(resume_text=" ".join(f"Line {i} of the resume." for i in range(40)),
+                           job_desc=JOB_DESCRIPTION)
+        response = await client.post("/api/interview/chat", json=payload)
+        if response.status_code == 200:
+            state["session_id"] = response.json()["session_id"]
+        return response
+
+    async def schedule(self, client, state):
+        batch = self.next_id()
+        candidates = [{"name": f"Candidate {batch}-{i}", "email": f"c{batch}.{i}@example.com"}
+                      for i in range(self.args.candidates)]
+        # One interviewer per request, so every batch books the same free calendar
+        return await client.post("/api/schedule", json={"candidates": candidates,
+                                                         "start_time": "2030-01-07T09:00:00",
+                                                         "interviewers": [{"id": f"bench-{batch}"}]})
+
+
+def failed(response):
+    if response.status_code >= 400:
+        return True
+    # A few endpoints report failure inside a 200 body
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    return isinstance(body, dict) and "error" in body
+
+
+async def run_level(base_url, scenario, name, concurrency, requests):
+    import httpx
+
+    latencies, errors = [], 0
+    remaining = requests
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, timeout=600, limits=limits) as client:
+
+        async def worker():
+            nonlocal remaining, errors
+            state = {}
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                try:
+                    response = await getattr(scenario, name)(client, state)
+                    bad = failed(response)
+                except Exception:
+                    bad = True
+                if bad:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return summarize(name, concurrency, latencies, errors, time.perf_counter() - started)
+
+
+def start_api(port):
+    import uvicorn
+    import main as api
+
+    server = uvicorn.Server(uvicorn.Config(api.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="bench-api", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("API server failed to start")
+        time.sleep(0.05)
+    return server, thread
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_header():
+    print(f"{'scenario':<11} {'conc':>4} {'reqs':>5} {'err':>4} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+
+
+def print_row(row):
+    lat = row["latency_ms"]
+    fmt = lambda value: f"{value:>9.1f}" if value is not None else f"{'-':>9}"
+    print(f"{row['scenario']:<11} {row['concurrency']:>4} {row['requests']:>5} {row['errors']:>4} "
+          f"{row['throughput_rps']:>8.2f} {fmt(lat['p50'])} {fmt(lat['p95'])} {fmt(lat['p99'])}")
+
+
+def print_comparison(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {(row["scenario"], row["concurrency"]): row for row in json.load(f)["results"]}
+    change = lambda new, old: f"{(new - old) / old:+.1%}" if new is not None and old else "n/a"
+    print(f"\nvs {baseline_path}")
+    print(f"{'scenario':<11} {'conc':>4} {'rps':>9} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for row in results:
+        old = baseline.get((row["scenario"], row["concurrency"]))
+        if old is None:
+            continue
+        print(f"{row['scenario']:<11} {row['concurrency']:>4} {change(row['throughput_rps'], old['throughput_rps']):>9} "
+              + " ".join(f"{change(row['latency_ms'][p], old['latency_ms'][p]):>9}" for p in ("p50", "p95", "p99")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8])
+    parser.add_argument("--requests", type=int, default=40, help="per scenario and concurrency level")
+    parser.add_argument("--llm-latency", type=float, default=0.3, help="seconds before the first token")
+    parser.add_argument("--llm-per-token-latency", type=float, default=0.002)
+    parser.add_argument("--llm-output-tokens", type=int, default=0, help="pad replies to this many tokens")
+    parser.add_argument("--tts-latency", type=float, default=0.2, help="seconds per synthesized phrase")
+    parser.add_argument("--stt-realtime-factor", type=float, default=0.1, help="stub Whisper seconds per audio second")
+    parser.add_argument("--real-whisper", action="store_true", help="use faster-whisper (downloads the model)")
+    parser.add_argument("--smtp-handshake-latency", type=float, default=0.2)
+    parser.add_argument("--smtp-message-latency", type=float, default=0.02)
+    parser.add_argument("--resumes", type=int, default=5, help="PDFs per analyze request")
+    parser.add_argument("--audio-seconds", type=float, default=5.0)
+    parser.add_argument("--candidates", type=int, default=10, help="invitations per schedule request")
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--compare", help="earlier --output file to compare against")
+    args = parser.parse_args()
+
+    llm_server, llm_url = start_stub_llm(latency=args.llm_latency, per_token_latency=args.llm_per_token_latency,
+                                         output_tokens=args.llm_output_tokens)
+    smtp_controller, smtp_handler, smtp_port = start_stub_smtp(0, args.smtp_handshake_latency,
+                                                               args.smtp_message_latency)
+    workdir = tempfile.mkdtemp(prefix="bench-suite-")
+    os.environ.update(
+        OPENROUTER_BASE_URL=llm_url,
+        POSTGRES_DB_URL=f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        TTS_BACKEND="silent",
+        TTS_CACHE_MB="0",  # every reply is synthesized, as with a new interview's first turns
+        SMTP_SERVER="127.0.0.1", SMTP_PORT=str(smtp_port), SMTP_STARTTLS="false",
+        SENDER_EMAIL="hiring@example.com", SENDER_PASSWORD="stub",
+        JOB_WORKERS="0",
+    )
+    os.environ.setdefault("OPENROUTER_API_KEY", "stub")
+
+    from stub_speech import install_stub_tts, install_stub_whisper
+    install_stub_tts(args.tts_latency)
+    if not args.real_whisper:
+        install_stub_whisper(args.stt_realtime_factor)
+
+    server, thread = start_api(free_port())
+    base_url = f"http://127.0.0.1:{server.config.port}"
+    scenario = Scenario(args)
+
+    results = []
+    print_header()
+    try:
+        for name in args.scenarios:
+            for concurrency in args.concurrency:
+                row = asyncio.run(run_level(base_url, scenario, name, concurrency, args.requests))
+                results.append(row)
+                print_row(row)
+    finally:
+        server.should_exit = True
+        thread.join(10)
+        smtp_controller.stop()
+        llm_server.shutdown()
+
+    report = {
+        "meta": {
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\nwrote {args.output}")
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+TTS cost across simulated interviews: uncached backend vs the content-addressed audio cache.
+
+Each interview repeats the same greeting, fallback and closing lines plus a few unique questions.
+The backend defaults to `silent` with --latency added per call to stand in for a gTTS round trip;
+pass --backend gtts to hit the real service (needs network).
+
+    python benchmarks/bench_tts_cache.py --interviews 20 --latency 0.4
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
+
+import tts
+
+COMMON_LINES = [
+    "Hello! Thanks for joining today. Let's get started.",
+    "Let's move to the next topic. Can you tell me about your strengths?",
+    "Thank you for your time. We will be in touch soon.",
+]
+
+
+class DelayedBackend(tts.TTSBackend):
+    """Wraps a backend and adds a fixed per-call delay (network round trip)."""
+
+    def __init__(self, inner, latency):
+        super().__init__(inner.voice)
+        self.inner = inner
+        self.latency = latency
+        self.name = inner.name
+        self.media_type = inner.media_type
+        self.extension = inner.extension
+        self.calls = 0
+
+    def synthesize(self, text):
+        self.calls += 1
+        time.sleep(self.latency)
+        return self.inner.synthesize(text)
+
+
+def interview_lines(n):
+    return COMMON_LINES[:1] + [f"Question {n}-{i}: walk me through project {i}." for i in range(3)] + COMMON_LINES[1:]
+
+
+def run(synth, interviews):
+    start = time.perf_counter()
+    for n in range(interviews):
+        for line in interview_lines(n):
+            synth.synthesize(line)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--interviews", type=int, default=20)
+    parser.add_argument("--backend", default="silent", choices=sorted(tts.BACKENDS))
+    parser.add_argument("--latency", type=float, default=0.4)
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix="bench-tts-")
+    try:
+        latency = args.latency if args.backend == "silent" else 0.0
+        uncached = DelayedBackend(tts.BACKENDS[args.backend](), latency)
+        cached = DelayedBackend(tts.BACKENDS[args.backend](), latency)
+
+        baseline = run(tts.Synthesizer(uncached), args.interviews)
+        synth = tts.create_synthesizer(args.backend, "", cache_dir, 64)
+        synth.backend = cached
+        with_cache = run(synth, args.interviews)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    lines = args.interviews * len(interview_lines(0))
+    print(f"{args.interviews} interviews, {lines} lines, backend={args.backend}")
+    print(f"{'mode':<10} {'backend calls':>14} {'seconds':>9}")
+    print(f"{'no cache':<10} {uncached.calls:>14} {baseline:>9.2f}")
+    print(f"{'cached':<10} {cached.calls:>14} {with_cache:>9.2f}")
+    print(f"cache: {synth.cache.snapshot()}")
+
+
+if __name__ == "__main__":
+    main()
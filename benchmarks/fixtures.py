@@ -0,0 +1,104 @@
+"""Synthetic inputs for the benchmarks (no external files or services needed)."""
+import io
+import random
+
+SKILLS = [
+    "Python", "AWS", "Docker", "Kubernetes", "FastAPI", "Django", "React", "TypeScript",
+    "PostgreSQL", "Redis", "Kafka", "Spark", "Terraform", "Go", "Java", "Machine Learning",
+    "NLP", "PyTorch", "CI/CD", "Linux", "GraphQL", "Microservices", "Airflow", "Snowflake",
+]
+FIRST_NAMES = ["Asha", "Ben", "Carla", "Dev", "Elena", "Farid", "Grace", "Hiro", "Ines", "Jonas"]
+LAST_NAMES = ["Patel", "Smith", "Garcia", "Kumar", "Rossi", "Haddad", "Chen", "Tanaka", "Silva", "Berg"]
+
+
+def _escape(text):
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(lines, padding=0):
+    """
+    Builds a minimal single-page PDF whose text layer contains `lines`.
+    `padding` adds an unreferenced binary stream of that many bytes, standing in for embedded images/fonts.
+    """
+    stream = "BT /F1 11 Tf 50 780 Td 14 TL\n"
+    stream += "".join(f"({_escape(line)}) Tj T*\n" for line in lines)
+    stream += "ET"
+
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        "/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    if padding:
+        filler = "".join(chr(random.Random(padding).randrange(32, 127)) for _ in range(min(padding, 4096)))
+        filler = (filler * (padding // len(filler) + 1))[:padding]
+        objects.append(f"<< /Length {padding} >>\nstream\n{filler}\nendstream")
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref_at = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode("latin-1"))
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode("latin-1"))
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref_at}\n%%EOF\n".encode("latin-1"))
+    return out.getvalue()
+
+
+def resume_text(seed):
+    rng = random.Random(seed)
+    name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    skills = rng.sample(SKILLS, 6)
+    lines = [
+        name,
+        f"{name.lower().replace(' ', '.')}{seed}@example.com",
+        f"Software engineer with {rng.randint(1, 15)} years of experience.",
+        "Skills: " + ", ".join(skills),
+    ]
+    for _ in range(rng.randint(3, 8)):
+        lines.append(f"Built {rng.choice(skills)} services using {rng.choice(skills)} and {rng.choice(skills)}.")
+    return lines
+
+
+def make_resume_pdf(seed, padding=0):
+    return make_pdf(resume_text(seed), padding)
+
+
+class NamedBytesIO(io.BytesIO):
+    """Mimics the file objects /api/analyze hands to the analyzer (they carry a .name)."""
+
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+def make_resume_files(count, seed=0):
+    return [NamedBytesIO(make_resume_pdf(seed + i), f"resume_{seed + i}.pdf") for i in range(count)]
+
+
+def make_wav(seconds=3.0, rate=48000, channels=1, seed=0):
+    """16-bit PCM WAV of a voiced-sounding tone with noise (bytes)."""
+    import wave
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * rate)) / rate
+    signal = 0.3 * np.sin(2 * np.pi * 180 * t) * (0.6 + 0.4 * np.sin(2 * np.pi * 3 * t))
+    signal += 0.02 * rng.standard_normal(len(t))
+    pcm = (np.clip(signal, -1, 1) * 32767).astype("<i2")
+    if channels > 1:
+        pcm = np.repeat(pcm[:, None], channels, axis=1)
+
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return out.getvalue()
@@ -0,0 +1,189 @@
+"""
+Local stand-in for the OpenAI-compatible chat completions API used by the backend.
+
+Run standalone:  python benchmarks/stub_llm.py --port 9100 --latency 0.5
+Then point the backend at it:  OPENROUTER_BASE_URL=http://127.0.0.1:9100/v1
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INTERVIEW_REPLY = ("Thanks for walking me through your background. "
+                   "Can you tell me about a production incident you handled on AWS? "
+                   "What was the root cause and what did you change afterwards?")
+DEFAULT_REPLY = "Jane Doe || jane.doe@example.com || 82 || Strong Python and AWS background with relevant project work."
+RESUME_ID_PATTERN = re.compile(r'<resume id="(R\d+)">')
+
+
+def sized(reply, output_tokens):
+    """Pads a reply to about `output_tokens` tokens (~4 chars each). Never cuts, so scoring replies stay parseable."""
+    if not output_tokens:
+        return reply
+    target = output_tokens * 4
+    filler = " The candidate also described relevant project work in detail."
+    while len(reply) + len(filler) <= target:
+        reply += filler
+    return reply
+
+
+def batch_reply(prompt):
+    """JSON reply for a batched scoring prompt: one record per <resume id="..."> block."""
+    candidates = [
+        {"id": rid, "name": f"Candidate {rid}", "email": f"{rid.lower()}@example.com", "score": 70 + i % 30,
+         "summary": "Relevant experience with most of the requested stack."}
+        for i, rid in enumerate(RESUME_ID_PATTERN.findall(prompt))
+    ]
+    return json.dumps({"candidates": candidates})
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle on, a kept-alive connection waits out a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            pass  # a client closed its pooled keep-alive connection
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connection_count += 1
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        config = self.server.config
+
+        with self.server.lock:
+            self.server.request_count += 1
+
+        if config["error_rate"] and random.random() < config["error_rate"]:
+            data = b'{"error": {"message": "stub overloaded"}}'
+            self.send_response(503)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+            return
+
+        prompt = "\n".join(str(m.get("content", "")) for m in body.get("messages", []))
+        if body.get("response_format", {}).get("type") == "json_object":
+            reply = batch_reply(prompt)
+        elif body.get("stream"):
+            self._stream(body, sized(INTERVIEW_REPLY, config["output_tokens"]))
+            return
+        else:
+            reply = sized(config["reply"], config["output_tokens"])
+
+        # Fixed latency plus a per-output-token cost, like a real decoder; a few calls land in the slow tail
+        latency = config["latency"]
+        if config["slow_fraction"] and random.random() < config["slow_fraction"]:
+            latency = config["slow_latency"]
+        time.sleep(latency + config["per_token_latency"] * (len(reply) // 4))
+
+        prompt_tokens = len(prompt) // 4
+        payload = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": reply},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(reply) // 4,
+                "total_tokens": prompt_tokens + len(reply) // 4,
+            },
+        }
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+    def _stream(self, body, reply):
+        """Server-sent events, one chunk per ~4 characters, paced by per_token_latency (first token after latency)."""
+        config = self.server.config
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+
+        time.sleep(config["latency"])
+        pieces = [reply[i:i + 4] for i in range(0, len(reply), 4)]
+        for piece in pieces:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}],
+            }
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+            time.sleep(config["per_token_latency"])
+        done = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        self.wfile.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        self.wfile.flush()
+        self.close_connection = True
+
+
+def start_stub_llm(port=0, latency=0.5, reply=DEFAULT_REPLY, per_token_latency=0.0, output_tokens=0,
+                   slow_fraction=0.0, slow_latency=0.0, error_rate=0.0):
+    """
+    Starts the stub in a daemon thread. Returns (server, base_url).
+    slow_fraction of completions take slow_latency instead of latency; error_rate of requests get a 503.
+    server.config can be changed while it runs.
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubLLMHandler)
+    server.daemon_threads = True
+    server.config = {"latency": latency, "reply": reply, "per_token_latency": per_token_latency,
+                     "output_tokens": output_tokens, "slow_fraction": slow_fraction, "slow_latency": slow_latency,
+                     "error_rate": error_rate}
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.connection_count = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible chat completions server")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", type=float, default=0.5, help="seconds per completion")
+    parser.add_argument("--per-token-latency", type=float, default=0.0, help="extra seconds per output token")
+    parser.add_argument("--output-tokens", type=int, default=0, help="pad replies to this many tokens, 0 = as is")
+    args = parser.parse_args()
+
+    server, url = start_stub_llm(args.port, args.latency, per_token_latency=args.per_token_latency,
+                                 output_tokens=args.output_tokens)
+    print(f"Stub LLM listening on {url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
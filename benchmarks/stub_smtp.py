@@ -0,0 +1,88 @@
+"""
+Local SMTP stand-in (aiosmtpd) with configurable handshake and per-message latency and injected 4xx failures.
+
+    python benchmarks/stub_smtp.py --port 8025 --handshake-latency 0.3
+"""
+import argparse
+import asyncio
+import random
+import socket
+import threading
+import time
+
+from aiosmtpd.controller import Controller
+from aiosmtpd.smtp import AuthResult, LoginPassword
+
+
+class StubHandler:
+    def __init__(self, handshake_latency=0.0, message_latency=0.0, fail_rate=0.0, seed=0):
+        self.handshake_latency = handshake_latency
+        self.message_latency = message_latency
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.messages = []
+        self.sessions = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        # Stands in for the TCP + STARTTLS + AUTH round trips of a real provider
+        with self._lock:
+            self.sessions += 1
+        await asyncio.sleep(self.handshake_latency)
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        await asyncio.sleep(self.message_latency)
+        with self._lock:
+            if self.random.random() < self.fail_rate:
+                self.rejected += 1
+                return "451 4.3.0 Temporary failure, try again"
+            self.messages.append((envelope.mail_from, list(envelope.rcpt_tos), time.time()))
+        return "250 OK"
+
+
+def accept_any(server, session, envelope, mechanism, auth_data):
+    return AuthResult(success=isinstance(auth_data, LoginPassword))
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_stub_smtp(port=0, handshake_latency=0.0, message_latency=0.0, fail_rate=0.0):
+    """
+    Starts the server in a background thread -> (controller, handler, port). Accepts any AUTH LOGIN/PLAIN.
+    port=0 picks a free port (aiosmtpd itself needs a concrete one).
+    """
+    handler = StubHandler(handshake_latency, message_latency, fail_rate)
+    port = port or free_port()
+    controller = Controller(handler, hostname="127.0.0.1", port=port,
+                            authenticator=accept_any, auth_require_tls=False)
+    controller.start()
+    return controller, handler, port
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--handshake-latency", type=float, default=0.3)
+    parser.add_argument("--message-latency", type=float, default=0.02)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    controller, handler, port = start_stub_smtp(args.port, args.handshake_latency, args.message_latency, args.fail_rate)
+    print(f"Stub SMTP listening on 127.0.0.1:{port} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(5)
+            print(f"sessions={handler.sessions} delivered={len(handler.messages)} rejected={handler.rejected}")
+    except KeyboardInterrupt:
+        controller.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+In-process stand-ins for the speech services: gTTS (a network round trip per phrase) and the Whisper model
+(CPU time proportional to the clip length). Install them after the backend modules are imported.
+"""
+import time
+
+import tts
+import stt_models
+
+
+class StubTTSBackend(tts.SilentBackend):
+    """Silent WAV after a fixed latency plus a per-character cost, like a remote TTS call."""
+
+    name = "stub"
+
+    def __init__(self, latency=0.3, per_char_latency=0.0):
+        super().__init__("")
+        self.latency = latency
+        self.per_char_latency = per_char_latency
+        self.calls = 0
+
+    def synthesize(self, text):
+        self.calls += 1
+        time.sleep(self.latency + self.per_char_latency * len(text))
+        return super().synthesize(text)
+
+
+class _Segment:
+    def __init__(self, text, start, end):
+        self.text, self.start, self.end = text, start, end
+
+
+class StubWhisperModel:
+    """Holds the caller for `realtime_factor` x the clip duration, then returns one word per second of audio."""
+
+    def __init__(self, realtime_factor=0.1):
+        self.realtime_factor = realtime_factor
+
+    def transcribe(self, audio, **kwargs):
+        seconds = len(audio) / stt_models.SAMPLE_RATE
+        time.sleep(self.realtime_factor * seconds)
+        words = [_Segment(f" word{i}", i, i + 1) for i in range(max(1, int(seconds)))]
+        return iter(words), None
+
+
+def install_stub_tts(latency=0.3, per_char_latency=0.0):
+    """Swaps the backend of the live synthesizer (interview_manager holds a reference to it)."""
+    backend = StubTTSBackend(latency, per_char_latency)
+    tts.synthesizer.backend = backend
+    return backend
+
+
+def install_stub_whisper(realtime_factor=0.1):
+    """Every model the pool loads from now on is the stub; the pool's size and queuing still apply."""
+    stt_models.whisper_pool._load = lambda: StubWhisperModel(realtime_factor)
@@ -1,5 +1,7 @@
 // CONFIGURATION 
 const API_URL = "/api";
+const SESSION_PAGE_SIZE = 50;
+const HISTORY_PAGE_SIZE = 200;
 
 // STATE MANAGEMENT
 let uploadedFiles = [];
@@ -151,18 +153,24 @@ function switchTab(tabName) {
 
 // --- SESSION & SIDEBAR LOGIC ---
 
-async function loadSessions() {
+// Sidebar is paged newest-first; `cursor` continues after the last page shown
+async function loadSessions(cursor = null) {
     try {
-        const res = await fetch(`${API_URL}/sessions`);
+        const params = new URLSearchParams({ limit: SESSION_PAGE_SIZE });
+        if (cursor) params.set('cursor', cursor);
+        const res = await fetch(`${API_URL}/sessions?${params}`);
         const data = await res.json();
-        renderSidebar(data.sessions);
+        renderSidebar(data.sessions, Boolean(cursor), data.next_cursor);
     } catch(e) {
         console.error("Error loading sessions:", e);
     }
 }
 
-function renderSidebar(sessions) {
-    historyList.innerHTML = '';
+function renderSidebar(sessions, append = false, nextCursor = null) {
+    if (!append) historyList.innerHTML = '';
+    const loadMore = historyList.querySelector('.load-more-sessions');
+    if (loadMore) loadMore.remove();
+
     sessions.forEach(session => {
         const li = document.createElement('li');
         li.className = "relative group"; 
@@ -196,6 +204,29 @@ function renderSidebar(sessions) {
         `;
         historyList.appendChild(li);
     });
+
+    if (nextCursor) {
+        const li = document.createElement('li');
+        li.className = "load-more-sessions";
+        li.innerHTML = `<button class="w-full px-3 py-2 text-xs text-gray-500 hover:text-gray-700 hover:bg-gray-50 rounded-lg">Load more</button>`;
+        li.querySelector('button').onclick = () => loadSessions(nextCursor);
+        historyList.appendChild(li);
+    }
+}
+
+// Follows next_cursor until the whole history is loaded; pages the server says are unchanged come from the browser cache
+async function fetchHistory(sessionId) {
+    const history = [];
+    let cursor = null;
+    do {
+        const params = new URLSearchParams({ limit: HISTORY_PAGE_SIZE });
+        if (cursor) params.set('cursor', cursor);
+        const res = await fetch(`${API_URL}/history/${sessionId}?${params}`);
+        const data = await res.json();
+        history.push(...data.history);
+        cursor = data.next_cursor;
+    } while (cursor);
+    return { history };
 }
 
 window.toggleSessionMenu = function(event, sessionId) {
@@ -263,8 +294,7 @@ async function loadChatSession(sessionId) {
     if (interviewBox) interviewBox.insertAdjacentHTML('afterbegin', interviewGreeting);
 
     try {
-        const res = await fetch(`${API_URL}/history/${sessionId}`);
-        const data = await res.json();
+        const data = await fetchHistory(sessionId);
         
         const savedIndices = JSON.parse(localStorage.getItem(`selected_indices_${sessionId}`) || "[]");
         
@@ -401,24 +431,37 @@ async function handleAnalysisChat() {
     uploadedFiles.forEach(file => formData.append('resumes', file));
 
     try {
-        const res = await fetch(`${API_URL}/analyze`, { method: 'POST', body: formData });
+        // Streamed variant: rows appear as each candidate is scored, then the final sorted table replaces them
+        const res = await fetch(`${API_URL}/analyze/stream`, { method: 'POST', body: formData });
         if (!res.ok) throw new Error(`Server Error: ${res.statusText}`);
-        
-        const data = await res.json();
-        
-        if (data.session_id) {
-            currentSessionId = data.session_id;
-            loadSessions(); 
-        }
 
-        if (data.results) {
-            analysisData = data.results; 
-            renderTableHTML(data.results);
-            uploadedFiles = [];
-            updateFilePreviews();
-        } else if (data.message) {
-            renderMessageHTML('bot', data.message);
-        } else {
+        let liveTable = null;
+        let finished = false;
+
+        await readNdjson(res, (event) => {
+            if (event.event === 'session') {
+                currentSessionId = event.session_id;
+                loadSessions();
+            } else if (event.event === 'started') {
+                liveTable = createLiveTable(event.total);
+            } else if (event.event === 'candidate') {
+                if (!liveTable) liveTable = createLiveTable(null);
+                liveTable.addRow(event.candidate);
+            } else if (event.event === 'results') {
+                finished = true;
+                if (liveTable) liveTable.remove();
+                analysisData = event.results;
+                renderTableHTML(event.results);
+                uploadedFiles = [];
+                updateFilePreviews();
+            } else if (event.event === 'error') {
+                finished = true;
+                if (liveTable) liveTable.remove();
+                renderMessageHTML('bot', `❌ ${event.error}`);
+            }
+        });
+
+        if (!finished) {
             renderMessageHTML('bot', "Sorry, I couldn't analyze the resumes. Please try again.");
         }
         
@@ -436,6 +479,80 @@ async function handleAnalysisChat() {
     }
 }
 
+// Reads an NDJSON response body line by line, calling onEvent for every parsed object
+async function readNdjson(res, onEvent) {
+    const reader = res.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let newline;
+        while ((newline = buffer.indexOf('\n')) >= 0) {
+            const line = buffer.slice(0, newline).trim();
+            buffer = buffer.slice(newline + 1);
+            if (line) onEvent(JSON.parse(line));
+        }
+    }
+    if (buffer.trim()) onEvent(JSON.parse(buffer));
+}
+
+// Provisional results table that grows while the analysis is still running
+function createLiveTable(total) {
+    let count = 0;
+    const msgDiv = document.createElement('div');
+    msgDiv.className = `flex gap-4 max-w-3xl mx-auto msg-enter`;
+    msgDiv.innerHTML = `
+        <div class="w-8 h-8 rounded-full bg-blue-100 flex items-center justify-center text-blue-600 text-sm shrink-0 mt-1">AI</div>
+        <div class="bg-gray-50 p-4 rounded-2xl rounded-tl-none text-gray-800 text-sm shadow-sm border border-gray-100 w-full overflow-hidden">
+            <p class="mb-3 font-semibold text-gray-700 flex items-center gap-2">
+                <i class="fa-solid fa-spinner fa-spin text-blue-500"></i>
+                <span class="live-progress">Scoring candidates...</span>
+            </p>
+            <div class="overflow-x-auto rounded-lg border border-gray-200 shadow-sm">
+                <table class="min-w-full text-left text-sm bg-white">
+                    <thead class="bg-gray-50 uppercase tracking-wider text-xs font-semibold text-gray-600">
+                        <tr>
+                            <th class="px-4 py-2 border-r">Name</th>
+                            <th class="px-4 py-2 border-r">Email</th>
+                            <th class="px-4 py-2 border-r">Score</th>
+                            <th class="px-4 py-2">Summary</th>
+                        </tr>
+                    </thead>
+                    <tbody></tbody>
+                </table>
+            </div>
+        </div>
+    `;
+    if(analysisChatBox) analysisChatBox.appendChild(msgDiv);
+
+    const tbody = msgDiv.querySelector('tbody');
+    const progress = msgDiv.querySelector('.live-progress');
+
+    return {
+        addRow(cand) {
+            count += 1;
+            const displayEmail = (cand.email && cand.email !== 'No Email') ? cand.email : 'None';
+            tbody.insertAdjacentHTML('beforeend', `
+                <tr class="border-b border-gray-100 last:border-0 msg-enter">
+                    <td class="px-4 py-3 border-r font-medium text-gray-900">${cand.name}</td>
+                    <td class="px-4 py-3 border-r text-gray-500">${displayEmail}</td>
+                    ${scoreCellHTML(cand)}
+                    <td class="px-4 py-3 text-xs text-gray-500 min-w-[200px] leading-snug">${cand.summary}</td>
+                </tr>
+            `);
+            progress.textContent = total ? `Scored ${count} of ${total} candidates...` : `Scored ${count} candidates...`;
+            scrollToBottom(analysisChatBox);
+        },
+        remove() {
+            msgDiv.remove();
+        }
+    };
+}
+
 function renderMessageHTML(role, content) {
     const isUser = role === 'user';
     const msgDiv = document.createElement('div');
@@ -465,7 +582,7 @@ function renderTableHTML(results, checkedIndices = []) {
             <td class="px-4 py-3 border-r"><input type="checkbox" class="candidate-checkbox w-4 h-4 cursor-pointer" data-index="${idx}" ${isChecked}></td>
             <td class="px-4 py-3 border-r font-medium text-gray-900">${cand.name}</td>
             <td class="px-4 py-3 border-r text-gray-500">${displayEmail}</td>
-            <td class="px-4 py-3 border-r font-bold ${getScoreColor(cand.score)}">${cand.score}%</td>
+            ${scoreCellHTML(cand)}
             <td class="px-4 py-3 text-xs text-gray-500 min-w-[200px] leading-snug">${cand.summary}</td>
         </tr>
     `}).join('');
@@ -507,6 +624,14 @@ function renderTableHTML(results, checkedIndices = []) {
     }
 }
 
+function scoreCellHTML(cand) {
+    // Pre-ranked resumes have no AI score; their keyword relevance is relative to the batch, so it is shown apart
+    if (cand.score === null || cand.score === undefined) {
+        return `<td class="px-4 py-3 border-r text-gray-400">Not reviewed<div class="text-xs font-normal">Keywords ${cand.local_score ?? 0}/100</div></td>`;
+    }
+    return `<td class="px-4 py-3 border-r font-bold ${getScoreColor(cand.score)}">${cand.score}%</td>`;
+}
+
 function getScoreColor(score) {
     const s = parseInt(score);
     if(s > 80) return 'text-green-600';
@@ -563,6 +688,9 @@ async function sendInvites() {
 
 // --- INTERVIEW LOGIC ---
 
+const STT_SAMPLE_RATE = 16000;
+let liveStt = null; // active streaming transcription: { ws, audioCtx, source, processor, stream, bubble }
+
 async function startRecording() {
     if(isRecording) return;
     isRecording = true;
@@ -570,6 +698,18 @@ async function startRecording() {
     document.getElementById('recording-indicator').classList.remove('hidden');
     try {
         const stream = await navigator.mediaDevices.getUserMedia({ audio: true });
+
+        // Preferred: stream PCM over a WebSocket so transcription runs while the candidate speaks
+        if (window.WebSocket && window.AudioContext) {
+            try {
+                liveStt = await startLiveTranscription(stream);
+                if (!isRecording) { stopLiveTranscription(liveStt); liveStt = null; } // released while connecting
+                return;
+            } catch(e) {
+                console.warn("Live transcription unavailable, falling back to upload:", e);
+            }
+        }
+
         mediaRecorder = new MediaRecorder(stream);
         mediaRecorder.ondataavailable = event => { audioChunks.push(event.data); };
         mediaRecorder.start();
@@ -583,6 +723,12 @@ async function stopRecording() {
     if(!isRecording) return;
     isRecording = false;
     document.getElementById('recording-indicator').classList.add('hidden');
+    if (liveStt) {
+        stopLiveTranscription(liveStt);
+        liveStt = null;
+        return;
+    }
+    if (!mediaRecorder || mediaRecorder.state === 'inactive') return;
     mediaRecorder.stop();
     mediaRecorder.onstop = async () => {
         const audioBlob = new Blob(audioChunks, { type: 'audio/wav' });
@@ -590,6 +736,79 @@ async function stopRecording() {
     };
 }
 
+function openSttSocket() {
+    return new Promise((resolve, reject) => {
+        const proto = location.protocol === 'https:' ? 'wss' : 'ws';
+        const ws = new WebSocket(`${proto}://${location.host}/ws/interview/transcribe?sample_rate=${STT_SAMPLE_RATE}`);
+        ws.binaryType = 'arraybuffer';
+        ws.onopen = () => resolve(ws);
+        ws.onerror = (e) => reject(e);
+    });
+}
+
+async function startLiveTranscription(stream) {
+    const ws = await openSttSocket();
+    const audioCtx = new AudioContext();
+    const source = audioCtx.createMediaStreamSource(stream);
+    const processor = audioCtx.createScriptProcessor(4096, 1, 1);
+    processor.onaudioprocess = (e) => {
+        if (ws.readyState === WebSocket.OPEN) {
+            ws.send(downsampleToPcm16(e.inputBuffer.getChannelData(0), audioCtx.sampleRate));
+        }
+    };
+    source.connect(processor);
+    processor.connect(audioCtx.destination);
+
+    addChatBubbleInterview('user', '🎤 Listening...');
+    const interviewBox = document.getElementById('chat-box');
+    const bubble = interviewBox.lastElementChild.querySelector('div:nth-child(2)');
+
+    ws.onmessage = (event) => {
+        const msg = JSON.parse(event.data);
+        if (msg.type === 'partial') {
+            if (msg.text) bubble.textContent = msg.text;
+            scrollToBottom(interviewBox);
+        } else if (msg.type === 'final') {
+            bubble.textContent = msg.text;
+            ws.close();
+            askInterviewer(msg.text);
+        } else if (msg.type === 'error') {
+            console.error(msg.error);
+            bubble.textContent = "❌ Could not transcribe audio.";
+            ws.close();
+        }
+    };
+
+    return { ws, audioCtx, source, processor, stream, bubble };
+}
+
+function stopLiveTranscription(session) {
+    session.processor.disconnect();
+    session.source.disconnect();
+    session.stream.getTracks().forEach(track => track.stop());
+    session.audioCtx.close();
+    if (session.ws.readyState === WebSocket.OPEN) {
+        session.ws.send(JSON.stringify({ type: 'end' }));
+    }
+}
+
+// Float32 samples at the AudioContext rate -> 16 kHz little-endian int16 PCM
+function downsampleToPcm16(input, inputRate) {
+    const ratio = inputRate / STT_SAMPLE_RATE;
+    const length = Math.floor(input.length / ratio);
+    const out = new Int16Array(length);
+    for (let i = 0; i < length; i++) {
+        // Average the input samples covered by this output sample (cheap anti-aliasing)
+        const start = Math.floor(i * ratio);
+        const end = Math.max(start + 1, Math.min(input.length, Math.floor((i + 1) * ratio)));
+        let sum = 0;
+        for (let j = start; j < end; j++) sum += input[j];
+        const sample = Math.max(-1, Math.min(1, sum / (end - start)));
+        out[i] = sample < 0 ? sample * 0x8000 : sample * 0x7FFF;
+    }
+    return out.buffer;
+}
+
 async function processAudio(audioBlob) {
     addChatBubbleInterview('user', '🎤 Processing audio...');
     // Scroll Immediately
@@ -609,35 +828,87 @@ async function processAudio(audioBlob) {
             if(textDiv) textDiv.textContent = transData.text;
         }
 
+        await askInterviewer(transData.text);
+
+    } catch(e) {
+        console.error(e);
+    }
+}
+
+// Sessions whose resume/JD the server already holds (it keeps them for the whole interview)
+const interviewProfileSent = new Set();
+
+async function askInterviewer(userText) {
+    const interviewBox = document.getElementById('chat-box');
+
+    try {
         const jobDesc = "General Software Engineer"; 
         const resumeText = "Candidate has python skills..."; 
 
-        const chatRes = await fetch(`${API_URL}/interview/chat`, {
+        const payload = { user_text: userText, session_id: currentSessionId };
+        if (!currentSessionId || !interviewProfileSent.has(currentSessionId)) {
+            payload.job_desc = jobDesc;
+            payload.resume_text = resumeText;
+        }
+
+        const chatRes = await fetch(`${API_URL}/interview/chat/stream`, {
             method: 'POST',
             headers: {'Content-Type': 'application/json'},
-            body: JSON.stringify({
-                user_text: transData.text,
-                session_id: currentSessionId, 
-                job_desc: jobDesc,
-                resume_text: resumeText
-            })
+            body: JSON.stringify(payload)
+        });
+        if (!chatRes.ok) throw new Error(`Interview request failed (${chatRes.status})`);
+
+        // The bubble grows as tokens arrive; each sentence's audio is queued as soon as it is synthesized
+        const bubble = addChatBubbleInterview('ai', '');
+        const player = createAudioQueue();
+        let aiText = '';
+
+        await readNdjson(chatRes, (event) => {
+            if (event.type === 'session') {
+                currentSessionId = event.session_id;
+                interviewProfileSent.add(currentSessionId);
+            } else if (event.type === 'text') {
+                aiText += event.delta;
+                bubble.textContent = aiText;
+                scrollToBottom(interviewBox);
+            } else if (event.type === 'audio') {
+                player.enqueue(event.audio_url);
+            } else if (event.type === 'done') {
+                bubble.textContent = event.ai_text;
+                if (event.context) console.debug('Interview prompt tokens:', event.context.prompt_tokens, event.context);
+                scrollToBottom(interviewBox);
+            } else if (event.type === 'error') {
+                console.error(event.error);
+            }
         });
-
-        const chatData = await chatRes.json();
-        
-        if(chatData.session_id) currentSessionId = chatData.session_id;
-
-        addChatBubbleInterview('ai', chatData.ai_text);
-        scrollToBottom(interviewBox); // Scroll after bot response
-
-        const audio = new Audio("data:audio/mp3;base64," + chatData.audio_base64);
-        audio.play();
 
     } catch(e) {
         console.error(e);
     }
 }
 
+function createAudioQueue() {
+    const pending = [];
+    let playing = false;
+
+    const playNext = () => {
+        const next = pending.shift();
+        if (!next) { playing = false; return; }
+        playing = true;
+        const audio = new Audio(next);
+        audio.onended = playNext;
+        audio.onerror = playNext;
+        audio.play().catch(playNext);
+    };
+
+    return {
+        enqueue(audioUrl) {
+            pending.push(audioUrl);
+            if (!playing) playNext();
+        }
+    };
+}
+
 function addChatBubbleInterview(role, text) {
     const box = document.getElementById('chat-box');
     const isUser = role === 'user';
@@ -654,4 +925,5 @@ function addChatBubbleInterview(role, text) {
     `;
     box.insertAdjacentHTML('beforeend', html);
     scrollToBottom(box); // Use helper here too
+    return box.lastElementChild.querySelector('.p-3');
 }
\ No newline at end of file
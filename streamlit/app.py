@@ -3,10 +3,12 @@ import datetime
 
 import sys, os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Backend modules import each other by bare name (e.g. `import cache`), as main.py does
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend"))
 
 from backend.analyze_and_summary import analyze_resumes
 from backend.scheduler import batch_schedule_interviews
-from backend.interview_manager import text_to_speech, transcribe_audio, generate_interview_question
+from backend.interview_manager import synthesize_speech, synthesizer, transcribe_audio, generate_interview_question
 from streamlit_mic_recorder import mic_recorder
 
 # 1. Page Configuration
@@ -84,10 +86,11 @@ with tab1:
                     st.markdown(header)
                     history_text = header + "\n\n"
                     for r in results:
-                        with st.expander(f"🏆 Score: {r['score']} - {r['name']}"):
+                        score = r['score'] if r['score'] is not None else f"not reviewed, keywords {r.get('local_score', 0)}/100"
+                        with st.expander(f"🏆 Score: {score} - {r['name']}"):
                             st.markdown(f"📧 **Email:** `{r['email']}`")
                             st.info(f"**Summary:**\n{r['summary']}")
-                        history_text += f"- **{r['name']}** ({r['score']}): {r['summary'][:100]}...\n"
+                        history_text += f"- **{r['name']}** ({score}): {r['summary'][:100]}...\n"
                     st.success("✅ Candidates sent to Scheduler Dashboard (Tab 2)")
             st.session_state.messages.append({"role": "assistant", "content": history_text})
 
@@ -103,8 +106,10 @@ with tab2:
         with st.form("schedule_form"):
             selected_indices = []
             for idx, cand in enumerate(st.session_state.candidates):
-                is_checked = int(cand['score']) >= 70
-                if st.checkbox(f"{cand['name']} (Score: {cand['score']})", value=is_checked, key=f"c_{idx}"):
+                reviewed = cand['score'] is not None
+                is_checked = reviewed and int(cand['score']) >= 70
+                label = cand['score'] if reviewed else f"not reviewed, keywords {cand.get('local_score', 0)}/100"
+                if st.checkbox(f"{cand['name']} (Score: {label})", value=is_checked, key=f"c_{idx}"):
                     selected_indices.append(idx)
             
             st.divider()
@@ -168,9 +173,9 @@ with tab3:
                 with st.chat_message(msg["role"]):
                     st.write(msg["content"])
                     if msg["role"] == "assistant":
-                        audio_path = text_to_speech(msg["content"])
-                        if audio_path:
-                            st.audio(audio_path, format="audio/mp3", start_time=0)
+                        audio = synthesize_speech(msg["content"])
+                        if audio:
+                            st.audio(audio, format=synthesizer.media_type, start_time=0)
 
             # 3. User Voice Input
             st.write("🗣️ Your Answer")